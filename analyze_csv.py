@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import argparse
+
+import pandas as pd
+
+from risk_model import (
+    add_risk_columns,
+    set_risk_backend,
+    CHUNK_STRIDE,
+    CHUNK_AGGREGATES,
+    RISK_BACKENDS,
+)
+from result_cache import ResultCache
+from media_cache import MediaCache, MEDIA_CACHE_DIR
+
+# ======================================================
+# OFFLINE RİSK ANALİZİ (SCRAPE OLMADAN CSV YENİDEN SKORLAMA)
+# ======================================================
+# Kullanım:
+#   python analyze_csv.py --in data/csv/Tiktok_veriseti_analizi.csv \
+#                         --out data/csv/Tiktok_veriseti_rescored.csv
+#
+# CSV parça parça (chunksize) okunur, her parça skorlanıp çıktıya eklenir ve
+# <out>.ckpt.json güncellenir. İşlem yarıda kalırsa aynı komut tekrar
+# çalıştırıldığında kaldığı parçadan devam eder (--restart ile baştan başlar).
+#
+# --refresh_media 1 verilirse videosu medya cache'inde olan satırların
+# transcript / OCR / yüz / görsel kolonları da yeniden hesaplanır (indirme yapılmaz).
+
+
+def detect_sep(path: str) -> str:
+    # data/csv içinde hem ',' hem ';' ayraçlı dosyalar var
+    with open(path, "r", encoding="utf-8-sig") as f:
+        header = f.readline()
+    return ";" if header.count(";") > header.count(",") else ","
+
+
+def _input_stamp(path: str):
+    st = os.stat(path)
+    return {"input": os.path.abspath(path), "size": st.st_size, "mtime": int(st.st_mtime)}
+
+
+def _load_checkpoint(ckpt_path: str, stamp: dict):
+    if not os.path.exists(ckpt_path):
+        return None
+    try:
+        with open(ckpt_path, "r", encoding="utf-8") as f:
+            ckpt = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if any(ckpt.get(k) != v for k, v in stamp.items()):
+        print("⚠️ Girdi CSV checkpoint'ten sonra değişmiş, baştan başlanıyor.")
+        return None
+    return ckpt
+
+
+def _save_checkpoint(ckpt_path: str, ckpt: dict):
+    # yarım yazılmış checkpoint kalmasın: önce tmp, sonra atomik rename
+    tmp = ckpt_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(ckpt, f)
+    os.replace(tmp, ckpt_path)
+
+
+def refresh_media_columns(chunk, script_dir, media_cache, cache=None, analysis_opts=None):
+    """Videosu medya cache'inde olan satırların medya kolonlarını yeniden hesaplar."""
+    # scraper modülü (ve analiz bağımlılıkları) sadece bu mod açıksa yüklenir
+    from tiktok_scraper_raw import process_media, FEATURE_COLUMNS
+    from face_features import get_emotion_batcher
+
+    # satırlar sırayla işlenir: yüz batch'i beklemesin
+    get_emotion_batcher(batch_size=1)
+
+    # her parça aynı kolonlarla yazılmalı: CSV'de olmayan medya kolonları, bu
+    # parçada hiç video yenilenmese de boş olarak eklenir
+    for cols in FEATURE_COLUMNS.values():
+        for col in cols:
+            if col not in chunk.columns:
+                chunk[col] = None
+
+    refreshed = 0
+    for idx, url in chunk["video_url"].items():
+        media = process_media(
+            url,
+            script_dir,
+            analysis_opts=analysis_opts,
+            cache=cache,
+            media_cache=media_cache,
+            download=False,
+        )
+        if media is None:
+            continue
+        for col, value in media.items():
+            chunk.at[idx, col] = value
+        refreshed += 1
+
+    print(f"🎞️ {refreshed}/{len(chunk)} satırın medya kolonları cache'teki videodan yenilendi")
+    return chunk
+
+
+def analyze_csv(
+    in_path: str,
+    out_path: str,
+    script_dir: str,
+    chunksize: int = 2000,
+    restart: bool = False,
+    cache=None,
+    media_cache=None,
+    **score_opts,
+):
+    sep = detect_sep(in_path)
+    ckpt_path = out_path + ".ckpt.json"
+    stamp = _input_stamp(in_path)
+
+    ckpt = None if restart else _load_checkpoint(ckpt_path, stamp)
+    if ckpt is None:
+        ckpt = {**stamp, "chunksize": chunksize, "chunks_done": 0, "rows_done": 0, "out_bytes": 0}
+        if os.path.exists(out_path):
+            os.remove(out_path)
+    else:
+        # parça boyutu değişirse atlanacak parça sayısı yanlış olur
+        chunksize = ckpt["chunksize"]
+        print(f"↩️ Checkpoint bulundu: {ckpt['rows_done']} satır zaten yazılmış, devam ediliyor.")
+
+    # son checkpoint'ten sonra yarım yazılmış parça varsa kes
+    if os.path.exists(out_path) and os.path.getsize(out_path) > ckpt["out_bytes"]:
+        with open(out_path, "r+b") as f:
+            f.truncate(ckpt["out_bytes"])
+
+    reader = pd.read_csv(in_path, sep=sep, encoding="utf-8-sig", chunksize=chunksize)
+    start = time.time()
+
+    for i, chunk in enumerate(reader):
+        if i < ckpt["chunks_done"]:
+            continue
+
+        t = time.time()
+        if media_cache is not None and "video_url" in chunk.columns:
+            chunk = refresh_media_columns(chunk, script_dir, media_cache, cache=cache)
+        chunk = add_risk_columns(chunk, script_dir, cache=cache, **score_opts)
+
+        first = ckpt["out_bytes"] == 0
+        with open(out_path, "a", encoding="utf-8-sig" if first else "utf-8", newline="") as f:
+            chunk.to_csv(f, sep=sep, header=first, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+
+        ckpt["chunks_done"] = i + 1
+        ckpt["rows_done"] += len(chunk)
+        ckpt["out_bytes"] = os.path.getsize(out_path)
+        _save_checkpoint(ckpt_path, ckpt)
+
+        rate = len(chunk) / max(time.time() - t, 1e-9)
+        print(f"✅ Parça {i + 1}: {len(chunk)} satır ({rate:.1f} satır/sn), toplam {ckpt['rows_done']}")
+
+    if os.path.exists(ckpt_path):
+        os.remove(ckpt_path)
+
+    print(f"🏁 {ckpt['rows_done']} satır skorlandı → {out_path} ({time.time() - start:.1f} sn)")
+    return ckpt["rows_done"]
+
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--in", dest="in_path", required=True, help="Girdi CSV")
+    parser.add_argument("--out", dest="out_path", required=True, help="Çıktı CSV")
+    parser.add_argument("--chunksize", type=int, default=2000, help="Parça başına satır")
+    parser.add_argument("--restart", action="store_true", help="Checkpoint'i yok say, baştan başla")
+
+    parser.add_argument("--risk_backend", choices=list(RISK_BACKENDS), default=os.environ.get("RISK_BACKEND", "torch"))
+    parser.add_argument("--risk_threads", type=int, default=int(os.environ.get("RISK_THREADS", "0") or 0))
+    parser.add_argument("--risk_chunking", type=int, choices=[0, 1], default=0)
+    parser.add_argument("--risk_stride", type=int, default=CHUNK_STRIDE)
+    parser.add_argument("--risk_aggregate", choices=list(CHUNK_AGGREGATES), default="max")
+    parser.add_argument("--risk_top_k", type=int, default=3)
+    parser.add_argument("--risk_max_tokens", type=int, default=0, help="Parça başına toplam token sınırı (0: sınırsız)")
+
+    parser.add_argument("--cache", type=int, choices=[0, 1], default=0, help="1 ise risk skorları cache'ten okunur/yazılır")
+    parser.add_argument("--cache_path", default="tiktok_feature_cache.sqlite")
+
+    parser.add_argument("--refresh_media", type=int, choices=[0, 1], default=0, help="1 ise medya cache'indeki videolardan medya kolonları yeniden hesaplanır")
+    parser.add_argument("--media_cache_dir", default=MEDIA_CACHE_DIR)
+
+    args = parser.parse_args()
+
+    set_risk_backend(args.risk_backend, args.risk_threads)
+
+    cache = None
+    if args.cache == 1:
+        cache = ResultCache(os.path.join(script_dir, args.cache_path))
+
+    media_cache = None
+    if args.refresh_media == 1:
+        media_cache = MediaCache(os.path.join(script_dir, args.media_cache_dir), max_mb=0)
+
+    try:
+        analyze_csv(
+            args.in_path,
+            args.out_path,
+            script_dir,
+            chunksize=args.chunksize,
+            restart=args.restart,
+            cache=cache,
+            media_cache=media_cache,
+            chunking=bool(args.risk_chunking),
+            chunk_stride=args.risk_stride,
+            aggregate=args.risk_aggregate,
+            top_k=args.risk_top_k,
+            max_total_tokens=args.risk_max_tokens,
+        )
+    finally:
+        if media_cache is not None:
+            from tiktok_scraper_raw import close_transcriber
+
+            close_transcriber()
+            media_cache.report()
+        if cache is not None:
+            cache.close()
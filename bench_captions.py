@@ -0,0 +1,139 @@
+import sys
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from caption_pool import CaptionPool, CAPTION_SELECTORS, CAPTION_SOURCES
+
+# ======================================================
+# CAPTION BENCHMARK (YEREL SAHTE TİKTOK VİDEO SAYFASI)
+# ======================================================
+# Kullanım: python bench_captions.py [--videos 20] [--pages 1 4 8]
+#
+# Yerel sunucu statik bir video sayfası döner: caption JS ile gecikmeli eklenir,
+# aynı caption hydration JSON'unda da vardır, sayfada yavaş gelen bir görsel ve
+# font vardır. Eski akış (tek sekme, goto + sleep(2) + sırayla seçiciler) ile
+# sekme havuzu (json / dom kaynakları) karşılaştırılır ve havuzun doğru
+# caption'ları doğru sırada döndürdüğü kontrol edilir.
+
+RENDER_DELAY_MS = 300
+ASSET_DELAY = 1.5
+
+PAGE = """<!doctype html>
+<html><head><style>@font-face {{ font-family: x; src: url('/asset/font.woff2'); }}</style></head>
+<body>
+<script id="__UNIVERSAL_DATA_FOR_REHYDRATION__" type="application/json">
+{{"__DEFAULT_SCOPE__": {{"webapp.video-detail": {{"itemInfo": {{"itemStruct": {{"id": "{vid}", "desc": "caption {vid}", "createTime": 1700000000}}}}}}}}}}
+</script>
+<img src="/asset/cover.jpg">
+<div id="app"></div>
+<script>
+setTimeout(function () {{
+  var h = document.createElement("h1");
+  h.setAttribute("data-e2e", "browse-video-desc");
+  h.textContent = "caption {vid}";
+  document.getElementById("app").appendChild(h);
+}}, {delay});
+</script>
+</body></html>"""
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/asset/"):
+            time.sleep(ASSET_DELAY)
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        vid = self.path.rstrip("/").rsplit("/", 1)[-1]
+        body = PAGE.format(vid=vid, delay=RENDER_DELAY_MS).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def legacy_captions(page, urls):
+    # eski fetch_caption + get_caption davranışı
+    out = []
+    for url in urls:
+        page.goto(url, timeout=60000)
+        time.sleep(2)
+        caption = ""
+        for sel in CAPTION_SELECTORS:
+            try:
+                page.locator(sel).first.wait_for(timeout=12000)
+                txt = page.locator(sel).first.text_content()
+                if txt and txt.strip():
+                    caption = txt
+                    break
+            except Exception:
+                pass
+        out.append((url, caption))
+    return out
+
+
+def main():
+    from playwright.sync_api import sync_playwright
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--videos", type=int, default=20)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--skip_legacy", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    urls = [f"http://127.0.0.1:{port}/@bench/video/{i}" for i in range(args.videos)]
+    expected = [(u, f"caption {i}") for i, u in enumerate(urls)]
+
+    failed = False
+    with sync_playwright() as p:
+        browser = p.chromium.launch(headless=True)
+        context = browser.new_context()
+
+        print(f"{'akış':22} {'süre (sn)':>10} {'video/sn':>9} {'doğru':>8}")
+
+        if not args.skip_legacy:
+            page = context.new_page()
+            t = time.perf_counter()
+            got = legacy_captions(page, urls)
+            dt = time.perf_counter() - t
+            page.close()
+            ok = sum(a == b for a, b in zip(got, expected))
+            print(f"{'eski (tek sekme)':22} {dt:10.2f} {len(urls) / dt:9.2f} {ok:>5}/{len(urls)}")
+
+        for source in CAPTION_SOURCES:
+            for n in args.pages:
+                pool = CaptionPool(context, size=n, source=source)
+                t = time.perf_counter()
+                got = list(pool.captions(urls))
+                dt = time.perf_counter() - t
+                pool.close()
+                ok = sum(a == b for a, b in zip(got, expected))
+                failed |= ok != len(urls)
+                label = f"havuz {source} ({n} sekme)"
+                print(f"{label:22} {dt:10.2f} {len(urls) / dt:9.2f} {ok:>5}/{len(urls)}")
+                # json modu sessizce DOM'a düşerse ölçülen DOM olur
+                if source == "json" and pool.stats.get("json", 0) != len(urls):
+                    print(f"❌ json: {pool.stats.get('json', 0)}/{len(urls)} caption sayfa JSON'undan okundu")
+                    failed = True
+
+        browser.close()
+
+    server.shutdown()
+    if failed:
+        print("❌ Havuz bazı caption'ları yanlış/eksik döndürdü ya da json modu DOM'a düştü.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+import argparse
+import cv2
+
+from video_frames import decode_video, frame_indices, FACE_POINTS, OCR_POINTS
+
+# ======================================================
+# DECODE BENCHMARK (ESKİ: 3 OTURUM  /  YENİ: TEK GEÇİŞ)
+# ======================================================
+# Kullanım: python bench_decode.py video1.mp4 video2.mp4 ...
+#           python bench_decode.py --dir ornek_videolar/
+# Sadece decode maliyetini ölçer (OCR / DeepFace çalıştırılmaz).
+
+
+def _legacy_seek_frames(video_path, points):
+    # eski extract_overlay_text / extract_face_features davranışı
+    cap = cv2.VideoCapture(video_path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    frames = []
+    if frame_count > 0:
+        for idx in frame_indices(frame_count, points):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+            ret, frame = cap.read()
+            if ret:
+                frames.append(frame)
+    cap.release()
+    return frames
+
+
+def _legacy_visual(video_path):
+    # eski extract_visual_features davranışı (her kare, listelerde)
+    cap = cv2.VideoCapture(video_path)
+    brightness_vals = []
+    blur_vals = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        brightness_vals.append(gray.mean())
+        blur_vals.append(cv2.Laplacian(gray, cv2.CV_64F).var())
+    cap.release()
+    return brightness_vals, blur_vals
+
+
+def legacy_decode(video_path):
+    _legacy_seek_frames(video_path, OCR_POINTS)
+    _legacy_seek_frames(video_path, FACE_POINTS)
+    _legacy_visual(video_path)
+
+
+def shared_decode(video_path):
+    frames = decode_video(video_path)
+    frames.visual_stats()
+
+
+def _time(fn, video_path, repeat):
+    best = None
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(video_path)
+        dt = time.perf_counter() - t
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("videos", nargs="*")
+    parser.add_argument("--dir", default=None, help="Bu klasördeki tüm .mp4 dosyaları")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    videos = list(args.videos)
+    if args.dir:
+        videos += [
+            os.path.join(args.dir, f)
+            for f in sorted(os.listdir(args.dir))
+            if f.lower().endswith(".mp4")
+        ]
+
+    if not videos:
+        print("⚠️ Video verilmedi.")
+        sys.exit(1)
+
+    print(f"{'video':40} {'eski (ms)':>10} {'yeni (ms)':>10} {'hız':>6}")
+    total_old = total_new = 0.0
+
+    for v in videos:
+        old = _time(legacy_decode, v, args.repeat)
+        new = _time(shared_decode, v, args.repeat)
+        total_old += old
+        total_new += new
+        print(f"{os.path.basename(v)[:40]:40} {old * 1000:10.1f} {new * 1000:10.1f} {old / new if new else 0:5.2f}x")
+
+    n = len(videos)
+    print("-" * 70)
+    print(
+        f"{'ortalama':40} {total_old / n * 1000:10.1f} {total_new / n * 1000:10.1f} "
+        f"{total_old / total_new if total_new else 0:5.2f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from downloader import Downloader
+
+# ======================================================
+# İNDİRME BENCHMARK (YEREL SAHTE TİKTOK / ÇÖZÜCÜ SUNUCUSU)
+# ======================================================
+# Kullanım: python bench_download.py [--size_mb 8] [--videos 8] [--chunk_kb 64 1024]
+#
+# Yerel sunucu iki çözücü API'yi (biri yavaş) ve Range/ETag destekli bir mp4
+# ucunu taklit eder. Her videonun ilk isteği yarıda kesilir; indirici .part
+# dosyasından Range ile devam etmeli. Sonuçların bayt bayt doğruluğu kontrol edilir.
+
+PAYLOAD = b""
+ETAG = '"bench-v1"'
+_dropped = set()
+_drop_lock = threading.Lock()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _json(self, obj):
+        body = json.dumps(obj).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        port = self.server.server_address[1]
+        if self.path.startswith("/fast"):
+            vid = self.path.rsplit("/", 1)[-1]
+            return self._json({"data": {"play": f"http://127.0.0.1:{port}/video/{vid}"}})
+        if self.path.startswith("/slow"):
+            time.sleep(1.0)
+            return self._json({"data": {"play": ""}})
+
+        vid = self.path.rsplit("/", 1)[-1]
+        start = 0
+        rng = self.headers.get("Range")
+        if rng and self.headers.get("If-Range") == ETAG:
+            start = int(rng.split("=")[1].split("-")[0])
+
+        with _drop_lock:
+            drop = vid not in _dropped
+            _dropped.add(vid)
+
+        body = PAYLOAD[start:]
+        self.send_response(206 if start else 200)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        if start:
+            self.send_header("Content-Range", f"bytes {start}-{len(PAYLOAD) - 1}/{len(PAYLOAD)}")
+        self.end_headers()
+
+        if drop:
+            # ilk istek yarıda kopar
+            self.wfile.write(body[: len(body) // 2])
+            self.wfile.flush()
+            self.connection.close()
+            return
+        self.wfile.write(body)
+
+
+def run(port, videos, chunk_kb, tmp):
+    _dropped.clear()
+    d = Downloader(
+        resolvers=(
+            # farklı host adı: gerçekte iki çözücü ayrı sunucularda (per_host sınırı ayrı)
+            f"http://localhost:{port}/slow?url={{url}}",
+            f"http://127.0.0.1:{port}/fast?url={{url}}",
+        ),
+        chunk_size=chunk_kb * 1024,
+        per_host=4,
+        retries=3,
+        backoff=0.05,
+    )
+
+    t = time.perf_counter()
+    threads, outs = [], []
+    for i in range(videos):
+        out = os.path.join(tmp, f"v_{chunk_kb}_{i}.mp4")
+        outs.append(out)
+        th = threading.Thread(target=d.download, args=(f"https://www.tiktok.com/@x/video/{i}", out))
+        th.start()
+        threads.append(th)
+    for th in threads:
+        th.join()
+    seconds = time.perf_counter() - t
+    d.close()
+
+    ok = 0
+    for out in outs:
+        if os.path.exists(out):
+            with open(out, "rb") as f:
+                ok += f.read() == PAYLOAD
+            os.remove(out)
+    return seconds, ok
+
+
+def main():
+    global PAYLOAD
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size_mb", type=float, default=8)
+    parser.add_argument("--videos", type=int, default=8)
+    parser.add_argument("--chunk_kb", type=int, nargs="+", default=[64, 1024])
+    args = parser.parse_args()
+
+    PAYLOAD = os.urandom(int(args.size_mb * 1024 * 1024))
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    print(f"{'chunk (KB)':>10} {'süre (sn)':>10} {'MB/sn':>8} {'doğru':>8}")
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for chunk_kb in args.chunk_kb:
+            seconds, ok = run(port, args.videos, chunk_kb, tmp)
+            mb = args.size_mb * args.videos
+            print(f"{chunk_kb:10d} {seconds:10.2f} {mb / seconds:8.1f} {ok:>5}/{args.videos}")
+            failed |= ok != args.videos
+
+    server.shutdown()
+    if failed:
+        print("❌ Bazı indirmeler eksik/bozuk.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
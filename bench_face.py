@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+
+from video_frames import decode_video, FACE_POINTS
+from face_features import extract_face_features_batch, FACE_DETECTORS, DEFAULT_DETECTOR
+import lazy_deps
+
+# ======================================================
+# YÜZ / DUYGU BENCHMARK (ESKİ: KARE KARE ANALYZE  /  YENİ: ÖN FİLTRE + BATCH)
+# ======================================================
+# Kullanım: python bench_face.py --dir ornek_videolar/ [--detector retinaface]
+# Modeller ölçüm dışında önceden yüklenir; sadece kare başı maliyet ölçülür.
+
+
+def legacy_face(frames):
+    # eski extract_face_features davranışı
+    DeepFace = lazy_deps.module("deepface.DeepFace")
+    for frame in frames.sample(FACE_POINTS):
+        try:
+            analysis = DeepFace.analyze(
+                frame, actions=["emotion"], enforce_detection=True, silent=True
+            )
+            if isinstance(analysis, list):
+                analysis = analysis[0]
+            dominant = analysis.get("dominant_emotion")
+            if dominant:
+                return dominant
+        except Exception:
+            continue
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", required=True, help="Örnek .mp4 klasörü")
+    parser.add_argument("--detector", choices=list(FACE_DETECTORS), default=DEFAULT_DETECTOR)
+    parser.add_argument("--prefilter", type=int, choices=[0, 1], default=1)
+    args = parser.parse_args()
+
+    videos = [
+        os.path.join(args.dir, f)
+        for f in sorted(os.listdir(args.dir))
+        if f.lower().endswith(".mp4")
+    ]
+    if not videos:
+        print("⚠️ Video bulunamadı.")
+        sys.exit(1)
+
+    items = [(v, decode_video(v, (FACE_POINTS,), visual=False)) for v in videos]
+
+    # ısınma: model yükleme süreleri ölçüme girmesin
+    lazy_deps.get("deepface_emotion_model")
+    lazy_deps.get("haar_face_cascade")
+
+    t = time.perf_counter()
+    old = [legacy_face(frames) for _, frames in items]
+    old_seconds = time.perf_counter() - t
+
+    stats = Counter()
+    t = time.perf_counter()
+    new = extract_face_features_batch(
+        items, detector=args.detector, prefilter=bool(args.prefilter), stats=stats
+    )
+    new_seconds = time.perf_counter() - t
+
+    n_frames = sum(len(frames.sample(FACE_POINTS)) for _, frames in items) or 1
+    same = sum(
+        1 for o, r in zip(old, new) if (o is None) == (not r["face_detected"])
+        and (o is None or o == r["face_dominant_emotion"])
+    )
+
+    print(f"📊 {len(videos)} video, {n_frames} yüz karesi")
+    print(f"   eski : {old_seconds / n_frames * 1000:8.1f} ms/kare")
+    print(f"   yeni : {new_seconds / n_frames * 1000:8.1f} ms/kare "
+          f"(tespit {stats['face_detect_seconds'] * 1000 / max(stats['face_frames'], 1):.1f} ms/kare, "
+          f"duygu batch {stats['face_emotion_seconds'] * 1000:.1f} ms / {stats['face_crops']} yüz)")
+    print(f"   ön filtrede elenen kare: {stats['face_prefiltered']}")
+    print(f"   eski ile aynı sonuç: {same}/{len(videos)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+from downloader import memory_dir
+from video_frames import decode_video
+from transcribe_whisper import load_audio
+
+# ======================================================
+# MEDYA G/Ç BENCHMARK (DİSK  /  BELLEK TABANLI /dev/shm)
+# ======================================================
+# Kullanım: python bench_media_io.py --dir ornek_videolar/ [--disk_dir /mnt/ssd/tmp]
+#
+# Her örnek MP4 için indirmedeki gibi parça parça yazma + çıkarıcıların okuması
+# (decode_video ile kareler/görsel istatistik, ffmpeg ile ses) iki hedefte ölçülür.
+# Disk tarafında yazılan dosya fsync + POSIX_FADV_DONTNEED ile sayfa önbelleğinden
+# düşürülür; okuma gerçekten diske gider (SSD'si kısıtlı scraping makinesi gibi).
+
+CHUNK = 1024 * 1024
+
+
+def _write(src, dst, cold):
+    t = time.perf_counter()
+    with open(src, "rb") as fi, open(dst, "wb") as fo:
+        while True:
+            c = fi.read(CHUNK)
+            if not c:
+                break
+            fo.write(c)
+        if cold:
+            fo.flush()
+            os.fsync(fo.fileno())
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(fo.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    return time.perf_counter() - t
+
+
+def _read(path):
+    t = time.perf_counter()
+    frames = decode_video(path)
+    frames.visual_stats()
+    load_audio(path)
+    return time.perf_counter() - t
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", required=True, help="Örnek .mp4 klasörü")
+    parser.add_argument("--disk_dir", default=None, help="Disk hedefi (varsayılan: sistem temp)")
+    args = parser.parse_args()
+
+    shm = memory_dir()
+    if shm is None:
+        print("⚠️ /dev/shm yok (bellek tabanlı klasör bulunamadı).")
+        sys.exit(1)
+
+    videos = [
+        os.path.join(args.dir, f)
+        for f in sorted(os.listdir(args.dir))
+        if f.lower().endswith(".mp4")
+    ]
+    if not videos:
+        print("⚠️ Video bulunamadı.")
+        sys.exit(1)
+
+    disk_tmp = tempfile.mkdtemp(prefix="bench_io_", dir=args.disk_dir)
+    shm_tmp = tempfile.mkdtemp(prefix="bench_io_", dir=shm)
+
+    totals = {"disk": [0.0, 0.0], "shm": [0.0, 0.0]}
+    print(f"{'video':32} {'MB':>6} {'disk yaz/oku (ms)':>20} {'shm yaz/oku (ms)':>20}")
+    try:
+        for v in videos:
+            name = os.path.basename(v)
+            row = []
+            for target, folder, cold in (("disk", disk_tmp, True), ("shm", shm_tmp, False)):
+                dst = os.path.join(folder, name)
+                w = _write(v, dst, cold)
+                r = _read(dst)
+                os.remove(dst)
+                totals[target][0] += w
+                totals[target][1] += r
+                row.append(f"{w * 1000:8.1f} / {r * 1000:8.1f}")
+            mb = os.path.getsize(v) / 1024 / 1024
+            print(f"{name[:32]:32} {mb:6.1f} {row[0]:>20} {row[1]:>20}")
+    finally:
+        shutil.rmtree(disk_tmp, ignore_errors=True)
+        shutil.rmtree(shm_tmp, ignore_errors=True)
+
+    n = len(videos)
+    disk = sum(totals["disk"])
+    shm_total = sum(totals["shm"])
+    print("-" * 82)
+    print(
+        f"{'ortalama':32} {'':6} "
+        f"{totals['disk'][0] / n * 1000:8.1f} / {totals['disk'][1] / n * 1000:8.1f} "
+        f"{totals['shm'][0] / n * 1000:8.1f} / {totals['shm'][1] / n * 1000:8.1f}"
+    )
+    print(f"toplam: disk {disk:.2f} sn, shm {shm_total:.2f} sn ({disk / shm_total if shm_total else 0:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
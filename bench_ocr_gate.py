@@ -0,0 +1,153 @@
+import os
+import re
+import sys
+import time
+import argparse
+from collections import Counter
+
+from video_frames import decode_video, ocr_points, OCR_SAMPLES
+from ocr_features import extract_overlay_text, HASH_MAX_DIST
+from tiktok_urls import video_id_from_url
+from analyze_csv import detect_sep
+
+# ======================================================
+# OCR ÖN FİLTRE: ATLANAN KARE + RECALL RAPORU
+# ======================================================
+# Aynı kareler üzerinde filtresiz (eski) ve filtreli OCR'ı karşılaştırır.
+#
+# Kullanım:
+#   python bench_ocr_gate.py --dir videolar/
+#   python bench_ocr_gate.py --dir videolar/ --csv data/csv/Tiktok_veriseti_analizi.csv
+#   python bench_ocr_gate.py --dir videolar/ --samples 5 --hash_dist 0 8 16 32
+#
+# Filtreli OCR ayrıca bölge hafızasıyla (dedup) çalıştırılır: her --hash_dist
+# toleransı için sadece video içinde, varsayılan toleransla bir kez de klasördeki
+# tüm videolar arasında paylaşımlı (--ocr_share_author gibi). Her mod için
+# EasyOCR çağrı sayısı ve çıktının filtreli/dedup'sız sonuçla birebir aynı kaldığı
+# video oranı raporlanır (tolerans seçimi buna göre yapılır).
+#
+# --csv verilirse dosya adı <video_id>.mp4 olan videolar için CSV'deki
+# overlay_text_raw etiket kabul edilir ve modların kelime recall'u raporlanır.
+
+
+def _words(text):
+    return {w for w in re.findall(r"\w+", str(text or "").lower()) if len(w) > 1}
+
+
+def _word_recall(found, reference):
+    ref = _words(reference)
+    if not ref:
+        return None
+    return len(ref & _words(found)) / len(ref)
+
+
+def _load_labels(csv_path):
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, sep=detect_sep(csv_path), encoding="utf-8-sig")
+
+    labels = {}
+    for url, text in zip(df["video_url"], df.get("overlay_text_raw", [])):
+        vid = video_id_from_url(url)
+        if vid and isinstance(text, str) and text.strip():
+            labels[vid] = text
+    return labels
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", required=True, help="Örnek .mp4 klasörü")
+    parser.add_argument("--csv", default=None, help="overlay_text_raw etiketli CSV")
+    parser.add_argument("--samples", type=int, default=OCR_SAMPLES, help="Video başına OCR örnek kare sayısı")
+    parser.add_argument(
+        "--hash_dist", type=int, nargs="+", default=[0, HASH_MAX_DIST, 2 * HASH_MAX_DIST],
+        help="Denenecek dedup Hamming toleransları (bit)",
+    )
+    args = parser.parse_args()
+    points = ocr_points(args.samples)
+
+    videos = [
+        os.path.join(args.dir, f)
+        for f in sorted(os.listdir(args.dir))
+        if f.lower().endswith(".mp4")
+    ]
+    if not videos:
+        print("⚠️ Video bulunamadı.")
+        sys.exit(1)
+
+    labels = _load_labels(args.csv) if args.csv else {}
+
+    # mod → (paylaşım grubu, Hamming toleransı)
+    dedup_modes = {f"dedup d={d}": (None, d) for d in args.hash_dist}
+    dedup_modes["share"] = ("bench", HASH_MAX_DIST)
+
+    stats = Counter()
+    dedup_stats = {mode: Counter() for mode in dedup_modes}
+    times = {mode: 0.0 for mode in ["full", "gate", *dedup_modes]}
+    with_text = kept = 0
+    self_recall = []
+    same = {mode: 0 for mode in dedup_modes}
+    label_recall = {mode: [] for mode in times}
+
+    for v in videos:
+        frames = decode_video(v, (points,), visual=False)
+
+        t = time.perf_counter()
+        full = extract_overlay_text(v, frames, gate=False, points=points, dedup=False)
+        times["full"] += time.perf_counter() - t
+
+        t = time.perf_counter()
+        gated = extract_overlay_text(v, frames, gate=True, stats=stats, points=points, dedup=False)
+        times["gate"] += time.perf_counter() - t
+
+        outputs = {"full": full, "gate": gated}
+        for mode, (group, dist) in dedup_modes.items():
+            t = time.perf_counter()
+            outputs[mode] = extract_overlay_text(
+                v, frames, gate=True, stats=dedup_stats[mode], points=points,
+                dedup=True, group=group, hash_dist=dist,
+            )
+            times[mode] += time.perf_counter() - t
+            same[mode] += outputs[mode] == gated
+
+        if full:
+            with_text += 1
+            kept += 1 if gated else 0
+            r = _word_recall(gated, full)
+            if r is not None:
+                self_recall.append(r)
+
+        label = labels.get(os.path.splitext(os.path.basename(v))[0])
+        if label:
+            for mode, text in outputs.items():
+                r = _word_recall(text, label)
+                if r is not None:
+                    label_recall[mode].append(r)
+
+    n = len(videos)
+    frames_total = stats["ocr_frames"] or 1
+    gate_calls = stats["ocr_frames"] - stats["ocr_skipped"]
+    print(f"📊 {n} video, {stats['ocr_frames']} OCR karesi ({len(points)} / video)")
+    print(f"   atlanan kare     : {stats['ocr_skipped']} ({stats['ocr_skipped'] / frames_total:.0%})")
+    print(f"   kırpılan kare    : {stats['ocr_cropped']} ({stats['ocr_cropped'] / frames_total:.0%})")
+    print(f"   süre (video başı): filtresiz {times['full'] / n * 1000:.0f} ms, filtreli {times['gate'] / n * 1000:.0f} ms")
+    print(f"   OCR çağrısı      : filtreli {gate_calls}")
+    for mode, (group, dist) in dedup_modes.items():
+        hits = dedup_stats[mode]["ocr_hash_hits"]
+        label = f"paylaşımlı d={dist}" if group else f"video içi d={dist}"
+        print(
+            f"   dedup [{label}]: {hits} kare tekrar okunmadı (OCR çağrısı {gate_calls - hits}), "
+            f"{times[mode] / n * 1000:.0f} ms/video, filtreli sonuçla aynı: {same[mode]}/{n}"
+        )
+    if with_text:
+        print(f"   metin bulunan video korunma oranı: {kept}/{with_text} ({kept / with_text:.0%})")
+    if self_recall:
+        print(f"   kelime recall (filtreli / filtresiz): {sum(self_recall) / len(self_recall):.1%}")
+    for mode in label_recall:
+        vals = label_recall[mode]
+        if vals:
+            print(f"   CSV etiketine göre kelime recall [{mode}]: {sum(vals) / len(vals):.1%} ({len(vals)} video)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+
+import pandas as pd
+
+from analyze_csv import detect_sep
+
+# ======================================================
+# BERT RİSK SKORLAYICI BENCHMARK (CPU)
+# ======================================================
+# Eski sabit batch (gelen sırayla 16'lık, 512'ye kadar padding) ile
+# uzunluğa göre sıralı, token bütçeli batch'leri karşılaştırır.
+#
+# Kullanım:
+#   python bench_risk.py
+#   python bench_risk.py --csv data/csv/Tiktok_veriseti_analizi.csv --max_tokens 8192
+#
+# Backend doğrulama (fp32 ile karşılaştırma, data/csv içindeki tüm CSV'ler):
+#   python bench_risk.py --validate int8 --threads 4
+#   python bench_risk.py --validate onnx
+#
+# Her mod ayrı bir süreçte çalışır; böylece tepe bellek (peak RSS) ölçümleri
+# birbirini etkilemez.
+
+TEXT_COLUMNS = ["caption_raw", "overlay_text_raw", "transcript_raw"]
+
+
+def read_csv_any(path: str, **kwargs):
+    return pd.read_csv(path, sep=detect_sep(path), encoding="utf-8-sig", **kwargs)
+
+
+def load_texts(csv_path: str):
+    df = read_csv_any(csv_path)
+    texts = []
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            texts.extend(df[col].tolist())
+    return texts
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB, macOS: byte
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _score_fixed(texts, batch_size=16):
+    # eski _score_texts davranışı: gelen sırayla sabit boyutlu batch
+    import torch
+    import risk_model as rm
+
+    valid = [str(t).strip() for t in texts if rm._is_meaningful_text(t)]
+    out = []
+    with torch.no_grad():
+        for i in range(0, len(valid), batch_size):
+            enc = rm._tokenizer(
+                valid[i:i + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=512,
+                return_tensors="pt",
+            )
+            enc = {k: v.to(rm._device) for k, v in enc.items()}
+            probs = torch.softmax(rm._model(**enc).logits, dim=-1)[:, rm._risk_index]
+            out.extend(probs.cpu().tolist())
+    return out
+
+
+def _score_bucketed(texts, max_tokens):
+    import risk_model as rm
+
+    valid = [str(t).strip() for t in texts if rm._is_meaningful_text(t)]
+    return rm._predict_texts(valid, 64, max_tokens)
+
+
+def _run_mode(mode, texts, script_dir, max_tokens, threads, queue):
+    import risk_model as rm
+
+    rm.set_risk_backend("torch", threads)
+    rm._load_risk_model(script_dir)
+    base_mb = _peak_rss_mb()
+
+    t = time.perf_counter()
+    if mode == "fixed":
+        scores = _score_fixed(texts)
+    else:
+        scores = _score_bucketed(texts, max_tokens)
+    elapsed = time.perf_counter() - t
+
+    queue.put({
+        "mode": mode,
+        "n": len(scores),
+        "seconds": elapsed,
+        "peak_mb": _peak_rss_mb(),
+        "model_mb": base_mb,
+        "scores": scores,
+    })
+
+
+def _run_backend(backend, csv_paths, script_dir, threads, queue):
+    import risk_model as rm
+
+    rm.set_risk_backend(backend, threads)
+    rm._load_risk_model(script_dir)
+
+    risks = {}
+    rows = 0
+    elapsed = 0.0
+    for path in csv_paths:
+        df = read_csv_any(path)
+        cols = [c for c in TEXT_COLUMNS if c in df.columns]
+        if not cols:
+            continue
+        df = df[cols].copy()
+
+        t = time.perf_counter()
+        rm.add_risk_columns(df, script_dir)
+        elapsed += time.perf_counter() - t
+        rows += len(df)
+
+        risks[path] = {
+            rm.RISK_COLUMNS[c]: df[rm.RISK_COLUMNS[c]].astype(float).tolist()
+            for c in cols
+        }
+
+    queue.put({
+        "backend": backend,
+        "rows": rows,
+        "seconds": elapsed,
+        "peak_mb": _peak_rss_mb(),
+        "risks": risks,
+    })
+
+
+def run_isolated(target, *args):
+    ctx = multiprocessing.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=target, args=(*args, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def validate(backend, csv_paths, script_dir, threads):
+    ref = run_isolated(_run_backend, "torch", csv_paths, script_dir, threads)
+    cand = run_isolated(_run_backend, backend, csv_paths, script_dir, threads)
+
+    print(f"{'csv':32} {'kolon':16} {'max |fark|':>11} {'ort. |fark|':>12}")
+    worst = 0.0
+    for path, cols in ref["risks"].items():
+        for col, ref_vals in cols.items():
+            diffs = [abs(a - b) for a, b in zip(ref_vals, cand["risks"][path][col])]
+            if not diffs:
+                continue
+            worst = max(worst, max(diffs))
+            print(
+                f"{os.path.basename(path)[:32]:32} {col:16} {max(diffs):11.2e} "
+                f"{sum(diffs) / len(diffs):12.2e}"
+            )
+
+    print()
+    for r in (ref, cand):
+        rate = r["rows"] / r["seconds"] if r["seconds"] else 0.0
+        print(f"{r['backend']:6} {r['rows']} satır, {r['seconds']:.2f} sn, {rate:.1f} satır/sn, tepe {r['peak_mb'] or 0:.0f} MB")
+
+    speedup = ref["seconds"] / cand["seconds"] if cand["seconds"] else 0.0
+    print(f"🔍 {backend}: en büyük fark {worst:.2e}, hızlanma {speedup:.2f}x")
+
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--csv",
+        default=os.path.join(script_dir, "data", "csv", "Tiktok_veriseti_analizi.csv"),
+    )
+    parser.add_argument("--max_tokens", type=int, default=8192)
+    parser.add_argument("--threads", type=int, default=0, help="torch thread sayısı (0: varsayılan)")
+    parser.add_argument("--limit", type=int, default=0, help="İlk N metin (0: hepsi)")
+    parser.add_argument(
+        "--validate",
+        choices=["int8", "onnx"],
+        default=None,
+        help="Bu backend'i fp32 ile data/csv üzerinde karşılaştır",
+    )
+    args = parser.parse_args()
+
+    if args.validate:
+        csv_dir = os.path.join(script_dir, "data", "csv")
+        csv_paths = [
+            os.path.join(csv_dir, f)
+            for f in sorted(os.listdir(csv_dir))
+            if f.lower().endswith(".csv")
+        ]
+        validate(args.validate, csv_paths, script_dir, args.threads)
+        return
+
+    texts = load_texts(args.csv)
+    if args.limit:
+        texts = texts[:args.limit]
+    print(f"📄 {os.path.basename(args.csv)}: {len(texts)} metin")
+
+    results = [
+        run_isolated(_run_mode, "fixed", texts, script_dir, args.max_tokens, args.threads),
+        run_isolated(_run_mode, "bucketed", texts, script_dir, args.max_tokens, args.threads),
+    ]
+
+    print(f"{'mod':10} {'metin':>7} {'süre (sn)':>10} {'metin/sn':>9} {'model MB':>9} {'tepe MB':>9}")
+    for r in results:
+        rate = r["n"] / r["seconds"] if r["seconds"] else 0.0
+        print(
+            f"{r['mode']:10} {r['n']:7d} {r['seconds']:10.2f} {rate:9.1f} "
+            f"{r['model_mb'] or 0:9.0f} {r['peak_mb'] or 0:9.0f}"
+        )
+
+    diff = max(
+        (abs(a - b) for a, b in zip(results[0]["scores"], results[1]["scores"])),
+        default=0.0,
+    )
+    print(f"🔍 İki mod arasındaki en büyük skor farkı: {diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import os
+import sys
+import time
+import argparse
+
+from video_frames import decode_video
+from tiktok_urls import video_id_from_url
+from analyze_csv import detect_sep
+
+# ======================================================
+# GÖRSEL ÖRNEKLEME DOĞRULUK RAPORU
+# ======================================================
+# Örneklenmiş brightness/blur değerlerini tam decode (full) ile karşılaştırır.
+#
+# Kullanım:
+#   python bench_visual_sampling.py --dir videolar/
+#   python bench_visual_sampling.py --dir videolar/ --csv data/csv/Tiktok_veriseti_analizi.csv
+#
+# --csv verilirse referans olarak CSV'deki visual_brightness / visual_blur
+# kullanılır (dosya adı <video_id>.mp4 olmalı); verilmezse referans her video
+# için full modda yeniden hesaplanır.
+
+CONFIGS = [
+    {"visual_mode": "fps", "visual_fps": 5.0, "visual_max_width": 0},
+    {"visual_mode": "fps", "visual_fps": 2.0, "visual_max_width": 0},
+    {"visual_mode": "fps", "visual_fps": 1.0, "visual_max_width": 0},
+    {"visual_mode": "seek", "visual_fps": 1.0, "visual_max_width": 0},
+    {"visual_mode": "seek", "visual_fps": 0.5, "visual_max_width": 0},
+    {"visual_mode": "fps", "visual_fps": 2.0, "visual_max_width": 540},
+    {"visual_mode": "seek", "visual_fps": 1.0, "visual_max_width": 540},
+]
+
+
+def _config_name(cfg):
+    name = f"{cfg['visual_mode']}@{cfg['visual_fps']:g}"
+    if cfg["visual_max_width"]:
+        name += f" w{cfg['visual_max_width']}"
+    return name
+
+
+def _stats(video_path, **cfg):
+    t = time.perf_counter()
+    st = decode_video(video_path, (), visual=True, **cfg).visual_stats()
+    return st, time.perf_counter() - t
+
+
+def _load_reference_csv(csv_path):
+    import pandas as pd
+
+    df = pd.read_csv(csv_path, sep=detect_sep(csv_path), encoding="utf-8-sig")
+    ref = {}
+    for _, row in df.iterrows():
+        vid = video_id_from_url(row.get("video_url", ""))
+        brightness, blur = row.get("visual_brightness"), row.get("visual_blur")
+        # boş hücreler NaN gelir (None değil)
+        if not vid or pd.isna(brightness) or pd.isna(blur):
+            continue
+        ref[vid] = {"visual_brightness": brightness, "visual_blur": blur}
+    return ref
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", required=True, help="Örnek .mp4 klasörü")
+    parser.add_argument("--csv", default=None, help="Referans değerlerin olduğu CSV")
+    args = parser.parse_args()
+
+    videos = [
+        os.path.join(args.dir, f)
+        for f in sorted(os.listdir(args.dir))
+        if f.lower().endswith(".mp4")
+    ]
+    reference = _load_reference_csv(args.csv) if args.csv else None
+
+    # config adı -> ölçümler
+    report = {_config_name(c): {"b_err": [], "l_err": [], "time": []} for c in CONFIGS}
+    full_times = []
+    used = 0
+
+    for v in videos:
+        if reference is not None:
+            vid = os.path.splitext(os.path.basename(v))[0]
+            ref = reference.get(vid)
+            if ref is None:
+                continue
+        else:
+            ref, dt = _stats(v)
+            full_times.append(dt)
+            if ref["visual_brightness"] is None:
+                continue
+
+        used += 1
+        ref_b = float(ref["visual_brightness"])
+        ref_l = float(ref["visual_blur"])
+
+        for cfg in CONFIGS:
+            st, dt = _stats(v, **cfg)
+            if st["visual_brightness"] is None:
+                continue
+            r = report[_config_name(cfg)]
+            r["b_err"].append(abs(st["visual_brightness"] - ref_b))
+            r["l_err"].append(abs(st["visual_blur"] - ref_l) / ref_l if ref_l else 0.0)
+            r["time"].append(dt)
+
+    if used == 0:
+        print("⚠️ Karşılaştırılabilir video bulunamadı.")
+        sys.exit(1)
+
+    print(f"📊 {used} video karşılaştırıldı (referans: {'CSV' if reference is not None else 'full decode'})")
+    if full_times:
+        print(f"   full decode ortalama: {sum(full_times) / len(full_times) * 1000:.1f} ms")
+    print()
+    print(f"{'config':18} {'brightness MAE':>15} {'blur ort. %':>12} {'blur max %':>11} {'ms/video':>9}")
+
+    for name, r in report.items():
+        if not r["time"]:
+            continue
+        n = len(r["time"])
+        print(
+            f"{name:18} {sum(r['b_err']) / n:15.2f} {sum(r['l_err']) / n * 100:12.1f} "
+            f"{max(r['l_err']) * 100:11.1f} {sum(r['time']) / n * 1000:9.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+from collections import Counter, deque
+
+from tiktok_page_data import caption_from_page
+
+# ======================================================
+# CAPTION HAVUZU (BİRDEN ÇOK SEKME, OLAY TABANLI BEKLEME)
+# ======================================================
+# Playwright sync API tek thread'den kullanılmalı; eşzamanlılık thread ile değil
+# navigasyonun "commit" anında bırakılmasıyla sağlanır: N sekmede goto başlatılır,
+# sayfalar tarayıcıda paralel yüklenirken en eskisinin caption'ı beklenir.
+# Caption seçicileri tek birleşik seçiciyle beklenir (hangisi önce gelirse);
+# görsel / video / font istekleri route ile hiç yapılmaz.
+#
+# Caption kaynakları (source):
+#   json : önce sayfanın hydration JSON'u (render beklemeden), yoksa DOM
+#   dom  : sadece render edilmiş DOM seçicileri (eski davranış)
+# captions(..., known=) ile akıştan (item_list) bilinen caption'lar için
+# sayfaya hiç gidilmez.
+CAPTION_SOURCES = ("json", "dom")
+CAPTION_SELECTORS = (
+    '[data-e2e="browse-video-desc"]',
+    '[data-e2e="video-desc"]',
+    'h1[data-e2e="browse-video-desc"]',
+    'h1[data-e2e="video-desc"]',
+)
+CAPTION_TIMEOUT = 12000
+GOTO_TIMEOUT = 60000
+BLOCKED_RESOURCES = {"image", "media", "font"}
+
+
+def block_heavy_resources(target):
+    """page veya context üzerinde görsel/video/font isteklerini keser."""
+    def _route(route):
+        if route.request.resource_type in BLOCKED_RESOURCES:
+            route.abort()
+        else:
+            route.continue_()
+
+    target.route("**/*", _route)
+
+
+def read_caption(page, timeout: int = CAPTION_TIMEOUT) -> str:
+    """Seçicilerden ilk gelen beklenir; metin seçici önceliğine göre okunur (yoksa "")."""
+    try:
+        page.wait_for_selector(", ".join(CAPTION_SELECTORS), state="attached", timeout=timeout)
+    except Exception:
+        return ""
+
+    for sel in CAPTION_SELECTORS:
+        try:
+            loc = page.locator(sel).first
+            if not loc.count():
+                continue
+            txt = loc.text_content()
+            if txt and txt.strip():
+                return txt
+        except Exception:
+            continue
+    return ""
+
+
+class CaptionPool:
+    """
+    Aynı context içinde size adet sekme.
+    captions(urls) link sırasıyla (url, caption) üretir; aynı anda en fazla
+    size sayfa yüklenir. urls bir generator olabilir (linkler geldikçe işlenir).
+    """
+
+    def __init__(
+        self,
+        context,
+        size: int = 4,
+        timeout: int = CAPTION_TIMEOUT,
+        block_resources: bool = True,
+        source: str = "json",
+    ):
+        self.timeout = timeout
+        self.source = source
+        self.stats = Counter()
+        self.pages = []
+        for _ in range(max(1, int(size))):
+            page = context.new_page()
+            if block_resources:
+                block_heavy_resources(page)
+            self.pages.append(page)
+
+    @staticmethod
+    def _start(page, url) -> bool:
+        # sadece yanıtın gelmesi beklenir; sayfa arka planda yüklenmeye devam eder
+        try:
+            page.goto(url, wait_until="commit", timeout=GOTO_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    def _read(self, page, url) -> str:
+        if self.source == "json":
+            # hydration script'i HTML ile gelir: render / JS beklemeye gerek yok,
+            # HTML'in tamamen ayrıştırılması yeterli (script yarım okunmasın)
+            try:
+                page.wait_for_load_state("domcontentloaded", timeout=self.timeout)
+            except Exception:
+                pass
+            caption = caption_from_page(page, url)
+            if caption is not None:
+                self.stats["json"] += 1
+                return caption
+
+        self.stats["dom"] += 1
+        return read_caption(page, self.timeout)
+
+    def captions(self, urls, known=None):
+        """
+        known: url → caption ya da None; caption'ı bilinen linkler için
+        sayfaya gidilmez (sıra yine korunur).
+        """
+        urls = iter(urls)
+        free = list(self.pages)
+        inflight = deque()
+
+        def fill():
+            while free:
+                url = next(urls, None)
+                if url is None:
+                    return
+                caption = known(url) if known is not None else None
+                if caption is not None:
+                    self.stats["feed"] += 1
+                    inflight.append((url, None, caption))
+                    continue
+                page = free.pop()
+                inflight.append((url, page, self._start(page, url)))
+
+        fill()
+        while inflight:
+            url, page, state = inflight.popleft()
+            if page is None:
+                caption = state
+            else:
+                caption = self._read(page, url) if state else ""
+                free.append(page)
+            yield url, caption
+            fill()
+
+    def report(self):
+        if self.stats:
+            print(
+                f"📝 Caption: {self.stats.get('feed', 0)} akıştan (sayfaya gitmeden), "
+                f"{self.stats.get('json', 0)} sayfa JSON'undan, {self.stats.get('dom', 0)} DOM'dan"
+            )
+
+    def close(self):
+        for page in self.pages:
+            try:
+                page.close()
+            except Exception:
+                pass
+        self.pages = []
@@ -0,0 +1,236 @@
+import os
+import json
+import time
+import threading
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ======================================================
+# VİDEO İNDİRİCİ (SESSION + RESUME + YARIŞAN API'LER)
+# ======================================================
+# - Tek requests.Session: bağlantılar (TLS dahil) videolar arasında yeniden kullanılır
+# - Host başına eşzamanlı indirme sınırı (per_host)
+# - Çözücü API'ler (tikwm / vvmd) aynı anda sorulur, ilk geçerli mp4 linki kazanır
+# - İndirme <out>.part dosyasına yazılır; kopunca Range ile kaldığı yerden devam
+#   edilir (sunucunun ETag/Last-Modified'ı <out>.part.json'da, If-Range ile doğrulanır)
+# - Geçici hatalarda (bağlantı, 429, 5xx) artan beklemeli tekrar deneme
+#
+# - Küçük klipler (Content-Length <= memory_max_bytes) bellekte duran bir klasöre
+#   (/dev/shm) yazılır; OpenCV/ffmpeg dosya yolu istediği için RAM'deki dosya kullanılır
+#
+# Çözücü adresleri "{url}" yer tutucusu içeren şablonlardır; testte yerel bir
+# HTTP sunucusuna yönlendirilebilir.
+DEFAULT_RESOLVERS = (
+    "https://tikwm.com/api/?url={url}",
+    "https://api.vvmd.cc/tk/?url={url}",
+)
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# host sınırını bekleyen çözücü istekleri de thread tutar; yavaş bir API
+# hızlı olanın sırasını kapmasın diye havuz geniş tutulur
+RESOLVE_WORKERS = 32
+
+
+class DownloadError(Exception):
+    pass
+
+
+def memory_dir():
+    """Bellek tabanlı (tmpfs) geçici klasör; yoksa (örn. macOS) None."""
+    path = "/dev/shm"
+    if os.path.isdir(path) and os.access(path, os.W_OK):
+        return path
+    return None
+
+
+class Downloader:
+    def __init__(
+        self,
+        resolvers=DEFAULT_RESOLVERS,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        per_host: int = 4,
+        retries: int = 3,
+        backoff: float = 0.5,
+        resolve_timeout: float = 20,
+        timeout: float = 30,
+        memory_max_bytes: int = 0,
+    ):
+        self.resolvers = list(resolvers)
+        self.chunk_size = max(1024, int(chunk_size))
+        self.per_host = max(1, int(per_host))
+        self.retries = max(0, int(retries))
+        self.backoff = backoff
+        self.resolve_timeout = resolve_timeout
+        self.timeout = timeout
+        self.memory_max_bytes = max(0, int(memory_max_bytes))
+        self.memory_dir = memory_dir() if self.memory_max_bytes else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max(8, self.per_host * 2))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._host_slots = {}
+        self._host_lock = threading.Lock()
+        self._resolve_pool = ThreadPoolExecutor(
+            max_workers=RESOLVE_WORKERS,
+            thread_name_prefix="resolve",
+        )
+
+    # ---------------- yardımcılar ----------------
+    def _slot(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._host_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _with_retries(self, fn, *args):
+        """fn'i geçici hatalarda backoff * 2^deneme bekleyerek tekrar çağırır."""
+        last = None
+        for attempt in range(self.retries + 1):
+            try:
+                return fn(*args)
+            except (requests.ConnectionError, requests.Timeout, DownloadError) as e:
+                last = e
+                if attempt < self.retries:
+                    time.sleep(self.backoff * (2 ** attempt))
+        raise last
+
+    @staticmethod
+    def _check(r):
+        if r.status_code in RETRY_STATUS:
+            r.close()
+            raise DownloadError(f"HTTP {r.status_code}")
+
+    # ---------------- çözümleme ----------------
+    def _resolve_one(self, template: str, url: str) -> str:
+        api = template.format(url=url)
+        with self._slot(api):
+            r = self.session.get(api, timeout=self.resolve_timeout)
+        self._check(r)
+        if r.status_code != 200:
+            return ""
+        try:
+            return (r.json().get("data") or {}).get("play", "") or ""
+        except ValueError:
+            return ""
+
+    def resolve(self, url: str) -> str:
+        """Tüm çözücüleri aynı anda sorar; ilk dolu mp4 linkini döner (yoksa "")."""
+        futures = [
+            self._resolve_pool.submit(self._with_retries, self._resolve_one, t, url)
+            for t in self.resolvers
+        ]
+        for fut in as_completed(futures):
+            try:
+                mp4 = fut.result()
+            except Exception:
+                continue
+            if mp4:
+                # geride kalan istekler arka planda biter, sonuçları kullanılmaz
+                return mp4
+        return ""
+
+    # ---------------- indirme ----------------
+    def _fetch_once(self, mp4: str, out: str, small=None):
+        if small is not None:
+            # daha önce RAM'e yazılmaya başlanmış küçük klip varsa oradan devam
+            small_out, _ = small
+            if os.path.exists(small_out + ".part"):
+                out, small = small_out, None
+
+        part = out + ".part"
+        meta_path = part + ".json"
+
+        headers = {}
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        meta = {}
+        if offset and os.path.exists(meta_path):
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                meta = {}
+
+        validator = meta.get("etag") or meta.get("last_modified")
+        if offset and validator:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = validator
+        else:
+            offset = 0
+
+        with self._slot(mp4):
+            r = self.session.get(mp4, stream=True, timeout=self.timeout, headers=headers)
+            try:
+                self._check(r)
+
+                if r.status_code == 416 and offset:
+                    # .part zaten tam
+                    os.replace(part, out)
+                    return out
+                if r.status_code == 206 and offset:
+                    mode = "ab"
+                elif r.status_code == 200:
+                    mode, offset = "wb", 0
+                else:
+                    raise DownloadError(f"HTTP {r.status_code}")
+
+                if mode == "wb" and small is not None:
+                    small_out, small_max = small
+                    size = int(r.headers.get("Content-Length") or 0)
+                    if 0 < size <= small_max:
+                        out = small_out
+                        part = out + ".part"
+                        meta_path = part + ".json"
+
+                if mode == "wb":
+                    meta = {
+                        "url": mp4,
+                        "etag": r.headers.get("ETag"),
+                        "last_modified": r.headers.get("Last-Modified"),
+                    }
+                    with open(meta_path, "w", encoding="utf-8") as f:
+                        json.dump(meta, f)
+
+                with open(part, mode) as f:
+                    for c in r.iter_content(self.chunk_size):
+                        if c:
+                            f.write(c)
+            except requests.RequestException as e:
+                # yarım kalan .part bir sonraki denemede Range ile tamamlanır
+                raise DownloadError(str(e))
+            finally:
+                r.close()
+
+        os.replace(part, out)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        return out
+
+    def download(self, url: str, out: str, in_memory: bool = True):
+        """
+        TikTok linkini çözüp out'a indirir; başarısızsa nedenini yazıp None döner.
+        in_memory=True ise boyutu memory_max_bytes'ı geçmeyen klipler out yerine
+        bellek klasörüne yazılır; dosyanın gerçek yolu döner.
+        """
+        mp4 = self.resolve(url)
+        if not mp4:
+            print(f"⚠️ İndirme linki bulunamadı: {url}")
+            return None
+
+        small = None
+        if in_memory and self.memory_dir:
+            small = (os.path.join(self.memory_dir, "tiktok_" + os.path.basename(out)), self.memory_max_bytes)
+        try:
+            return self._with_retries(self._fetch_once, mp4, out, small)
+        except Exception as e:
+            print(f"⚠️ İndirilemedi: {url} ({e})")
+            return None
+
+    def close(self):
+        self._resolve_pool.shutdown(wait=False)
+        self.session.close()
@@ -1,89 +1,321 @@
-import cv2
 import os
-from deepface import DeepFace
+import time
+import atexit
+from collections import Counter
+
+import lazy_deps
+from video_frames import VideoFrames, decode_video, FACE_POINTS
+from micro_batch import MicroBatcher
 
 # ======================================================
 # FACE FEATURES (5 FRAME – 1 TANESİ YETER)
 # ======================================================
+# İki aşamalı tespit:
+#   1) ucuz ön filtre: küçültülmüş karede OpenCV Haar cascade
+#   2) sadece ön filtreden geçen karelerde DeepFace dedektörü (detector_backend)
+# Duygu modeli süreç başına bir kez yüklenir (lazy_deps) ve bulunan yüzler
+# tek predict çağrısında (batch) skorlanır. Scraper'da tespit analiz
+# süreçlerinde yapılır, yüz kırpıntıları ana süreçteki EmotionBatcher'da
+# videolar arası toplanıp birlikte skorlanır.
+EMOTION_LABELS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+FACE_DETECTORS = ("opencv", "ssd", "mtcnn", "retinaface", "mediapipe", "yunet")
+DEFAULT_DETECTOR = "opencv"     # DeepFace.analyze varsayılanı
 
-def extract_face_features(video_path: str):
-    """
-    Videodan 5 farklı frame alır.
-    Eğer bu frame'lerin herhangi birinde yüz bulunursa:
-        - face_detected = True
-        - dominant emotion + score döner
-    Hiçbir frame'de yüz yoksa:
-        - face_detected = False
-        - emotion = None
-        - score = 0.0
-    """
-
-    if not video_path or not os.path.exists(video_path):
-        return {
-            "face_detected": False,
-            "face_dominant_emotion": None,
-            "face_emotion_score": 0.0,
-        }
-
-    cap = cv2.VideoCapture(video_path)
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-
-    if frame_count <= 0:
-        cap.release()
-        return {
-            "face_detected": False,
-            "face_dominant_emotion": None,
-            "face_emotion_score": 0.0,
-        }
-
-    # Videonun %10, %30, %50, %70, %90 noktaları
-    frame_indices = [
-        int(frame_count * 0.10),
-        int(frame_count * 0.30),
-        int(frame_count * 0.50),
-        int(frame_count * 0.70),
-        int(frame_count * 0.90),
-    ]
-
-    for idx in frame_indices:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
-        ret, frame = cap.read()
-        if not ret:
-            continue
+PREFILTER_WIDTH = 480
+PREFILTER_MIN_FACE = 24         # küçültülmüş karede piksel
 
-        try:
-            analysis = DeepFace.analyze(
-                frame,
-                actions=["emotion"],
-                enforce_detection=True,
-                silent=True,
-            )
 
-            if isinstance(analysis, list):
-                analysis = analysis[0]
+def _load_face_cascade():
+    cv2 = lazy_deps.module("cv2")
+    return cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
 
-            dominant = analysis.get("dominant_emotion")
-            emotions = analysis.get("emotion", {})
 
-            if dominant and dominant in emotions:
-                score = float(emotions[dominant])
+def _load_emotion_model():
+    DeepFace = lazy_deps.module("deepface.DeepFace")
+    try:
+        client = DeepFace.build_model(model_name="Emotion", task="facial_attribute")
+    except TypeError:
+        # eski deepface sürümleri
+        client = DeepFace.build_model("Emotion")
+    # yeni sürümlerde keras modeli client.model içinde
+    return getattr(client, "model", client)
 
-                cap.release()
-                return {
-                    "face_detected": True,
-                    "face_dominant_emotion": dominant,
-                    "face_emotion_score": round(score, 2),
-                }
 
-        except Exception:
-            # Bu frame'de yüz yok → diğer frame'e geç
-            continue
+lazy_deps.register("haar_face_cascade", _load_face_cascade)
+lazy_deps.register("deepface_emotion_model", _load_emotion_model)
 
-    cap.release()
 
-    # Hiçbir frame'de yüz bulunamadı
+def _no_face():
     return {
         "face_detected": False,
         "face_dominant_emotion": None,
         "face_emotion_score": 0.0,
     }
+
+
+def has_face_candidate(frame) -> bool:
+    """Ucuz Haar ön filtresi; False ise ağır dedektör hiç çalışmaz."""
+    cv2 = lazy_deps.module("cv2")
+
+    h, w = frame.shape[:2]
+    scale = PREFILTER_WIDTH / w if w > PREFILTER_WIDTH else 1.0
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    if scale < 1.0:
+        gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+
+    faces = lazy_deps.get("haar_face_cascade").detectMultiScale(
+        gray,
+        scaleFactor=1.1,
+        minNeighbors=3,
+        minSize=(PREFILTER_MIN_FACE, PREFILTER_MIN_FACE),
+    )
+    return len(faces) > 0
+
+
+def _detect_face(frame, detector: str):
+    """İlk yüzün kırpılmış hali (RGB, 0-1) ya da None."""
+    DeepFace = lazy_deps.module("deepface.DeepFace")
+    objs = DeepFace.extract_faces(
+        img_path=frame,
+        detector_backend=detector,
+        enforce_detection=False,
+        align=True,
+    )
+    for obj in objs or []:
+        # enforce_detection=False iken yüz yoksa tüm kare confidence=0 ile döner
+        if obj.get("confidence", 0) > 0:
+            return obj["face"]
+    return None
+
+
+def _emotion_input(face):
+    """DeepFace'in ön işlemesi: BGR → kareye pad → gri 48x48."""
+    cv2 = lazy_deps.module("cv2")
+    np = lazy_deps.module("numpy")
+
+    img = np.ascontiguousarray(face[:, :, ::-1], dtype=np.float32)
+    h, w = img.shape[:2]
+    side = max(h, w)
+    square = np.zeros((side, side, 3), dtype=np.float32)
+    y0, x0 = (side - h) // 2, (side - w) // 2
+    square[y0:y0 + h, x0:x0 + w] = img
+
+    gray = cv2.cvtColor(square, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, (48, 48))
+
+
+def predict_emotions(faces):
+    """Yüz listesi → [(dominant, skor), ...]; tek batch predict."""
+    if not faces:
+        return []
+    np = lazy_deps.module("numpy")
+
+    model = lazy_deps.get("deepface_emotion_model")
+    batch = np.stack([_emotion_input(f) for f in faces])[..., None]
+    preds = model.predict(batch, verbose=0)
+
+    out = []
+    for p in preds:
+        total = float(p.sum()) or 1.0
+        i = int(p.argmax())
+        out.append((EMOTION_LABELS[i], round(100.0 * float(p[i]) / total, 2)))
+    return out
+
+
+def _first_face(frames: VideoFrames, detector: str, prefilter: bool, stats: Counter):
+    for frame in frames.sample(FACE_POINTS):
+        stats["face_frames"] += 1
+        t = time.perf_counter()
+        try:
+            if prefilter and not has_face_candidate(frame):
+                stats["face_prefiltered"] += 1
+                continue
+            face = _detect_face(frame, detector)
+        except Exception:
+            continue
+        finally:
+            stats["face_detect_seconds"] += time.perf_counter() - t
+
+        if face is not None:
+            return face
+    return None
+
+
+def detect_faces(
+    items,
+    detector: str = DEFAULT_DETECTOR,
+    prefilter: bool = True,
+    stats: Counter = None,
+):
+    """
+    items: [(video_path, frames veya None), ...] → her video için ilk yüz (ya da None).
+    %10/30/50/70/90 karelerinde sırayla aranır; ilk bulunan yeter.
+    """
+    if stats is None:
+        stats = Counter()
+
+    faces = []
+    for video_path, frames in items:
+        if not video_path or not os.path.exists(video_path):
+            faces.append(None)
+            continue
+        if frames is None:
+            frames = decode_video(video_path, (FACE_POINTS,), visual=False)
+        faces.append(_first_face(frames, detector, prefilter, stats))
+    return faces
+
+
+def _score_faces(faces):
+    try:
+        return predict_emotions(faces)
+    except Exception:
+        # duygu modeli yüklenemedi/çalışmadı: yüz bulundu ama duygu yok sayılmaz,
+        # eski yol (DeepFace.analyze) ile tek tek denenir
+        return [_analyze_legacy(face) for face in faces]
+
+
+def face_result(emotion):
+    """(dominant, skor) ya da None → CSV kolonları."""
+    if emotion is None:
+        return _no_face()
+    dominant, score = emotion
+    return {
+        "face_detected": True,
+        "face_dominant_emotion": dominant,
+        "face_emotion_score": score,
+    }
+
+
+def extract_face_features_batch(
+    items,
+    detector: str = DEFAULT_DETECTOR,
+    prefilter: bool = True,
+    stats: Counter = None,
+):
+    """
+    items: [(video_path, frames veya None), ...]
+    Bulunan yüzlerin duyguları videolar arası tek batch'te hesaplanır.
+    stats verilirse face_frames / face_prefiltered / face_crops ve
+    face_detect_seconds / face_emotion_seconds artar.
+    """
+    if stats is None:
+        stats = Counter()
+
+    faces = detect_faces(items, detector, prefilter, stats)
+    found = [f for f in faces if f is not None]
+    if not found:
+        return [_no_face() for _ in items]
+
+    stats["face_crops"] += len(found)
+    t = time.perf_counter()
+    emotions = iter(_score_faces(found))
+    stats["face_emotion_seconds"] += time.perf_counter() - t
+
+    return [face_result(next(emotions) if f is not None else None) for f in faces]
+
+
+# ======================================================
+# VİDEOLAR ARASI DUYGU BATCH'İ
+# ======================================================
+# Her video en fazla bir yüz kırpıntısı üretir; video başına predict çağrısı
+# hep 1 elemanlı olur. Eşzamanlı işlenen videoların (indirme thread'leri)
+# kırpıntıları batch_size dolana ya da batch_wait bitene kadar toplanır ve
+# tek predict'te skorlanır (micro_batch.MicroBatcher, Whisper batch'i ile ortak).
+FACE_BATCH_WAIT = 0.2
+
+
+class EmotionBatcher:
+    def __init__(self, batch_size: int = 1, batch_wait: float = FACE_BATCH_WAIT):
+        self.batcher = MicroBatcher(
+            self._run, batch_size=batch_size, batch_wait=batch_wait, name="face-emotion-batch"
+        )
+
+    def score(self, face, stats: Counter = None):
+        """
+        Yüz kırpıntısı → (dominant, skor) ya da None; batch tamamlanana kadar bekler.
+        Yüz verildiği hâlde None dönmesi duygu skorunun hesaplanamadığı anlamına gelir.
+        """
+        if face is None:
+            return None
+        if stats is None:
+            stats = Counter()
+        return self.batcher.submit((face, stats))
+
+    def _run(self, jobs):
+        t = time.perf_counter()
+        emotions = _score_faces([face for face, _ in jobs])
+        share = (time.perf_counter() - t) / len(jobs)
+
+        jobs[0][1]["face_emotion_batches"] += 1
+        for _, stats in jobs:
+            stats["face_crops"] += 1
+            stats["face_emotion_seconds"] += share
+        return emotions
+
+    def close(self):
+        self.batcher.close()
+
+
+_batcher = None
+
+
+def get_emotion_batcher(**opts) -> EmotionBatcher:
+    """İlk çağrıdaki opts (batch_size / batch_wait) kullanılır."""
+    global _batcher
+    if _batcher is None:
+        _batcher = EmotionBatcher(**opts)
+        atexit.register(close_emotion_batcher)
+    return _batcher
+
+
+def close_emotion_batcher():
+    global _batcher
+    if _batcher is not None:
+        _batcher.close()
+        _batcher = None
+
+
+def _analyze_legacy(face):
+    DeepFace = lazy_deps.module("deepface.DeepFace")
+    try:
+        analysis = DeepFace.analyze(
+            (face[:, :, ::-1] * 255).astype("uint8"),
+            actions=["emotion"],
+            detector_backend="skip",
+            enforce_detection=False,
+            silent=True,
+        )
+    except Exception:
+        return None
+
+    if isinstance(analysis, list):
+        analysis = analysis[0]
+    dominant = analysis.get("dominant_emotion")
+    emotions = analysis.get("emotion", {})
+    if dominant and dominant in emotions:
+        return dominant, round(float(emotions[dominant]), 2)
+    return None
+
+
+def extract_face_features(
+    video_path: str,
+    frames: VideoFrames = None,
+    detector: str = DEFAULT_DETECTOR,
+    prefilter: bool = True,
+    stats: Counter = None,
+):
+    """
+    Videodan 5 farklı frame alır.
+    Eğer bu frame'lerin herhangi birinde yüz bulunursa:
+        - face_detected = True
+        - dominant emotion + score döner
+    Hiçbir frame'de yüz yoksa:
+        - face_detected = False
+        - emotion = None
+        - score = 0.0
+
+    frames verilirse (video_frames.decode_video) video tekrar açılmaz.
+    """
+    return extract_face_features_batch(
+        [(video_path, frames)], detector=detector, prefilter=prefilter, stats=stats
+    )[0]
@@ -0,0 +1,189 @@
+from collections import Counter
+
+from tiktok_urls import normalize_video_url
+from tiktok_page_data import FeedCaptions
+from link_harvester import harvest_links
+from tiktok_session import wait_for_tiktok_ready, save_storage_state
+
+# ======================================================
+# ÇOKLU SORGU (HASHTAG / KULLANICI) AKIŞ SEKMELERİ
+# ======================================================
+# Tek tarayıcı context'i tüm sorgular boyunca açık kalır; sorgular en fazla
+# tabs adet akış sekmesinde sırayla (round-robin) kaydırılır ve linkleri tek bir
+# akışta birleştirilir. İlk sorgu tek başına açılır: doğrulama / captcha bir kez
+# geçilir, çerezler kaydedilir ve diğer sekmeler bu oturumla açılır. Biten
+# sorgunun sekmesi kapanır, sıradaki sorgu yeni sekmede başlar.
+#
+# Sorgu yazımı:
+#   #etiket  /  hashtag:etiket  /  tag:etiket   → hashtag
+#   @kullanici  /  user:kullanici              → kullanıcı
+#   önek yoksa varsayılan tür (--mode, yoksa hashtag)
+QUERY_KINDS = ("hashtag", "user")
+_KIND_ALIASES = {"hashtag": "hashtag", "tag": "hashtag", "user": "user"}
+FEED_GOTO_TIMEOUT = 120000
+
+
+def parse_query(text, default_kind: str = "hashtag"):
+    """"#x" / "@x" / "tür:x" / "x" → (tür, değer); boşsa None."""
+    s = str(text or "").strip()
+    if s.startswith("#"):
+        kind, value = "hashtag", s[1:]
+    elif s.startswith("@"):
+        kind, value = "user", s[1:]
+    else:
+        prefix, sep, rest = s.partition(":")
+        if sep and prefix.strip().lower() in _KIND_ALIASES:
+            return parse_query(rest, _KIND_ALIASES[prefix.strip().lower()])
+        kind, value = default_kind, s
+
+    value = value.strip().lstrip("#@").strip()
+    return (kind, value) if value else None
+
+
+def read_queries_file(path) -> list:
+    """Satır başına bir sorgu; boş satırlar atlanır."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def parse_queries(items, default_kind: str = "hashtag") -> list:
+    """Sorgu listesi (sıra korunur, tekrarlar atılır)."""
+    out = []
+    for item in items:
+        q = parse_query(item, default_kind)
+        if q is not None and q not in out:
+            out.append(q)
+    return out
+
+
+def feed_url(kind: str, value: str) -> str:
+    if kind == "user":
+        return f"https://www.tiktok.com/@{value}"
+    return f"https://www.tiktok.com/tag/{value}"
+
+
+class FeedScheduler:
+    """
+    links() tüm sorguların yeni video linklerini round-robin üretir
+    (her sorgu için en fazla limit adet; birden çok sorguda çıkan video bir kez).
+    source_for(url) linkin geldiği sorguyu, caption_for(url) akış yanıtlarından
+    bilinen caption'ı verir (run_pipeline'ın feed argümanı).
+    """
+
+    def __init__(self, context, queries, limit, known=None, tabs: int = 2, storage_state=None):
+        self.context = context
+        self.queries = list(queries)
+        self.limit = limit
+        self.known = known
+        self.tabs = max(1, int(tabs))
+        self.storage_state = storage_state
+        self.total = limit * len(self.queries)
+        self.feeds = []
+        self.sources = {}
+        self.counts = Counter()
+        self.duplicates = 0
+        self._active = []
+        self._saved = False
+
+    def _start(self, kind, value):
+        page = self.context.new_page()
+        # kaydırırken gelen item_list yanıtlarındaki caption'lar
+        feed = FeedCaptions(page)
+        self.feeds.append(feed)
+        try:
+            # sadece yanıt beklenir; sayfa diğer sekmelerle paralel yüklenir
+            page.goto(feed_url(kind, value), wait_until="commit", timeout=FEED_GOTO_TIMEOUT)
+        except Exception as e:
+            print(f"⚠️ Akış açılamadı ({kind}: {value}):", e)
+            feed.close()
+            page.close()
+            return None
+        print(f"🌐 Akış açıldı: {kind} {value}")
+        return {"kind": kind, "value": value, "page": page, "feed": feed, "links": None}
+
+    def _ready(self, tab):
+        page = tab["page"]
+        if wait_for_tiktok_ready(page) and not self._saved:
+            save_storage_state(self.context, self.storage_state)
+            self._saved = True
+        tab["feed"].harvest_html()
+        tab["links"] = harvest_links(page, self.limit, known=self.known)
+
+    def _next(self, tab):
+        # arka plandaki sekmede kaydırma / rAF kısıtlanır; çalışılan sekme öne alınır
+        try:
+            tab["page"].bring_to_front()
+        except Exception:
+            pass
+        if tab["links"] is None:
+            self._ready(tab)
+        return next(tab["links"], None)
+
+    def _close(self, tab):
+        if tab["links"] is not None:
+            tab["links"].close()
+        tab["feed"].close()
+        try:
+            tab["page"].close()
+        except Exception:
+            pass
+
+    def links(self):
+        pending = list(self.queries)
+        active = self._active
+
+        def fill(n):
+            while pending and len(active) < n:
+                tab = self._start(*pending.pop(0))
+                if tab is not None:
+                    active.append(tab)
+
+        # ilk sorgu tek başına: doğrulama bir kez, diğerleri kayıtlı oturumla
+        fill(1)
+        i = 0
+        while active:
+            i %= len(active)
+            tab = active[i]
+            first = tab["links"] is None
+            link = self._next(tab)
+            if first:
+                fill(self.tabs)
+
+            if link is None:
+                self._close(tab)
+                active.remove(tab)
+                fill(self.tabs)
+                continue
+
+            i += 1
+            key = normalize_video_url(link)
+            if key in self.sources:
+                self.duplicates += 1
+                continue
+            self.sources[key] = (tab["kind"], tab["value"])
+            self.counts[(tab["kind"], tab["value"])] += 1
+            yield link
+
+    def source_for(self, url):
+        return self.sources.get(normalize_video_url(url), ("", ""))
+
+    def caption_for(self, url):
+        for feed in self.feeds:
+            caption = feed.caption_for(url)
+            if caption is not None:
+                return caption
+        return None
+
+    def report(self):
+        if len(self.queries) < 2:
+            return
+        print("📋 Sorgu başına yeni video:")
+        for kind, value in self.queries:
+            print(f"   {kind:8} {value:30} {self.counts.get((kind, value), 0)}")
+        if self.duplicates:
+            print(f"   (birden çok sorguda çıkan {self.duplicates} video bir kez işlendi)")
+
+    def close(self):
+        for tab in self._active:
+            self._close(tab)
+        self._active.clear()
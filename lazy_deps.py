@@ -0,0 +1,80 @@
+import time
+import importlib
+import threading
+
+# ======================================================
+# AĞIR BAĞIMLILIKLAR İÇİN LAZY REGISTRY
+# ======================================================
+# torch, transformers, cv2, easyocr, deepface, playwright gibi paketler ve
+# modeller import anında değil, ilk kullanıldıkları anda yüklenir.
+# Her yüklemenin süresi tutulur; report() ile bileşen bazında dökülür.
+#
+#   cv2 = lazy_deps.module("cv2")
+#   lazy_deps.register("easyocr_reader", lambda: ...)
+#   reader = lazy_deps.get("easyocr_reader")
+
+_loaders = {}
+_values = {}
+_timings = []       # (isim, toplam sn, kendi sn) yüklenme sırasıyla
+_stack = []         # iç içe yüklemelerde çocuk sürelerini ebeveynden düşmek için
+_lock = threading.RLock()
+
+
+def register(name: str, loader):
+    _loaders[name] = loader
+
+
+def get(name: str):
+    if name in _values:
+        return _values[name]
+
+    with _lock:
+        if name in _values:
+            return _values[name]
+
+        _stack.append(0.0)
+        t = time.perf_counter()
+        try:
+            value = _loaders[name]()
+        finally:
+            total = time.perf_counter() - t
+            children = _stack.pop()
+            if _stack:
+                _stack[-1] += total
+
+        _values[name] = value
+        _timings.append((name, total, total - children))
+        return value
+
+
+def module(name: str):
+    """Modülü ilk çağrıda import eder (importlib), sonra aynı nesneyi döner."""
+    if name not in _loaders:
+        register(name, lambda: importlib.import_module(name))
+    return get(name)
+
+
+def is_loaded(name: str) -> bool:
+    return name in _values
+
+
+def record(name: str, seconds: float):
+    """Başka süreçte ölçülen yükleme sürelerini (örn. Whisper worker) rapora ekler."""
+    with _lock:
+        _timings.append((name, seconds, seconds))
+
+
+def report(startup_seconds: float = None):
+    print("⏱️ Başlangıç / yükleme profili:")
+    if startup_seconds is not None:
+        print(f"   {'script importları':34} {startup_seconds:8.2f} sn")
+
+    if not _timings:
+        print("   (lazy bileşen yüklenmedi)")
+        return
+
+    for name, total, own in _timings:
+        extra = f" (kendi {own:.2f} sn)" if total - own > 0.005 else ""
+        print(f"   {name:34} {total:8.2f} sn{extra}")
+
+    print(f"   {'toplam (kendi süreler)':34} {sum(own for _, _, own in _timings):8.2f} sn")
@@ -0,0 +1,142 @@
+from tiktok_urls import normalize_video_url
+
+# ======================================================
+# SONSUZ KAYDIRMA İLE LİNK TOPLAMA
+# ======================================================
+# Sayfaya bir MutationObserver eklenir; DOM'a yeni gelen video linkleri tarayıcı
+# tarafında kuyruğa atılır ve her turda sadece yeni linkler alınır (tüm anchor'lar
+# tekrar taranmaz). Her kaydırmadan sonra sabit sleep yerine link sayısının
+# artması beklenir; art arda MAX_IDLE_ROUNDS kez artmazsa akış bitmiş sayılır.
+# harvest_links bir generator'dır: linkler geldikçe caption / indirme tarafına akar.
+HARVEST_JS = """
+() => {
+    if (window.__linkHarvest) return window.__linkHarvest.count();
+
+    const SEL = "a[href*='/video/']";
+    const seen = new Set();
+    const queue = [];
+    const add = (a) => {
+        const href = a.href;
+        if (href && href.includes("/video/") && !seen.has(href)) {
+            seen.add(href);
+            queue.push(href);
+        }
+    };
+    const scan = (node) => {
+        if (node.nodeType !== 1) return;
+        if (node.matches(SEL)) add(node);
+        node.querySelectorAll(SEL).forEach(add);
+    };
+
+    document.querySelectorAll(SEL).forEach(add);
+    new MutationObserver((mutations) => {
+        for (const m of mutations) {
+            if (m.type === "attributes") scan(m.target);
+            else m.addedNodes.forEach(scan);
+        }
+    }).observe(document.body, {
+        childList: true, subtree: true, attributes: true, attributeFilter: ["href"],
+    });
+
+    window.__linkHarvest = {
+        drain: () => queue.splice(0, queue.length),
+        count: () => seen.size,
+    };
+    return seen.size;
+}
+"""
+
+SCROLL_STEP = 8000
+SCROLL_WAIT = 6000      # ms — kaydırma sonrası yeni link bekleme süresi
+MAX_IDLE_ROUNDS = 3
+
+
+def _scroll(page):
+    try:
+        page.mouse.wheel(0, SCROLL_STEP)
+    except Exception:
+        try:
+            page.evaluate(f"() => window.scrollBy(0, {SCROLL_STEP})")
+        except Exception:
+            pass
+
+
+def _drain(page):
+    """
+    Yeni linkler. Sayfa kaydırma sırasında yenilenmiş / yönlenmişse (örn. doğrulama)
+    gözlemci gitmiştir: yeni sayfaya bir kez yeniden kurulur (mevcut linkler tekrar
+    gelir, tekrarlar harvest_links'te elenir). O da olmazsa None.
+    """
+    try:
+        return page.evaluate("() => window.__linkHarvest.drain()")
+    except Exception:
+        pass
+
+    try:
+        page.wait_for_load_state("domcontentloaded", timeout=SCROLL_WAIT)
+    except Exception:
+        pass
+    try:
+        page.evaluate(HARVEST_JS)
+        return page.evaluate("() => window.__linkHarvest.drain()")
+    except Exception as e:
+        print("⚠️ Link toplama durdu (sayfa değişti):", e)
+        return None
+
+
+def harvest_links(page, limit, known=None, scroll_wait=SCROLL_WAIT, max_idle_rounds=MAX_IDLE_ROUNDS):
+    """
+    limit kadar YENİ video linki üretir (sayfa sırasıyla, normalize edilmiş URL'e göre tekil).
+    known (UrlIndex / set) verilirse daha önce kaydedilmiş videolar atlanır.
+    """
+    try:
+        count = page.evaluate(HARVEST_JS)
+    except Exception as e:
+        print("⚠️ Link toplama başlatılamadı:", e)
+        return
+
+    seen = set()
+    produced = skipped = idle = 0
+
+    try:
+        while produced < limit:
+            batch = _drain(page)
+            if batch is None:
+                return
+
+            for link in batch:
+                key = normalize_video_url(link)
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                if known is not None and key in known:
+                    skipped += 1
+                    continue
+
+                yield link
+                produced += 1
+                if produced >= limit:
+                    return
+
+            _scroll(page)
+            try:
+                page.wait_for_function(
+                    "n => window.__linkHarvest.count() > n",
+                    arg=count,
+                    timeout=scroll_wait,
+                )
+                idle = 0
+            except Exception:
+                # akış büyümedi: sayfa sonu, yavaş ağ ya da engel
+                idle += 1
+                if idle >= max_idle_rounds:
+                    print(f"ℹ️ Akış büyümüyor, {produced} yeni link ile duruldu.")
+                    return
+            try:
+                count = page.evaluate("() => window.__linkHarvest.count()")
+            except Exception:
+                # sayfa yenilendi: bir sonraki drain gözlemciyi yeniden kurar
+                count = 0
+    finally:
+        if skipped:
+            print(f"⏭️ Daha önce kayıtlı {skipped} video atlandı.")
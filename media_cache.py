@@ -0,0 +1,135 @@
+import os
+import time
+import threading
+from collections import Counter
+
+# ======================================================
+# MEDYA CACHE'İ (İNDİRİLEN VİDEOLAR, LRU BOYUT SINIRI)
+# ======================================================
+# Videolar analizden sonra silinmek yerine <root>/<video_id[-2:]>/<video_id>.mp4
+# altında tutulur. TikTok video ID'si içeriği değişmeyen bir anahtardır, bu yüzden
+# aynı video yeni bir model / özellik için tekrar indirilmez.
+# Son kullanım zamanı dosyanın mtime'ıdır; toplam boyut max_mb'ı aşınca en
+# eski kullanılan dosyalar silinir. Yarım indirmeler (.part) da burada kalır ve
+# sonraki indirmede kaldığı yerden devam eder; son PART_GRACE saniyede yazılmış
+# .part / .part.json dosyaları sürmekte olan indirmedir, silinmez.
+MEDIA_CACHE_DIR = "tiktok_media_cache"
+PART_GRACE = 600    # sn
+
+
+class MediaCache:
+    def __init__(self, root: str, max_mb: float = 4096):
+        self.root = root
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb and max_mb > 0 else 0
+        self.lock = threading.Lock()
+        self.in_use = Counter()     # analizi süren dosyalar silinmez
+        os.makedirs(self.root, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def path_for(self, video_id: str) -> str:
+        """Videonun cache'teki yolu (dosya henüz olmayabilir); ara klasörü oluşturur."""
+        folder = os.path.join(self.root, video_id[-2:] or "_")
+        os.makedirs(folder, exist_ok=True)
+        return os.path.join(folder, f"{video_id}.mp4")
+
+    def get(self, video_id: str):
+        """
+        Cache'teki dosya yolu ya da None; bulunan dosyanın kullanım zamanı yenilenir.
+        Dönen dosya release() çağrılana kadar silinmez.
+        """
+        if not video_id:
+            return None
+        path = self.path_for(video_id)
+        with self.lock:
+            if os.path.exists(path):
+                os.utime(path)
+                self.in_use[path] += 1
+                self.hits += 1
+                return path
+            self.misses += 1
+        return None
+
+    def added(self, video_id: str) -> str:
+        """
+        path_for() yoluna yeni dosya indirildikten sonra çağrılır; gerekirse yer açar.
+        Dosya release() çağrılana kadar silinmez.
+        """
+        path = self.path_for(video_id)
+        with self.lock:
+            self.in_use[path] += 1
+        self.evict()
+        return path
+
+    def release(self, path: str):
+        with self.lock:
+            self.in_use[path] -= 1
+            if self.in_use[path] <= 0:
+                del self.in_use[path]
+
+    def _files(self):
+        for folder, _, names in os.walk(self.root):
+            for name in names:
+                path = os.path.join(folder, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    @staticmethod
+    def _downloading(path: str, now: float) -> bool:
+        """.part / .part.json dosyası yakın zamanda yazıldıysa (indirme sürüyor) True."""
+        if path.endswith(".part.json"):
+            part = path[:-len(".json")]
+        elif path.endswith(".part"):
+            part = path
+        else:
+            return False
+
+        mtimes = []
+        for p in (part, part + ".json"):
+            try:
+                mtimes.append(os.path.getmtime(p))
+            except OSError:
+                pass
+        return bool(mtimes) and now - max(mtimes) < PART_GRACE
+
+    def size_bytes(self) -> int:
+        return sum(size for _, size, _ in self._files())
+
+    def evict(self):
+        """Toplam boyut sınırı aşıldıysa en eski kullanılan dosyaları siler."""
+        if not self.max_bytes:
+            return 0
+
+        now = time.time()
+        with self.lock:
+            files = sorted(self._files(), key=lambda f: f[2])
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            for path, size, _ in files:
+                if total <= self.max_bytes:
+                    break
+                if path in self.in_use or self._downloading(path, now):
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+
+            self.evicted += removed
+            return removed
+
+    def report(self):
+        lookups = self.hits + self.misses
+        if not lookups:
+            return
+        print(
+            f"🎞️ Medya cache: {self.hits}/{lookups} video diskten alındı, "
+            f"{self.evicted} dosya silindi, boyut {self.size_bytes() / 1024 / 1024:.0f} MB"
+        )
@@ -0,0 +1,88 @@
+import time
+import threading
+
+# ======================================================
+# MİKRO-BATCH (EŞZAMANLI İSTEKLERİ TEK ÇAĞRIDA TOPLAMA)
+# ======================================================
+# Farklı thread'lerden gelen istekler en fazla batch_wait saniye bekletilip
+# batch_size'a kadar birleştirilir ve tek run(items) çağrısında işlenir;
+# run girdi sırasıyla sonuç listesi döner. İstekler tek dispatcher thread'inde
+# işlenir (model aynı anda tek çağrı görür).
+# run hata verirse ya da eksik sonuç dönerse o batch'teki isteklerin sonucu
+# None olur; bekleyen thread'ler her durumda uyandırılır (asılı kalmaz).
+#
+#   batcher = MicroBatcher(lambda items: [f(x) for x in items], batch_size=4)
+#   result = batcher.submit(item)      # batch tamamlanana kadar bekler
+
+
+class MicroBatcher:
+    def __init__(self, run, batch_size: int = 1, batch_wait: float = 0.5, name: str = "micro-batch"):
+        self.run = run
+        self.batch_size = max(1, int(batch_size))
+        self.batch_wait = max(0.0, float(batch_wait))
+        self.name = name
+        self.cond = threading.Condition()
+        self.pending = []
+        self.dispatcher = None
+        self.closing = False
+        self.batches = 0
+
+    def submit(self, item):
+        """item'ın sonucu; run hata verdiyse None."""
+        job = {"item": item, "done": threading.Event(), "result": None}
+        with self.cond:
+            closing = self.closing
+            if not closing:
+                self.pending.append(job)
+                if self.dispatcher is None:
+                    self.dispatcher = threading.Thread(target=self._dispatch, name=self.name, daemon=True)
+                    self.dispatcher.start()
+                self.cond.notify_all()
+
+        if closing:
+            # kapanırken (atexit sonrası) gelen istek beklemeden işlenir
+            self._process([job])
+        job["done"].wait()
+        return job["result"]
+
+    def _process(self, jobs):
+        try:
+            self.batches += 1
+            results = self.run([job["item"] for job in jobs]) or []
+            for job, result in zip(jobs, results):
+                job["result"] = result
+        except Exception as e:
+            print(f"⚠️ {self.name}: {len(jobs)} istek işlenemedi:", e)
+        finally:
+            for job in jobs:
+                job["done"].set()
+
+    def _dispatch(self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.closing:
+                    self.cond.wait()
+                if not self.pending:
+                    return
+
+                # batch dolana ya da batch_wait bitene kadar yeni istek bekle
+                deadline = time.time() + self.batch_wait
+                while len(self.pending) < self.batch_size and not self.closing:
+                    left = deadline - time.time()
+                    if left <= 0:
+                        break
+                    self.cond.wait(left)
+
+                jobs = self.pending[:self.batch_size]
+                del self.pending[:self.batch_size]
+
+            self._process(jobs)
+
+    def close(self):
+        """Bekleyen istekler işlenir, dispatcher durur."""
+        with self.cond:
+            self.closing = True
+            self.cond.notify_all()
+        if self.dispatcher is not None:
+            self.dispatcher.join()
+            self.dispatcher = None
@@ -0,0 +1,253 @@
+import os
+import threading
+from collections import Counter, OrderedDict
+
+import lazy_deps
+from video_frames import VideoFrames, decode_video, OCR_POINTS
+
+# ======================================================
+# OCR (SABİT OVERLAY METİN)
+# ======================================================
+lazy_deps.register(
+    "easyocr_reader",
+    lambda: lazy_deps.module("easyocr").Reader(["en", "tr"], gpu=False),
+)
+
+def get_ocr_reader():
+    return lazy_deps.get("easyocr_reader")
+
+# ======================================================
+# METİN VAR MI? (UCUZ ÖN FİLTRE)
+# ======================================================
+# Kare küçültülür, morfolojik gradyan + Otsu ile kenar haritası çıkarılır,
+# yatayda birleşen kenar blokları "yazı satırı" adayı sayılır.
+# Aday yoksa EasyOCR hiç çalışmaz; varsa sadece adayları kapsayan bölge okunur.
+GATE_WIDTH = 480
+GATE_MIN_BOX_H = 6
+GATE_MIN_ASPECT = 1.5
+GATE_MIN_FILL = 0.25
+CROP_PAD = 0.15
+CROP_MAX_AREA = 0.6     # aday bölge karenin bu oranından büyükse tüm kare okunur
+
+
+def _edge_map(image):
+    """Morfolojik gradyan + Otsu: yazı kenarları beyaz, düz zemin siyah."""
+    cv2 = lazy_deps.module("cv2")
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    grad = cv2.morphologyEx(
+        gray, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    )
+    _, bw = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    return bw
+
+
+def find_text_regions(frame):
+    """Yazı olabilecek kutular [(x, y, w, h), ...] (orijinal kare koordinatlarında)."""
+    cv2 = lazy_deps.module("cv2")
+
+    h, w = frame.shape[:2]
+    scale = GATE_WIDTH / w if w > GATE_WIDTH else 1.0
+    small = frame
+    if scale < 1.0:
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    bw = _edge_map(small)
+    joined = cv2.morphologyEx(
+        bw, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1))
+    )
+    contours = cv2.findContours(joined, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)[-2]
+
+    small_h = small.shape[0]
+    boxes = []
+    for c in contours:
+        x, y, bw_w, bw_h = cv2.boundingRect(c)
+        if bw_h < GATE_MIN_BOX_H or bw_h > small_h * 0.25:
+            continue
+        if bw_w / bw_h < GATE_MIN_ASPECT:
+            continue
+        fill = cv2.countNonZero(bw[y:y + bw_h, x:x + bw_w]) / float(bw_w * bw_h)
+        if fill < GATE_MIN_FILL:
+            continue
+        boxes.append((int(x / scale), int(y / scale), int(bw_w / scale), int(bw_h / scale)))
+
+    return boxes
+
+
+def _crop_to_regions(frame, boxes):
+    h, w = frame.shape[:2]
+    x0 = min(b[0] for b in boxes)
+    y0 = min(b[1] for b in boxes)
+    x1 = max(b[0] + b[2] for b in boxes)
+    y1 = max(b[1] + b[3] for b in boxes)
+
+    pad_x = int((x1 - x0) * CROP_PAD) + 4
+    pad_y = int((y1 - y0) * CROP_PAD) + 4
+    x0, y0 = max(0, x0 - pad_x), max(0, y0 - pad_y)
+    x1, y1 = min(w, x1 + pad_x), min(h, y1 + pad_y)
+
+    if (x1 - x0) * (y1 - y0) > CROP_MAX_AREA * w * h:
+        return frame, (0, 0, w, h), False
+    return frame[y0:y1, x0:x1], (x0, y0, x1 - x0, y1 - y0), True
+
+
+# ======================================================
+# AYNI YAZI BÖLGESİNİ TEKRAR OKUMA (METİN HASH'İ)
+# ======================================================
+# Overlay metin çoğu videoda sabit; ardışık örnek kareler aynı yazıyı taşıyabiliyor.
+# Tüm karenin küçük dHash'i metne duyarlı değil (aynı arka plan + farklı yazı
+# birkaç bit fark eder), bu yüzden anahtar okunacak bölgenin kendisidir:
+# kırpma kutusu + bölgenin HASH_W x HASH_H kenar haritası (find_text_regions ile
+# aynı gradyan + Otsu). Gri dHash yazının arkasında kayan zemine çok duyarlı
+# (aynı yazılı bölgeler arasında medyan ~300 / 2048 bit); kenar haritasında aynı
+# yazı medyan ~18 bit, tek harfi farklı yazı en az ~12 bit fark eder.
+# Sonuç, kutu köşeleri BOX_TOLERANCE px içinde ve en fazla HASH_MAX_DIST bit
+# farklı bölgede tekrar kullanılır (sentetik ölçüm: aynı yazının ~%10'u eşleşir,
+# tek harf farkı eşleşmez). Gerçek videolarda bench_ocr_gate.py --hash_dist ile ölçülür.
+HASH_W = 64
+HASH_H = 32
+HASH_MAX_DIST = 8       # farklı bit (2048 bitin ~%0.4'ü); 0: sadece tam eşleşme
+BOX_TOLERANCE = 4       # px
+# filtre + dedup açıkken varsayılan örnek kare: aynı kalan yazı bölgesi tekrar
+# okunmadığı için ek kareler recall'u artırır, OCR maliyeti değişen bölge sayısı kadar artar
+OCR_DEDUP_SAMPLES = 5
+HASH_CACHE_SIZE = 256   # grup başına saklanan bölge
+HASH_GROUPS = 64        # aynı anda tutulan kullanıcı (grup) sayısı
+
+
+def region_hash(region):
+    """Bölgenin HASH_W x HASH_H kenar haritası (bool dizi)."""
+    cv2 = lazy_deps.module("cv2")
+    small = cv2.resize(_edge_map(region), (HASH_W, HASH_H), interpolation=cv2.INTER_AREA)
+    return small > 127
+
+
+class FrameHashCache:
+    """(kutu, bölge hash'i) → OCR metin listesi; yakın kutu + küçük Hamming mesafesi, LRU ile sınırlı."""
+
+    def __init__(self, max_entries: int = HASH_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.added = 0
+        # analysis_workers=0 iken indirme thread'leri aynı nesneyi kullanır
+        self.lock = threading.Lock()
+
+    def lookup(self, box, bits, max_dist: int = HASH_MAX_DIST):
+        with self.lock:
+            found = None
+            # en son okunan bölgeden geriye: en olası eşleşme önce
+            for key, (e_box, e_bits, texts) in reversed(self.entries.items()):
+                if max(abs(a - b) for a, b in zip(box, e_box)) > BOX_TOLERANCE:
+                    continue
+                if (bits != e_bits).sum() <= max_dist:
+                    found = key
+                    break
+            if found is None:
+                return None
+            self.entries.move_to_end(found)
+            return self.entries[found][2]
+
+    def add(self, box, bits, texts):
+        with self.lock:
+            self.added += 1
+            self.entries[self.added] = (box, bits, list(texts))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+# grup (örn. kullanıcı adı) → FrameHashCache; süreç içinde videolar arası paylaşılır
+_hash_caches = OrderedDict()
+_hash_lock = threading.Lock()
+
+
+def get_hash_cache(group: str) -> FrameHashCache:
+    with _hash_lock:
+        cache = _hash_caches.get(group)
+        if cache is None:
+            cache = _hash_caches[group] = FrameHashCache()
+            while len(_hash_caches) > HASH_GROUPS:
+                _hash_caches.popitem(last=False)
+        _hash_caches.move_to_end(group)
+        return cache
+
+
+def _ocr_region(frame, gate: bool, stats: Counter):
+    """Okunacak bölge ve kutusu; yazı adayı yoksa (None, None)."""
+    h, w = frame.shape[:2]
+    if not gate:
+        return frame, (0, 0, w, h)
+
+    boxes = find_text_regions(frame)
+    if not boxes:
+        stats["ocr_skipped"] += 1
+        return None, None
+    region, box, cropped = _crop_to_regions(frame, boxes)
+    if cropped:
+        stats["ocr_cropped"] += 1
+    return region, box
+
+
+def _read_text(region):
+    results = get_ocr_reader().readtext(region, detail=0)
+    return [t.strip().lower() for t in results if len(t.strip()) > 3]
+
+
+def extract_overlay_text(
+    video_path: str,
+    frames: VideoFrames = None,
+    gate: bool = False,
+    stats: Counter = None,
+    points=OCR_POINTS,
+    dedup: bool = True,
+    group: str = None,
+    hash_dist: int = HASH_MAX_DIST,
+) -> str:
+    """
+    points (varsayılan 20/50/80%) karelerinde OCR; en az 2 karede görülen metinler döner.
+    gate=True ise yazı adayı olmayan kareler atlanır, olanlarda sadece aday bölge okunur.
+    dedup=True ise aynı yazı bölgesi (yakın kutu, bölge hash'i en fazla hash_dist bit
+    farklı) tekrar okunmaz; group verilirse (örn. kullanıcı adı) bu hafıza aynı gruptaki videolar arasında da
+    paylaşılır.
+    stats (Counter) verilirse ocr_frames / ocr_skipped / ocr_cropped / ocr_hash_hits artar.
+    """
+    if not video_path or not os.path.exists(video_path):
+        return ""
+
+    if frames is None:
+        frames = decode_video(video_path, (points,), visual=False)
+    if stats is None:
+        stats = Counter()
+
+    hashes = None
+    if dedup:
+        # filtreli/filtresiz sonuçlar birbirine karışmasın
+        hashes = get_hash_cache(f"{group}|gate={gate}") if group else FrameHashCache()
+
+    texts = []
+
+    for frame in frames.sample(points):
+        stats["ocr_frames"] += 1
+
+        region, box = _ocr_region(frame, gate, stats)
+        if region is None:
+            continue
+
+        bits = None
+        if hashes is not None:
+            bits = region_hash(region)
+            cached = hashes.lookup(box, bits, hash_dist)
+            if cached is not None:
+                stats["ocr_hash_hits"] += 1
+                texts.extend(cached)
+                continue
+
+        cleaned = _read_text(region)
+        if bits is not None:
+            hashes.add(box, bits, cleaned)
+        texts.extend(cleaned)
+
+    if not texts:
+        return ""
+
+    counts = Counter(texts)
+    repeated = [t for t, c in counts.items() if c >= 2]
+
+    return " ".join(repeated)
@@ -0,0 +1,198 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+from tiktok_urls import normalize_video_url
+
+# ======================================================
+# ÖZELLİK SONUÇ CACHE'İ (SQLITE)
+# ======================================================
+# İki seviye anahtar:
+#   urls    : normalize video_url → dosya içeriği hash'i (sha256)
+#   results : (hash, özellik, model versiyonu) → JSON değer
+# Model/ayar değişince versiyon etiketi değişir, eski kayıtlar kullanılmaz
+# ve yaş/boyut eviction'ı ile zamanla silinir.
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def text_sha256(text: str) -> str:
+    return hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, db_path: str, max_mb: float = 1024, max_age_days: float = 90):
+        self.db_path = db_path
+        self.max_bytes = int(max_mb * 1024 * 1024) if max_mb else 0
+        self.max_age = max_age_days * 86400 if max_age_days else 0
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT NOT NULL,
+                feature TEXT NOT NULL,
+                version TEXT NOT NULL,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (key, feature, version)
+            )
+            """
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at)"
+        )
+        self.conn.commit()
+
+        # özellik → {"hit": n, "miss": n}
+        self.counters = {}
+        self.evicted = 0
+
+        self.evict()
+
+    # ---------------- sayaçlar ----------------
+    def _count(self, feature: str, hit: bool):
+        c = self.counters.setdefault(feature, {"hit": 0, "miss": 0})
+        c["hit" if hit else "miss"] += 1
+
+    # ---------------- URL → hash ----------------
+    def link_url(self, url: str, content_hash: str):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO urls (url, content_hash, updated_at) VALUES (?, ?, ?)",
+                (normalize_video_url(url), content_hash, time.time()),
+            )
+            self.conn.commit()
+
+    def content_hash_for_url(self, url: str):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT content_hash FROM urls WHERE url = ?",
+                (normalize_video_url(url),),
+            ).fetchone()
+        return row[0] if row else None
+
+    # ---------------- sonuçlar ----------------
+    def get(self, key: str, feature: str, version: str, count: bool = True):
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, created_at FROM results WHERE key = ? AND feature = ? AND version = ?",
+                (key, feature, version),
+            ).fetchone()
+
+            if row is not None and self.max_age and now - row[1] > self.max_age:
+                row = None
+
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE results SET accessed_at = ? WHERE key = ? AND feature = ? AND version = ?",
+                    (now, key, feature, version),
+                )
+                self.conn.commit()
+
+            if count:
+                self._count(feature, row is not None)
+
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, key: str, feature: str, version: str, value):
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                """
+                INSERT OR REPLACE INTO results
+                    (key, feature, version, value, size, created_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (key, feature, version, data, len(data.encode("utf-8")), now, now),
+            )
+            self.conn.commit()
+
+    def lookup(self, key: str, versions: dict):
+        """versions: {özellik: versiyon}. Bulunanları {özellik: değer} olarak döner."""
+        found = {}
+        for feature, version in versions.items():
+            value = self.get(key, feature, version)
+            if value is not None:
+                found[feature] = value
+        return found
+
+    # ---------------- eviction ----------------
+    def evict(self):
+        with self.lock:
+            removed = 0
+
+            if self.max_age:
+                cur = self.conn.execute(
+                    "DELETE FROM results WHERE created_at < ?",
+                    (time.time() - self.max_age,),
+                )
+                removed += cur.rowcount
+
+            if self.max_bytes:
+                total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+                if total > self.max_bytes:
+                    # en uzun süredir kullanılmayanlardan başla (LRU)
+                    rows = self.conn.execute(
+                        "SELECT key, feature, version, size FROM results ORDER BY accessed_at ASC"
+                    ).fetchall()
+                    for key, feature, version, size in rows:
+                        if total <= self.max_bytes:
+                            break
+                        self.conn.execute(
+                            "DELETE FROM results WHERE key = ? AND feature = ? AND version = ?",
+                            (key, feature, version),
+                        )
+                        total -= size
+                        removed += 1
+
+            # artık hiçbir sonucu kalmayan URL eşleşmeleri
+            self.conn.execute(
+                "DELETE FROM urls WHERE content_hash NOT IN (SELECT DISTINCT key FROM results)"
+            )
+            self.conn.commit()
+            self.evicted += removed
+
+        return removed
+
+    def report(self):
+        if not self.counters and not self.evicted:
+            return
+        parts = [
+            f"{feature}: {c['hit']} hit / {c['miss']} miss"
+            for feature, c in sorted(self.counters.items())
+        ]
+        print(f"🗄️ Cache ({os.path.basename(self.db_path)}): " + ", ".join(parts) + f", silinen kayıt: {self.evicted}")
+
+    def close(self):
+        self.evict()
+        self.report()
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,496 @@
+import os
+import re
+import inspect
+import pandas as pd
+
+import lazy_deps
+from result_cache import text_sha256
+
+# ===========================
+# BERT RISK MODEL (LOCAL)
+# ===========================
+# torch / transformers ilk skorlamada yüklenir (lazy_deps)
+
+MODEL_DIR_NAME = "my_suicide_bert_model"  # proje klasöründe bu isimle durmalı
+
+_tokenizer = None
+_model = None
+_device = None
+_risk_index = None  # logits içinde "risk" sınıfının index'i
+
+# ===========================
+# INFERENCE BACKEND
+# ===========================
+#   torch : fp32 PyTorch (varsayılan, eski davranış)
+#   int8  : Linear katmanlarda dinamik int8 quantization (CPU)
+#   onnx  : model.onnx (yoksa ya da model dosyalarından eskiyse export edilir) + onnxruntime (CPU)
+# CLI yoksa RISK_BACKEND / RISK_THREADS ortam değişkenleri okunur.
+RISK_BACKENDS = ("torch", "int8", "onnx")
+ONNX_FILE_NAME = "model.onnx"
+# bunlardan biri model.onnx'ten yeniyse ONNX yeniden export edilir
+MODEL_FILES = ("config.json", "model.safetensors", "pytorch_model.bin")
+
+_backend = os.environ.get("RISK_BACKEND", "torch")
+_threads = int(os.environ.get("RISK_THREADS", "0") or 0)
+_loaded_backend = None
+_onnx_session = None
+_onnx_inputs = None
+
+def set_risk_backend(backend: str = None, threads: int = None):
+    """Backend/thread ayarını değiştirir; yüklü model farklıysa bir sonraki skorlamada yeniden yüklenir."""
+    global _backend, _threads
+    if backend is not None:
+        if backend not in RISK_BACKENDS:
+            raise ValueError(f"Bilinmeyen risk backend: {backend}")
+        _backend = backend
+    if threads is not None:
+        _threads = int(threads)
+
+def _onnx_stale(model_dir: str, onnx_path: str) -> bool:
+    """model.onnx yoksa ya da model klasörü sonradan güncellendiyse True."""
+    if not os.path.exists(onnx_path):
+        return True
+    exported = os.path.getmtime(onnx_path)
+    for name in MODEL_FILES:
+        path = os.path.join(model_dir, name)
+        if os.path.exists(path) and os.path.getmtime(path) > exported:
+            return True
+    return False
+
+def _load_onnx_session(model_dir: str):
+    torch = lazy_deps.module("torch")
+    ort = lazy_deps.module("onnxruntime")
+
+    onnx_path = os.path.join(model_dir, ONNX_FILE_NAME)
+    if _onnx_stale(model_dir, onnx_path):
+        print(f"📦 ONNX export: {onnx_path}")
+        dummy = _tokenizer(["export"], return_tensors="pt")
+        # girişler isimle (kwargs) verilir; graph giriş sırası forward imzasını
+        # izler, input_names de aynı sırada olmalı (BERT: input_ids,
+        # attention_mask, token_type_ids — tokenizer sırası farklı)
+        params = list(inspect.signature(_model.forward).parameters)
+        names = sorted(dummy.keys(), key=params.index)
+        dynamic = {n: {0: "batch", 1: "sequence"} for n in names}
+        dynamic["logits"] = {0: "batch"}
+        torch.onnx.export(
+            _model,
+            ({n: dummy[n] for n in names},),
+            onnx_path,
+            input_names=names,
+            output_names=["logits"],
+            dynamic_axes=dynamic,
+            opset_version=14,
+        )
+
+    opts = ort.SessionOptions()
+    if _threads:
+        opts.intra_op_num_threads = _threads
+    session = ort.InferenceSession(onnx_path, opts, providers=["CPUExecutionProvider"])
+    return session, {i.name for i in session.get_inputs()}
+
+def _load_risk_model(script_dir: str):
+    global _tokenizer, _model, _device, _risk_index
+    global _loaded_backend, _onnx_session, _onnx_inputs
+    if _model is not None and _loaded_backend == _backend:
+        return
+
+    model_dir = os.path.join(script_dir, MODEL_DIR_NAME)
+
+    torch = lazy_deps.module("torch")
+    transformers = lazy_deps.module("transformers")
+
+    if _threads:
+        torch.set_num_threads(_threads)
+
+    def _load():
+        tokenizer = transformers.AutoTokenizer.from_pretrained(model_dir)
+        model = transformers.AutoModelForSequenceClassification.from_pretrained(model_dir)
+        return tokenizer, model
+
+    # her backend için ayrı kayıt: yükleme süresi profilde görünsün
+    lazy_deps.register(f"risk_model[{_backend}]", _load)
+    _device = "cuda" if torch.cuda.is_available() and _backend == "torch" else "cpu"
+    _tokenizer, _model = lazy_deps.get(f"risk_model[{_backend}]")
+    _model.to(_device)
+    _model.eval()
+
+    _onnx_session = None
+    _onnx_inputs = None
+    if _backend == "int8":
+        _model = torch.quantization.quantize_dynamic(
+            _model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    elif _backend == "onnx":
+        _onnx_session, _onnx_inputs = _load_onnx_session(model_dir)
+
+    _loaded_backend = _backend
+
+    # Risk sınıfının hangi index olduğu (modeline göre değişebilir)
+    # En güvenlisi label2id/id2label'dan bakmak:
+    label2id = getattr(_model.config, "label2id", {}) or {}
+    id2label = getattr(_model.config, "id2label", {}) or {}
+
+    # yaygın isimler: "suicide", "suicidal", "risk", "LABEL_1" vs.
+    candidates = ["suicide", "suicidal", "risk", "LABEL_1", "1"]
+    found = None
+
+    for c in candidates:
+        if c in label2id:
+            found = label2id[c]
+            break
+
+    if found is None and id2label:
+        # id2label örn: {0:"non-suicide", 1:"suicide"} gibi olabilir
+        for k, v in id2label.items():
+            if str(v).lower() in candidates:
+                found = int(k)
+                break
+
+    # Hiç bulamazsa: ikili sınıflandırmada genelde pozitif sınıf index=1 varsay
+    _risk_index = int(found) if found is not None else 1
+
+def _is_meaningful_text(text: str) -> bool:
+    """
+    Gerçekten analiz edilmeye değer metin mi?
+    """
+    if text is None:
+        return False
+
+    s = str(text).strip()
+
+    if s == "":
+        return False
+
+    # sadece boşluk / kontrol karakterleri
+    if len(s) == 0:
+        return False
+
+    # 'none', 'null' gibi stringler
+    if s.lower() in ["none", "null", "nan"]:
+        return False
+
+    # sadece emoji / noktalama / sayı
+    if re.fullmatch(r"[\W\d_]+", s):
+        return False
+
+    # çok kısa anlamsız şeyler (örn: "ok", ".", "-")
+    if len(s) < 5:
+        return False
+
+    return True
+
+
+def _risk_model_version(script_dir: str) -> str:
+    # model klasörü güncellenince cache'teki eski skorlar kullanılmaz
+    model_dir = os.path.join(script_dir, MODEL_DIR_NAME)
+    config = os.path.join(model_dir, "config.json")
+    stamp_path = config if os.path.exists(config) else model_dir
+    stamp = int(os.path.getmtime(stamp_path)) if os.path.exists(stamp_path) else 0
+    version = f"{MODEL_DIR_NAME}@{stamp}"
+    # int8 / onnx skorları fp32'den az da olsa farklıdır
+    if _backend != "torch":
+        version += f"|{_backend}"
+    return version
+
+
+# Batch başına token bütçesi (padding dahil: en uzun üye × üye sayısı)
+MAX_LENGTH = 512
+MAX_BATCH_TOKENS = 8192
+
+
+def _length_batches(lengths, max_tokens: int = MAX_BATCH_TOKENS, max_batch: int = 64):
+    """
+    İndeksleri token uzunluğuna göre sıralayıp batch'lere böler.
+    Benzer uzunluktaki metinler aynı batch'e düştüğü için padding azalır;
+    kısa metinlerden çok, uzun metinlerden az sayıda batch'e girer.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+
+    batches = []
+    current = []
+    for i in order:
+        # sıralı olduğu için yeni üye batch'in en uzunudur
+        if current and (
+            lengths[i] * (len(current) + 1) > max_tokens
+            or len(current) >= max_batch
+        ):
+            batches.append(current)
+            current = []
+        current.append(i)
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _forward_logits(padded):
+    torch = lazy_deps.module("torch")
+    if _onnx_session is not None:
+        inputs = {k: v.cpu().numpy() for k, v in padded.items() if k in _onnx_inputs}
+        return torch.from_numpy(_onnx_session.run(None, inputs)[0])
+
+    padded = {k: v.to(_device) for k, v in padded.items()}
+    return _model(**padded).logits
+
+
+def _predict_features(features, batch_size: int, max_tokens: int):
+    """Tokenize edilmiş girdiler (dict listesi) için risk olasılıkları, girdi sırasıyla."""
+    torch = lazy_deps.module("torch")
+    lengths = [len(f["input_ids"]) for f in features]
+    probs_out = [0.0] * len(features)
+
+    with torch.inference_mode():
+        for batch in _length_batches(lengths, max_tokens, batch_size):
+            padded = _tokenizer.pad([features[i] for i in batch], padding=True, return_tensors="pt")
+
+            logits = _forward_logits(padded)
+            probs = torch.softmax(logits, dim=-1)[:, _risk_index]
+
+            # sonuçları orijinal indekslerine geri dağıt
+            for i, p in zip(batch, probs.cpu().tolist()):
+                probs_out[i] = float(p)
+
+    return probs_out
+
+
+def _predict_texts(texts, batch_size: int, max_tokens: int):
+    """Boş olmayan metinler için risk olasılıkları (ilk 512 token, girdi sırasıyla)."""
+    enc = _tokenizer(texts, truncation=True, max_length=MAX_LENGTH)
+    features = [{k: enc[k][i] for k in enc.keys()} for i in range(len(texts))]
+    return _predict_features(features, batch_size, max_tokens)
+
+
+# ======================================================
+# UZUN METİN: KAYAN PENCERE (CHUNK) SKORLAMA
+# ======================================================
+CHUNK_STRIDE = 384          # pencere başlangıçları arası token (510'dan küçükse örtüşür)
+CHUNK_AGGREGATES = ("max", "mean", "topk")
+
+
+def _aggregate(probs, aggregate: str, top_k: int) -> float:
+    if aggregate == "mean":
+        return sum(probs) / len(probs)
+    if aggregate == "topk":
+        top = sorted(probs, reverse=True)[:max(1, top_k)]
+        return sum(top) / len(top)
+    return max(probs)
+
+
+def _predict_chunked(
+    texts,
+    batch_size: int,
+    max_tokens: int,
+    chunk_stride: int = CHUNK_STRIDE,
+    aggregate: str = "max",
+    top_k: int = 3,
+    max_total_tokens: int = 0,
+    truncated: set = None,
+):
+    """
+    Her metni MAX_LENGTH'lik örtüşen pencerelere böler; tüm metinlerin
+    pencereleri birlikte batch'lenir, sonra metin başına birleştirilir.
+    max_total_tokens > 0 ise bu çağrıdaki toplam token sınırlanır: her metnin
+    ilk penceresi her zaman skorlanır (eski truncation ile aynı), ek
+    pencereler bütçe bittiğinde atlanır. truncated verilirse penceresi atlanan
+    metinlerin indeksleri eklenir (skorları çağrıdaki diğer metinlere bağlıdır).
+    """
+    if aggregate not in CHUNK_AGGREGATES:
+        raise ValueError(f"Bilinmeyen aggregate: {aggregate}")
+
+    window = MAX_LENGTH - _tokenizer.num_special_tokens_to_add(pair=False)
+    step = max(1, min(int(chunk_stride), window))
+
+    # tokenizer metni kendisi böler: stride = ardışık pencerelerin örtüşen token sayısı
+    enc = _tokenizer(
+        texts,
+        truncation=True,
+        max_length=MAX_LENGTH,
+        stride=window - step,
+        return_overflowing_tokens=True,
+    )
+    keys = [k for k in _tokenizer.model_input_names if k in enc]
+
+    features = []
+    owners = []
+    extra = []
+    used = 0
+
+    seen = set()
+    for w_idx, t_idx in enumerate(enc["overflow_to_sample_mapping"]):
+        f = {k: enc[k][w_idx] for k in keys}
+        if t_idx in seen:
+            extra.append((t_idx, f))
+            continue
+        seen.add(t_idx)
+        features.append(f)
+        owners.append(t_idx)
+        used += len(f["input_ids"])
+
+    dropped = 0
+    for t_idx, f in extra:
+        if max_total_tokens and used + len(f["input_ids"]) > max_total_tokens:
+            dropped += 1
+            if truncated is not None:
+                truncated.add(t_idx)
+            continue
+        features.append(f)
+        owners.append(t_idx)
+        used += len(f["input_ids"])
+
+    if dropped:
+        print(f"⚠️ Token sınırı ({max_total_tokens}) nedeniyle {dropped} pencere atlandı.")
+
+    chunk_probs = _predict_features(features, batch_size, max_tokens)
+
+    per_text = [[] for _ in texts]
+    for t_idx, p in zip(owners, chunk_probs):
+        per_text[t_idx].append(p)
+
+    return [_aggregate(probs, aggregate, top_k) for probs in per_text]
+
+
+def _score_texts(
+    texts,
+    script_dir: str,
+    batch_size: int = 64,
+    empty_value: float = 0.0,
+    cache=None,
+    max_tokens: int = MAX_BATCH_TOKENS,
+    chunking: bool = False,
+    truncated: set = None,
+    **chunk_opts,
+):
+    """
+    chunking=True ise uzun metinler kayan pencerelerle skorlanır;
+    chunk_opts: chunk_stride / aggregate / top_k / max_total_tokens
+    truncated verilirse token sınırı yüzünden penceresi atlanan metinlerin
+    indeksleri eklenir; bunlar cache'e yazılmaz.
+    """
+
+    scores = [empty_value] * len(texts)
+
+    valid_indices = []
+    valid_texts = []
+
+    for i, t in enumerate(texts):
+        if _is_meaningful_text(t):
+            valid_indices.append(i)
+            valid_texts.append(str(t).strip())
+        else:
+            scores[i] = empty_value  # 🔴 BOŞSA KESİN 0.0
+
+    if cache is not None and valid_texts:
+        version = _risk_model_version(script_dir)
+        if chunking:
+            version += "|chunk-{}-{}-{}".format(
+                chunk_opts.get("chunk_stride", CHUNK_STRIDE),
+                chunk_opts.get("aggregate", "max"),
+                chunk_opts.get("top_k", 3),
+            )
+        keys = [text_sha256(t) for t in valid_texts]
+        missing = []
+        for idx, t, key in zip(valid_indices, valid_texts, keys):
+            value = cache.get(key, "risk", version)
+            if value is not None:
+                scores[idx] = float(value)
+            else:
+                missing.append((idx, t, key))
+
+        if missing:
+            partial = set()
+            computed = _score_texts(
+                [t for _, t, _ in missing],
+                script_dir,
+                batch_size,
+                empty_value,
+                max_tokens=max_tokens,
+                chunking=chunking,
+                truncated=partial,
+                **chunk_opts,
+            )
+            for j, ((idx, _, key), score) in enumerate(zip(missing, computed)):
+                scores[idx] = score
+                # eksik pencereyle alınan skor aynı metnin tam skoru değildir
+                if j not in partial:
+                    cache.put(key, "risk", version, score)
+            if truncated is not None:
+                truncated.update(missing[j][0] for j in partial)
+        return scores
+
+    if not valid_texts:
+        return scores  # hepsi boşsa direkt dön
+
+    _load_risk_model(script_dir)
+
+    if chunking:
+        partial = set()
+        dense_scores = _predict_chunked(
+            valid_texts, batch_size, max_tokens, truncated=partial, **chunk_opts
+        )
+        if truncated is not None:
+            truncated.update(valid_indices[j] for j in partial)
+    else:
+        dense_scores = _predict_texts(valid_texts, batch_size, max_tokens)
+
+    for idx, score in zip(valid_indices, dense_scores):
+        scores[idx] = float(score)
+
+    return scores
+
+
+# metin kolonu → risk kolonu
+RISK_COLUMNS = {
+    "caption_raw": "caption_risk",
+    "overlay_text_raw": "overlay_risk",
+    "transcript_raw": "transcript_risk",
+}
+
+
+def _text_key(text) -> str:
+    # aynı metnin boşluk farklarıyla gelen kopyaları tek anahtara düşer
+    return " ".join(str(text).split())
+
+
+def add_risk_columns(df: pd.DataFrame, script_dir: str, cache=None, **score_opts):
+    # hiçbir şeyi silmez, sadece yeni kolon ekler
+    if df is None or len(df) == 0:
+        return df
+
+    # üç kolon tek havuzda toplanır, aynı metin bir kez skorlanır
+    keys_by_col = {}
+    unique = {}
+    total = 0
+
+    for col in RISK_COLUMNS:
+        if col not in df.columns:
+            continue
+
+        keys = []
+        for t in df[col].tolist():
+            if _is_meaningful_text(t):
+                key = _text_key(t)
+                unique.setdefault(key, len(unique))
+                keys.append(key)
+                total += 1
+            else:
+                keys.append(None)
+        keys_by_col[col] = keys
+
+    unique_texts = list(unique)
+    unique_scores = {}
+    if unique_texts:
+        print(f"🧮 Risk skorlama: {total} metin, {len(unique_texts)} benzersiz")
+        scores = _score_texts(unique_texts, script_dir, cache=cache, **score_opts)
+        unique_scores = dict(zip(unique_texts, scores))
+
+    # skorları üç risk kolonuna geri dağıt
+    for col, risk_col in RISK_COLUMNS.items():
+        if col in keys_by_col:
+            df[risk_col] = [
+                unique_scores[k] if k is not None else 0.0
+                for k in keys_by_col[col]
+            ]
+        else:
+            df[risk_col] = None
+
+    return df
@@ -0,0 +1,65 @@
+import threading
+
+from micro_batch import MicroBatcher
+
+
+def _submit_all(batcher, items):
+    results = {}
+
+    def worker(item):
+        results[item] = batcher.submit(item)
+
+    threads = [threading.Thread(target=worker, args=(item,)) for item in items]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    assert not any(t.is_alive() for t in threads)
+    return results
+
+
+def test_concurrent_items_share_a_batch():
+    sizes = []
+
+    def run(items):
+        sizes.append(len(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(run, batch_size=4, batch_wait=1.0)
+    results = _submit_all(batcher, [1, 2, 3, 4])
+    batcher.close()
+
+    assert results == {1: 2, 2: 4, 3: 6, 4: 8}
+    assert sum(sizes) == 4
+    assert batcher.batches == len(sizes)
+
+
+def test_failing_run_does_not_hang_waiters():
+    calls = []
+
+    def run(items):
+        calls.append(len(items))
+        if len(calls) == 1:
+            raise OSError("worker başlatılamadı")
+        return ["ok"] * len(items)
+
+    batcher = MicroBatcher(run, batch_size=2, batch_wait=0.5)
+    results = _submit_all(batcher, ["a", "b"])
+    assert set(results.values()) <= {None, "ok"}
+    assert None in results.values()
+
+    # dispatcher hatadan sonra da çalışmaya devam eder
+    assert batcher.submit("c") == "ok"
+    batcher.close()
+
+
+def test_short_result_list_gives_none():
+    batcher = MicroBatcher(lambda items: [], batch_size=1, batch_wait=0.0)
+    assert batcher.submit("x") is None
+    batcher.close()
+
+
+def test_submit_after_close_runs_inline():
+    batcher = MicroBatcher(lambda items: [item + 1 for item in items], batch_size=3, batch_wait=5.0)
+    batcher.close()
+    assert batcher.submit(1) == 2
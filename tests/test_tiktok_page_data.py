@@ -0,0 +1,181 @@
+import os
+import json
+
+import pytest
+
+from tiktok_page_data import (
+    FeedCaptions,
+    caption_from_page,
+    hydration_json,
+    items_from_html,
+    items_from_json,
+)
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def _read(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def _script_text(html):
+    # tarayıcıdaki document.querySelector(...).textContent karşılığı
+    start = html.index(">", html.index('<script id="')) + 1
+    return html[start:html.index("</script>", start)]
+
+
+class FakePage:
+    """caption_from_page / FeedCaptions için gereken kadar Playwright Page."""
+
+    def __init__(self, html=""):
+        self.html = html
+        self.listeners = {}
+
+    def evaluate(self, script, arg=None):
+        return _script_text(self.html) if '<script id="' in self.html else None
+
+    def content(self):
+        return self.html
+
+    def on(self, event, fn):
+        self.listeners[event] = fn
+
+    def remove_listener(self, event, fn):
+        self.listeners.pop(event, None)
+
+
+class FakeResponse:
+    def __init__(self, url, data):
+        self.url = url
+        self._data = data
+
+    def json(self):
+        return self._data
+
+
+# ---------------- hydration_json ----------------
+def test_hydration_json_universal():
+    data = hydration_json(_read("video_universal.html"))
+    assert "__DEFAULT_SCOPE__" in data
+
+
+def test_hydration_json_sigi_state():
+    data = hydration_json(_read("video_sigi_state.html"))
+    assert "ItemModule" in data
+
+
+def test_hydration_json_missing_or_broken():
+    assert hydration_json("<html><body>yok</body></html>") is None
+    assert hydration_json('<script id="SIGI_STATE">{bozuk</script>') is None
+    assert hydration_json(None) is None
+
+
+# ---------------- items_from_html / items_from_json ----------------
+def test_items_from_universal_html():
+    items = items_from_html(_read("video_universal.html"))
+    assert items == {
+        "7301234567890123456": {
+            "desc": "bugün çok yorgunum #motivasyon",
+            "author": "ornek.kullanici",
+            "create_time": 1700000000,
+        }
+    }
+
+
+def test_items_from_sigi_state_html():
+    items = items_from_html(_read("video_sigi_state.html"))
+    assert set(items) == {"7109876543210987654", "7109876543210987655"}
+    assert items["7109876543210987654"]["desc"] == "eski sayfa yapısı caption"
+    assert items["7109876543210987654"]["author"] == "eski.hesap"
+
+
+def test_items_from_item_list():
+    items = items_from_json(json.loads(_read("item_list.json")))
+    assert list(items) == [
+        "7311111111111111111",
+        "7311111111111111112",
+        "7311111111111111113",
+    ]
+    assert items["7311111111111111111"]["desc"] == "akıştan gelen caption 1 #üzgün"
+
+
+@pytest.mark.parametrize(
+    "name", ["video_universal.html", "video_sigi_state.html", "item_list.json"]
+)
+def test_challenges_are_not_items(name):
+    # challenges[] kayıtları da {"id": "<rakam>", "desc": ...} taşır
+    text = _read(name)
+    items = items_from_json(json.loads(text)) if name.endswith(".json") else items_from_html(text)
+    challenge_ids = {
+        "1650000000000000001",
+        "1660000000000000002",
+        "1670000000000000003",
+        "1670000000000000004",
+    }
+    assert items
+    assert not challenge_ids & set(items)
+
+
+# ---------------- caption_from_page ----------------
+def test_caption_from_page_universal():
+    page = FakePage(_read("video_universal.html"))
+    url = "https://www.tiktok.com/@ornek.kullanici/video/7301234567890123456?lang=tr"
+    assert caption_from_page(page, url) == "bugün çok yorgunum #motivasyon"
+
+
+def test_caption_from_page_empty_desc():
+    page = FakePage(_read("video_sigi_state.html"))
+    url = "https://www.tiktok.com/@eski.hesap/video/7109876543210987655"
+    assert caption_from_page(page, url) == ""
+
+
+def test_caption_from_page_missing_video():
+    page = FakePage(_read("video_universal.html"))
+    url = "https://www.tiktok.com/@baska/video/7399999999999999999"
+    assert caption_from_page(page, url) is None
+
+
+def test_caption_from_page_without_hydration():
+    page = FakePage("<html><body><h1>render edilmiş</h1></body></html>")
+    url = "https://www.tiktok.com/@ornek.kullanici/video/7301234567890123456"
+    assert caption_from_page(page, url) is None
+
+
+# ---------------- FeedCaptions ----------------
+def test_feed_captions_from_item_list_response():
+    page = FakePage()
+    feed = FeedCaptions(page)
+    page.listeners["response"](
+        FakeResponse(
+            "https://www.tiktok.com/api/challenge/item_list/?count=30",
+            json.loads(_read("item_list.json")),
+        )
+    )
+
+    assert feed.caption_for("https://www.tiktok.com/@birinci/video/7311111111111111111") == (
+        "akıştan gelen caption 1 #üzgün"
+    )
+    assert feed.caption_for("https://www.tiktok.com/@ikinci/video/7311111111111111112") == ""
+    assert feed.caption_for("https://www.tiktok.com/@x/video/7399999999999999999") is None
+
+    feed.close()
+    assert "response" not in page.listeners
+
+
+def test_feed_captions_ignores_other_responses():
+    page = FakePage()
+    feed = FeedCaptions(page)
+    page.listeners["response"](
+        FakeResponse("https://www.tiktok.com/api/comment/list/", json.loads(_read("item_list.json")))
+    )
+    assert feed.items == {}
+
+
+def test_feed_captions_harvest_html():
+    page = FakePage(_read("video_sigi_state.html"))
+    feed = FeedCaptions(page)
+    feed.harvest_html()
+    assert feed.caption_for("https://www.tiktok.com/@eski.hesap/video/7109876543210987654") == (
+        "eski sayfa yapısı caption"
+    )
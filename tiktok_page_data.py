@@ -0,0 +1,151 @@
+import re
+import json
+
+from tiktok_urls import video_id_from_url
+
+# ======================================================
+# SAYFA İÇİ JSON'DAN CAPTION / METADATA
+# ======================================================
+# TikTok sayfaları render için gereken veriyi HTML içinde JSON olarak taşır:
+#   <script id="__UNIVERSAL_DATA_FOR_REHYDRATION__">  (yeni)
+#       __DEFAULT_SCOPE__["webapp.video-detail"].itemInfo.itemStruct
+#   <script id="SIGI_STATE">                          (eski)
+#       ItemModule[<video_id>]
+# Hashtag / kullanıcı akışı kaydırılırken gelen */item_list/ API yanıtlarında da
+# aynı item yapısı (itemList[]) vardır. Yapılar sürümden sürüme kaydığı için
+# sabit yol yerine JSON içinde {"id": "<rakam>", "desc": ...} taşıyan ve video
+# item'ına ait bir alanı (createTime / video) olan her dict item sayılır;
+# challenges[] (hashtag) kayıtlarında da id + desc vardır ama bu alanlar yoktur.
+HYDRATION_SCRIPT_IDS = ("__UNIVERSAL_DATA_FOR_REHYDRATION__", "SIGI_STATE")
+HYDRATION_SELECTOR = ", ".join(f"script#{sid}" for sid in HYDRATION_SCRIPT_IDS)
+MAX_DEPTH = 12
+
+
+def _item_info(d: dict) -> dict:
+    author = d.get("author")
+    if isinstance(author, dict):
+        author = author.get("uniqueId")
+    return {
+        "desc": d.get("desc") or "",
+        "author": author or "",
+        "create_time": d.get("createTime"),
+    }
+
+
+def items_from_json(obj, depth: int = 0, out: dict = None) -> dict:
+    """JSON içindeki tüm video item'ları: {video_id: {"desc", "author", "create_time"}}"""
+    if out is None:
+        out = {}
+    if depth > MAX_DEPTH:
+        return out
+
+    if isinstance(obj, dict):
+        vid = obj.get("id")
+        if (
+            isinstance(vid, str)
+            and vid.isdigit()
+            and isinstance(obj.get("desc"), str)
+            and ("createTime" in obj or isinstance(obj.get("video"), dict))
+        ):
+            out.setdefault(vid, _item_info(obj))
+        for value in obj.values():
+            if isinstance(value, (dict, list)):
+                items_from_json(value, depth + 1, out)
+    elif isinstance(obj, list):
+        for value in obj:
+            if isinstance(value, (dict, list)):
+                items_from_json(value, depth + 1, out)
+    return out
+
+
+def hydration_json(html: str):
+    """HTML'deki ilk hydration script'inin JSON'u (yoksa None)."""
+    for sid in HYDRATION_SCRIPT_IDS:
+        m = re.search(
+            rf'<script[^>]*\bid="{re.escape(sid)}"[^>]*>(.*?)</script>',
+            html or "",
+            re.S,
+        )
+        if not m:
+            continue
+        try:
+            return json.loads(m.group(1))
+        except ValueError:
+            continue
+    return None
+
+
+def items_from_html(html: str) -> dict:
+    data = hydration_json(html)
+    return items_from_json(data) if data is not None else {}
+
+
+def caption_from_page(page, url):
+    """
+    Açık video sayfasının hydration JSON'undan caption.
+    JSON'da bu video yoksa None (DOM'a bakılmalı); boş caption "" döner.
+    """
+    try:
+        text = page.evaluate(
+            """sel => {
+                const el = document.querySelector(sel);
+                return el ? el.textContent : null;
+            }""",
+            HYDRATION_SELECTOR,
+        )
+    except Exception:
+        return None
+    if not text:
+        return None
+
+    try:
+        items = items_from_json(json.loads(text))
+    except ValueError:
+        return None
+
+    info = items.get(video_id_from_url(url) or "")
+    return info["desc"] if info else None
+
+
+class FeedCaptions:
+    """
+    Hashtag / kullanıcı sayfasında kaydırma sırasında gelen */item_list/
+    yanıtlarını dinler; caption_for(url) bu videolar için sayfaya gitmeden
+    caption verir. Sayfa goto'dan ÖNCE bağlanmalı.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.items = {}
+        page.on("response", self._on_response)
+
+    def _on_response(self, response):
+        url = response.url
+        if "/api/" not in url or "item_list" not in url:
+            return
+        try:
+            data = response.json()
+        except Exception:
+            return
+        for vid, info in items_from_json(data).items():
+            self.items.setdefault(vid, info)
+
+    def harvest_html(self):
+        """Akış sayfasının kendi hydration JSON'undaki item'ları da ekler."""
+        try:
+            html = self.page.content()
+        except Exception:
+            return
+        for vid, info in items_from_html(html).items():
+            self.items.setdefault(vid, info)
+
+    def caption_for(self, url):
+        """Akıştan bilinen caption ya da None (sayfaya gidilmeli)."""
+        info = self.items.get(video_id_from_url(url) or "")
+        return info["desc"] if info else None
+
+    def close(self):
+        try:
+            self.page.remove_listener("response", self._on_response)
+        except Exception:
+            pass
@@ -1,256 +1,114 @@
+import time
+
+# --profile_startup için: script importlarının toplam süresi
+_IMPORT_START = time.perf_counter()
+
 import os
 import re
-import time
+import sys
+import json
 import uuid
+import atexit
 import argparse
+import threading
 import subprocess
-import requests
+import multiprocessing
 import pandas as pd
-import cv2
-import easyocr
 from collections import Counter
-from playwright.sync_api import sync_playwright
-
-# YÜZ ANALİZİ
-from face_features import extract_face_features
-# ===========================
-# BERT RISK MODEL (LOCAL)
-# ===========================
-import torch
-import numpy as np
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-
-MODEL_DIR_NAME = "my_suicide_bert_model"  # proje klasöründe bu isimle durmalı
-
-_tokenizer = None
-_model = None
-_device = None
-_risk_index = None  # logits içinde "risk" sınıfının index'i
-
-def _load_risk_model(script_dir: str):
-    global _tokenizer, _model, _device, _risk_index
-    if _model is not None:
-        return
-
-    model_dir = os.path.join(script_dir, MODEL_DIR_NAME)
-
-    _device = "cuda" if torch.cuda.is_available() else "cpu"
-    _tokenizer = AutoTokenizer.from_pretrained(model_dir)
-    _model = AutoModelForSequenceClassification.from_pretrained(model_dir)
-    _model.to(_device)
-    _model.eval()
-
-    # Risk sınıfının hangi index olduğu (modeline göre değişebilir)
-    # En güvenlisi label2id/id2label'dan bakmak:
-    label2id = getattr(_model.config, "label2id", {}) or {}
-    id2label = getattr(_model.config, "id2label", {}) or {}
-
-    # yaygın isimler: "suicide", "suicidal", "risk", "LABEL_1" vs.
-    candidates = ["suicide", "suicidal", "risk", "LABEL_1", "1"]
-    found = None
-
-    for c in candidates:
-        if c in label2id:
-            found = label2id[c]
-            break
-
-    if found is None and id2label:
-        # id2label örn: {0:"non-suicide", 1:"suicide"} gibi olabilir
-        for k, v in id2label.items():
-            if str(v).lower() in candidates:
-                found = int(k)
-                break
-
-    # Hiç bulamazsa: ikili sınıflandırmada genelde pozitif sınıf index=1 varsay
-    _risk_index = int(found) if found is not None else 1
-
-import re
-
-def _is_meaningful_text(text: str) -> bool:
-    """
-    Gerçekten analiz edilmeye değer metin mi?
-    """
-    if text is None:
-        return False
-
-    s = str(text).strip()
-
-    if s == "":
-        return False
-
-    # sadece boşluk / kontrol karakterleri
-    if len(s) == 0:
-        return False
-
-    # 'none', 'null' gibi stringler
-    if s.lower() in ["none", "null", "nan"]:
-        return False
-
-    # sadece emoji / noktalama / sayı
-    if re.fullmatch(r"[\W\d_]+", s):
-        return False
-
-    # çok kısa anlamsız şeyler (örn: "ok", ".", "-")
-    if len(s) < 5:
-        return False
-
-    return True
-
-
-def _score_texts(
-    texts,
-    script_dir: str,
-    batch_size: int = 16,
-    empty_value: float = 0.0
-):
-    _load_risk_model(script_dir)
-
-    scores = [empty_value] * len(texts)
-
-    valid_indices = []
-    valid_texts = []
-
-    for i, t in enumerate(texts):
-        if _is_meaningful_text(t):
-            valid_indices.append(i)
-            valid_texts.append(str(t).strip())
-        else:
-            scores[i] = empty_value  # 🔴 BOŞSA KESİN 0.0
-
-    if not valid_texts:
-        return scores  # hepsi boşsa direkt dön
-
-    dense_scores = []
-
-    with torch.no_grad():
-        for i in range(0, len(valid_texts), batch_size):
-            batch = valid_texts[i:i + batch_size]
-
-            enc = _tokenizer(
-                batch,
-                padding=True,
-                truncation=True,
-                max_length=512,
-                return_tensors="pt"
-            )
-            enc = {k: v.to(_device) for k, v in enc.items()}
-
-            out = _model(**enc)
-            probs = torch.softmax(out.logits, dim=-1)[:, _risk_index]
-            dense_scores.extend(probs.cpu().numpy().astype(float).tolist())
-
-    for idx, score in zip(valid_indices, dense_scores):
-        scores[idx] = float(score)
-
-    return scores
-
-
-def add_risk_columns(df: pd.DataFrame, script_dir: str):
-    # hiçbir şeyi silmez, sadece yeni kolon ekler
-    if df is None or len(df) == 0:
-        return df
-
-    if "caption_raw" in df.columns:
-        df["caption_risk"] = _score_texts(df["caption_raw"].tolist(), script_dir)
-    else:
-        df["caption_risk"] = None
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 
-    if "overlay_text_raw" in df.columns:
-        df["overlay_risk"] = _score_texts(df["overlay_text_raw"].tolist(), script_dir)
-    else:
-        df["overlay_risk"] = None
-
-    if "transcript_raw" in df.columns:
-        df["transcript_risk"] = _score_texts(df["transcript_raw"].tolist(), script_dir)
-    else:
-        df["transcript_risk"] = None
-
-    return df
+# torch, cv2, easyocr, deepface, playwright: ilk kullanımda yüklenir
+import lazy_deps
+# EŞZAMANLI İSTEKLERİ BATCH'LEME (WHISPER)
+from micro_batch import MicroBatcher
 
+# YÜZ ANALİZİ
+from face_features import (
+    extract_face_features,
+    detect_faces,
+    face_result,
+    get_emotion_batcher,
+    FACE_DETECTORS,
+    DEFAULT_DETECTOR,
+    FACE_BATCH_WAIT,
+)
+# OVERLAY OCR
+from ocr_features import extract_overlay_text, HASH_MAX_DIST, OCR_DEDUP_SAMPLES
+# ORTAK KARE KAYNAĞI
+from video_frames import VideoFrames, decode_video, ocr_points, FACE_POINTS, OCR_SAMPLES, VISUAL_MODES
+# SONUÇ CACHE'İ
+from result_cache import ResultCache, file_sha256
+# URL İNDEKSİ
+from tiktok_urls import author_from_url, video_id_from_url
+# VİDEO İNDİRME + MEDYA CACHE'İ
+from downloader import Downloader, DEFAULT_RESOLVERS, DEFAULT_CHUNK_SIZE
+from media_cache import MediaCache, MEDIA_CACHE_DIR
+from url_index import UrlIndex
+# CAPTION SEKMELERİ
+from caption_pool import CaptionPool, CAPTION_SOURCES
+# AKIŞ SEKMELERİ (ÇOKLU SORGU) + TARAYICI OTURUMU
+from feed_tabs import FeedScheduler, parse_queries, read_queries_file, QUERY_KINDS
+from tiktok_session import new_context, STORAGE_STATE_FILE
+# BERT RİSK SKORLAMA
+from risk_model import add_risk_columns, set_risk_backend, CHUNK_STRIDE, CHUNK_AGGREGATES, RISK_BACKENDS
+
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_START
 
 # ======================================================
 # GENEL AYARLAR
 # ======================================================
 CSV_NAME = "tiktok_raw_data.csv"
+CACHE_NAME = "tiktok_feature_cache.sqlite"
 
 # ======================================================
-# OCR (SABİT OVERLAY METİN)
+# ÇALIŞTIRMA SAYAÇLARI
 # ======================================================
-ocr_reader = easyocr.Reader(["en", "tr"], gpu=False)
-
-def extract_overlay_text(video_path: str) -> str:
-    if not video_path or not os.path.exists(video_path):
-        return ""
+# Analiz adımlarının sayaçları (OCR atlanan kare vb.); süreç havuzundan
+# "_stats" anahtarıyla döner ve burada toplanır.
+RUN_STATS = Counter()
+_stats_lock = threading.Lock()
 
-    cap = cv2.VideoCapture(video_path)
-    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    if frame_count <= 0:
-        cap.release()
-        return ""
-
-    frames = [
-        int(frame_count * 0.2),
-        int(frame_count * 0.5),
-        int(frame_count * 0.8),
-    ]
-
-    texts = []
-
-    for f in frames:
-        cap.set(cv2.CAP_PROP_POS_FRAMES, f)
-        ret, frame = cap.read()
-        if not ret:
-            continue
-
-        results = ocr_reader.readtext(frame, detail=0)
-        cleaned = [t.strip().lower() for t in results if len(t.strip()) > 3]
-        texts.extend(cleaned)
-
-    cap.release()
-
-    if not texts:
-        return ""
-
-    counts = Counter(texts)
-    repeated = [t for t, c in counts.items() if c >= 2]
+def merge_run_stats(stats):
+    if not stats:
+        return
+    with _stats_lock:
+        RUN_STATS.update(stats)
 
-    return " ".join(repeated)
+def report_run_stats():
+    if RUN_STATS.get("ocr_frames"):
+        frames = RUN_STATS["ocr_frames"]
+        skipped = RUN_STATS.get("ocr_skipped", 0)
+        print(
+            f"🔤 OCR: {frames} kare, {skipped} atlandı ({skipped / frames:.0%}), "
+            f"{RUN_STATS.get('ocr_cropped', 0)} kare sadece yazı bölgesiyle okundu, "
+            f"{RUN_STATS.get('ocr_hash_hits', 0)} kare önceki OCR sonucundan alındı"
+        )
+    if RUN_STATS.get("face_frames"):
+        frames = RUN_STATS["face_frames"]
+        detect_ms = RUN_STATS.get("face_detect_seconds", 0.0) * 1000 / frames
+        crops = RUN_STATS.get("face_crops", 0)
+        emotion_ms = RUN_STATS.get("face_emotion_seconds", 0.0) * 1000 / crops if crops else 0.0
+        batches = RUN_STATS.get("face_emotion_batches", 0)
+        print(
+            f"🙂 Yüz: {frames} kare, {RUN_STATS.get('face_prefiltered', 0)} ön filtrede elendi, "
+            f"tespit {detect_ms:.0f} ms/kare, {crops} yüz için duygu {emotion_ms:.0f} ms/yüz"
+            + (f" ({batches} batch)" if batches else "")
+        )
 
 # ======================================================
 # GÖRSEL ATMOSFER (BRIGHTNESS + BLUR)
 # ======================================================
-def extract_visual_features(video_path: str):
+def extract_visual_features(video_path: str, frames: VideoFrames = None, **sampling):
     if not video_path or not os.path.exists(video_path):
         return {
             "visual_brightness": None,
             "visual_blur": None,
         }
 
-    cap = cv2.VideoCapture(video_path)
-    brightness_vals = []
-    blur_vals = []
+    if frames is None:
+        frames = decode_video(video_path, (), visual=True, **sampling)
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        brightness_vals.append(gray.mean())
-        blur_vals.append(cv2.Laplacian(gray, cv2.CV_64F).var())
-
-    cap.release()
-
-    if not brightness_vals:
-        return {
-            "visual_brightness": None,
-            "visual_blur": None,
-        }
-
-    return {
-        "visual_brightness": round(float(sum(brightness_vals) / len(brightness_vals)), 2),
-        "visual_blur": round(float(sum(blur_vals) / len(blur_vals)), 2),
-    }
+    return frames.visual_stats()
 
 # ======================================================
 # TEMİZLEME
@@ -264,242 +122,696 @@ def temizle(t):
 # ======================================================
 # VIDEO İNDİRME
 # ======================================================
-def download_video(url, out):
-    apis = [
-        f"https://tikwm.com/api/?url={url}",
-        f"https://api.vvmd.cc/tk/?url={url}",
-    ]
-    for api in apis:
-        try:
-            r = requests.get(api, timeout=20)
-            if r.status_code != 200:
-                continue
-            mp4 = r.json().get("data", {}).get("play", "")
-            if not mp4:
-                continue
-
-            r2 = requests.get(mp4, stream=True, timeout=30)
-            if r2.status_code != 200:
-                continue
-
-            with open(out, "wb") as f:
-                for c in r2.iter_content(1024 * 64):
-                    if c:
-                        f.write(c)
-            return out
-        except:
-            pass
-    return None
+_downloader = None
+
+def get_downloader(**downloader_opts) -> Downloader:
+    """İlk çağrıdaki downloader_opts (resolvers / chunk_size / per_host / retries) kullanılır."""
+    global _downloader
+    if _downloader is None:
+        _downloader = Downloader(**downloader_opts)
+        atexit.register(close_downloader)
+    return _downloader
+
+def close_downloader():
+    global _downloader
+    if _downloader is not None:
+        _downloader.close()
+        _downloader = None
+
+def download_video(url, out, in_memory=True):
+    """Küçük klipler (--memory_max_mb) out yerine /dev/shm'e inebilir; gerçek yol döner."""
+    return get_downloader().download(url, out, in_memory=in_memory)
 
 # ======================================================
-# TRANSCRIPT (WHISPER – AYRI SCRIPT)
+# TRANSCRIPT (WHISPER – KALICI WORKER)
 # ======================================================
-def extract_transcript(video_path, script_dir):
-    if not video_path:
-        return ""
+WHISPER_MODEL = "small"
+WHISPER_MODELS = ("tiny", "base", "small")
 
-    out_txt = os.path.join(script_dir, f"_tr_{uuid.uuid4().hex}.txt")
-
-    subprocess.run(
-        ["python", "transcribe_whisper.py", video_path, out_txt],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-    )
+class WhisperWorker:
+    """
+    transcribe_whisper.py'yi --serve modunda tek sefer başlatır.
+    Model worker içinde bir kez yüklenir, videolar pipe üzerinden gönderilir.
 
-    if os.path.exists(out_txt):
-        with open(out_txt, "r", encoding="utf-8") as f:
-            txt = f.read()
-        os.remove(out_txt)
-        return temizle(txt)
+    batch_size > 1 ise eşzamanlı gelen VAD istekleri (indirme thread'leri) en fazla
+    batch_wait saniye bekletilip tek {"batch": [...]} isteğinde gönderilir;
+    worker VAD ile ayıklanan konuşma pencerelerini tek decode'da çözer. VAD'siz
+    istekler worker'da zaten tek tek çözüldüğünden beklemeden gönderilir.
+    """
 
-    return ""
+    def __init__(
+        self,
+        script_dir: str,
+        model_name: str = WHISPER_MODEL,
+        batch_size: int = 1,
+        batch_wait: float = 0.5,
+    ):
+        self.script_dir = script_dir
+        self.model_name = model_name
+        self.batch_size = max(1, int(batch_size))
+        self.batch_wait = max(0.0, float(batch_wait))
+        self.proc = None
+        self.lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.batcher = MicroBatcher(
+            self._send_batch, batch_size=self.batch_size, batch_wait=self.batch_wait, name="whisper-batch"
+        )
 
-# ======================================================
-# CAPTION AL
-# ======================================================
-def get_caption(page):
-    selectors = [
-        '[data-e2e="browse-video-desc"]',
-        '[data-e2e="video-desc"]',
-        'h1[data-e2e="browse-video-desc"]',
-        'h1[data-e2e="video-desc"]',
-    ]
-    for sel in selectors:
+        # zamanlama istatistikleri
+        self.load_seconds = None
+        self.count = 0
+        self.total_seconds = 0.0
+        self.audio_seconds = 0.0
+        self.speech_seconds = 0.0
+        self.skipped = Counter()
+        self.failed = 0
+
+    def _start(self):
+        self.proc = subprocess.Popen(
+            [
+                sys.executable,
+                os.path.join(self.script_dir, "transcribe_whisper.py"),
+                "--serve",
+                self.model_name,
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding="utf-8",
+            bufsize=1,
+            cwd=self.script_dir,
+        )
+        ready = self._read()
+        if ready is not None:
+            self.load_seconds = ready.get("load_seconds")
+            lazy_deps.record("whisper import (worker)", ready.get("import_seconds") or 0.0)
+            lazy_deps.record(f"whisper[{self.model_name}] model (worker)", self.load_seconds or 0.0)
+
+    def _read(self):
+        line = self.proc.stdout.readline()
+        if not line:
+            return None
         try:
-            page.locator(sel).first.wait_for(timeout=12000)
-            txt = page.locator(sel).first.text_content()
-            if txt and txt.strip():
-                return temizle(txt)
-        except:
-            pass
-    return ""
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    def _send(self, payload: dict):
+        """
+        İsteği gönderip yanıtı döner.
+        Worker çökmüşse bir kez yeniden başlatılır, yine olmazsa None döner.
+        """
+        with self.lock:
+            for _ in range(2):
+                if self.proc is None or self.proc.poll() is not None:
+                    try:
+                        self._start()
+                    except OSError as e:
+                        print("⚠️ Whisper worker başlatılamadı:", e)
+                        self.proc = None
+                        return None
+
+                try:
+                    self.proc.stdin.write(json.dumps(payload) + "\n")
+                    self.proc.stdin.flush()
+                    resp = self._read()
+                except (BrokenPipeError, OSError):
+                    resp = None
+
+                if resp is not None:
+                    return resp
+
+                self._stop()
+
+        return None
+
+    def _record(self, video_path: str, resp):
+        if resp is None or resp.get("error"):
+            with self.stats_lock:
+                self.failed += 1
+            print(
+                f"⚠️ Transcript alınamadı ({os.path.basename(video_path)}):",
+                (resp or {}).get("error") or "worker yanıt vermedi",
+            )
+            return None, float((resp or {}).get("seconds") or 0.0)
+
+        seconds = float(resp.get("seconds") or 0.0)
+        audio = float(resp.get("audio_seconds") or 0.0)
+        speech = float(resp.get("speech_seconds") or 0.0)
+
+        with self.stats_lock:
+            self.count += 1
+            self.total_seconds += seconds
+            self.audio_seconds += audio
+            self.speech_seconds += speech
+            if resp.get("skipped"):
+                self.skipped[resp["skipped"]] += 1
+
+        if audio > 0:
+            print(
+                f"🎙️ {os.path.basename(video_path)}: {audio:.1f} sn ses, {speech:.1f} sn konuşma, "
+                f"{seconds:.1f} sn (RTF {seconds / audio:.2f})"
+                + (f" [{resp['skipped']}]" if resp.get("skipped") else "")
+            )
+        return resp.get("text") or "", seconds
+
+    def transcribe(self, video_path: str, skip_silent: bool = False, vad: bool = False):
+        """
+        (metin, saniye) döner.
+        skip_silent=True ise sesi olmayan / neredeyse sessiz klipler Whisper'a verilmez.
+        vad=True ise sadece konuşma parçaları çözülür, müzik/konuşmasız klipler boş döner.
+        Worker çökmüşse bir kez yeniden başlatılır; yine olmazsa ya da çözümleme hata
+        verirse metin None döner (konuşmasız klipteki "" ile karışmasın, cache'lenmesin).
+        """
+        req = {"video_path": video_path, "skip_silent": skip_silent, "vad": vad}
+
+        # VAD'siz istekler batch'te de sırayla çözülür: beklemek sadece gecikme ekler
+        if self.batch_size <= 1 or not vad:
+            return self._record(video_path, self._send(req))
+
+        return self._record(video_path, self.batcher.submit(req))
+
+    def _send_batch(self, reqs):
+        resp = self._send({"batch": reqs})
+        return (resp or {}).get("results") or []
+
+    def _stop(self):
+        if self.proc is None:
+            return
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=10)
+        except Exception:
+            self.proc.kill()
+        self.proc = None
+
+    def close(self):
+        self.batcher.close()
+
+        with self.lock:
+            self._stop()
+
+        if self.count:
+            print(
+                f"🎙️ Whisper[{self.model_name}]: {self.count} video, model yükleme {self.load_seconds or 0:.1f} sn, "
+                f"toplam {self.total_seconds:.1f} sn "
+                f"(video başı {self.total_seconds / self.count:.1f} sn)"
+            )
+            if self.audio_seconds:
+                print(
+                    f"   {self.audio_seconds:.0f} sn sesin {self.speech_seconds:.0f} sn'si konuşma, "
+                    f"ortalama RTF {self.total_seconds / self.audio_seconds:.2f}"
+                    + (f", {self.batcher.batches} batch" if self.batcher.batches else "")
+                )
+            if self.skipped:
+                print(
+                    f"   🔇 Whisper'a verilmeyen: {self.skipped.get('no_audio', 0)} ses akışı olmayan, "
+                    f"{self.skipped.get('silent', 0)} neredeyse sessiz, "
+                    f"{self.skipped.get('no_speech', 0) + self.skipped.get('music', 0)} konuşmasız/müzik klip"
+                )
+        if self.failed:
+            print(f"   ⚠️ {self.failed} videonun transcript'i alınamadı (cache'e yazılmadı)")
+
+
+_transcriber = None
+
+def get_transcriber(script_dir: str, **worker_opts) -> WhisperWorker:
+    """İlk çağrıdaki worker_opts (model_name / batch_size / batch_wait) kullanılır."""
+    global _transcriber
+    if _transcriber is None:
+        _transcriber = WhisperWorker(script_dir, **worker_opts)
+        atexit.register(close_transcriber)
+    return _transcriber
+
+def close_transcriber():
+    global _transcriber
+    if _transcriber is not None:
+        _transcriber.close()
+        _transcriber = None
+
+def extract_transcript(video_path, script_dir, skip_silent=False, vad=False):
+    """Temizlenmiş transcript; Whisper hata verdiyse None."""
+    if not video_path:
+        return ""
+
+    txt, _ = get_transcriber(script_dir).transcribe(video_path, skip_silent=skip_silent, vad=vad)
+    return None if txt is None else temizle(txt)
 
 # ======================================================
-# TEK VİDEO İŞLE (HAM)
+# ÖZELLİK GRUPLARI (CACHE ANAHTARLARI)
 # ======================================================
-def process_video(page, source_type, source_value, url, script_dir):
-    page.goto(url, timeout=60000)
-    time.sleep(2)
+# özellik adı → CSV kolonları (satır kolon sırası da budur)
+FEATURE_COLUMNS = {
+    "transcript": ["transcript_raw"],
+    "overlay": ["overlay_text_raw"],
+    "face": ["face_detected", "face_dominant_emotion", "face_emotion_score"],
+    "visual": ["visual_brightness", "visual_blur"],
+}
+ANALYSIS_FEATURES = ["overlay", "face", "visual"]
+
+def feature_versions(analysis_opts=None):
+    """Cache için model/ayar versiyon etiketleri; değişince eski sonuçlar kullanılmaz."""
+    opts = analysis_opts or {}
+    samples = opts.get("ocr_samples", OCR_SAMPLES)
+    face_detector = opts.get("face_detector", DEFAULT_DETECTOR)
+    visual = f"visual-{opts.get('visual_mode', 'full')}"
+    if opts.get("visual_mode", "full") != "full":
+        visual += f"-{opts.get('visual_fps', 2.0):g}fps"
+    if opts.get("visual_max_width"):
+        visual += f"-w{opts['visual_max_width']}"
 
-    caption_raw = get_caption(page)
+    return {
+        "transcript": f"whisper-{opts.get('whisper_model', WHISPER_MODEL)}"
+        + ("-rms" if opts.get("skip_silent_audio", True) else "")
+        + ("-vad2" if opts.get("whisper_vad", False) else ""),
+        "overlay": "easyocr-en-tr-v1"
+        + ("-gate" if opts.get("ocr_gate", False) else "")
+        + (f"-n{samples}" if samples != OCR_SAMPLES else "")
+        + (f"-d{HASH_MAX_DIST}" if opts.get("ocr_dedup", True) else "")
+        + ("-share" if opts.get("ocr_share_author", False) else ""),
+        "face": "deepface-emotion-v1"
+        + (f"-{face_detector}" if face_detector != DEFAULT_DETECTOR else "")
+        + ("-pre" if opts.get("face_prefilter", True) else ""),
+        "visual": visual,
+    }
 
-    video_file = os.path.join(script_dir, f"v_{uuid.uuid4().hex}.mp4")
-    video_path = download_video(url, video_file)
+def _split_features(media: dict):
+    return {
+        feature: {col: media.get(col) for col in cols}
+        for feature, cols in FEATURE_COLUMNS.items()
+        if all(col in media for col in cols)
+    }
 
-    transcript_raw = extract_transcript(video_path, script_dir)
-    overlay_raw = extract_overlay_text(video_path)
+def _merge_features(features: dict):
+    merged = {}
+    for feature in FEATURE_COLUMNS:
+        merged.update(features.get(feature, {}))
+    return merged
 
-    face_info = extract_face_features(video_path)
-    visual_info = extract_visual_features(video_path)
+# ======================================================
+# VİDEO ANALİZİ (OCR + YÜZ + GÖRSEL)
+# ======================================================
+def analyze_video_file(video_path, options=None):
+    """
+    CPU/ML ağırlıklı aşamalar. Süreç havuzunda çalışabilmesi için
+    modül seviyesinde, dosya yolu + basit bir ayar dict'i alan bir fonksiyon.
+    options: features (hesaplanacak alt küme) / visual_mode / visual_fps /
+             visual_max_width / ocr_gate / ocr_samples / ocr_dedup /
+             ocr_group (OCR bölge hafızasının paylaşıldığı grup, örn. kullanıcı adı) /
+             face_detector / face_prefilter /
+             face_defer (True ise duygu skorlanmaz; yüz kırpıntısı "_face" anahtarında
+             döner, çağıran taraf EmotionBatcher ile videolar arası batch'ler)
+    Sayaçlar "_stats" anahtarında döner.
+    """
+    options = options or {}
+    features = options.get("features") or ANALYSIS_FEATURES
+    overlay_points = ocr_points(options.get("ocr_samples", OCR_SAMPLES))
+
+    # video tek sefer decode edilir, kareler çıkarıcılara paylaştırılır
+    frames = None
+    if video_path:
+        sample_points = []
+        if "face" in features:
+            sample_points.append(FACE_POINTS)
+        if "overlay" in features:
+            sample_points.append(overlay_points)
+
+        frames = decode_video(
+            video_path,
+            sample_points,
+            visual="visual" in features,
+            visual_mode=options.get("visual_mode", "full"),
+            visual_fps=options.get("visual_fps", 2.0),
+            visual_max_width=options.get("visual_max_width", 0),
+        )
 
-    if video_path and os.path.exists(video_path):
-        os.remove(video_path)
+    stats = Counter()
+    result = {}
+    if "overlay" in features:
+        result["overlay_text_raw"] = extract_overlay_text(
+            video_path,
+            frames,
+            gate=options.get("ocr_gate", False),
+            stats=stats,
+            points=overlay_points,
+            dedup=options.get("ocr_dedup", True),
+            group=options.get("ocr_group"),
+        )
+    if "face" in features and options.get("face_defer"):
+        result["_face"] = detect_faces(
+            [(video_path, frames)],
+            detector=options.get("face_detector", DEFAULT_DETECTOR),
+            prefilter=options.get("face_prefilter", True),
+            stats=stats,
+        )[0]
+    elif "face" in features:
+        result.update(
+            extract_face_features(
+                video_path,
+                frames,
+                detector=options.get("face_detector", DEFAULT_DETECTOR),
+                prefilter=options.get("face_prefilter", True),
+                stats=stats,
+            )
+        )
+    if "visual" in features:
+        result.update(extract_visual_features(video_path, frames))
+
+    result["_stats"] = dict(stats)
+    return result
+
+def empty_media():
+    """İndirme/analiz tamamen başarısız olan video için boş kolonlar."""
+    return _merge_features(_split_features({"transcript_raw": "", **analyze_video_file(None)}))
+
+def process_media(
+    url,
+    script_dir,
+    analysis_pool=None,
+    analysis_opts=None,
+    cache=None,
+    media_cache=None,
+    download=True,
+):
+    """
+    İndir → transcript + analiz → dosyayı sil.
+    analysis_pool verilirse OCR/yüz/görsel süreç havuzunda,
+    transcript ise aynı anda Whisper worker'da çalışır.
+    cache verilirse önce URL, indirme sonrası dosya hash'i ile bakılır;
+    sadece eksik özellikler hesaplanır.
+    media_cache verilirse video ID'si ile önce orada aranır, indirilen video
+    silinmeyip orada tutulur. download=False ise (offline yeniden analiz)
+    video cache'te yoksa None döner.
+    """
+    analysis_opts = analysis_opts or {}
+    versions = feature_versions(analysis_opts)
+    cached = {}
+    url_hash = None
+
+    # 1) URL daha önce işlendiyse indirme dahil hiçbir iş yapılmaz
+    if cache is not None:
+        url_hash = cache.content_hash_for_url(url)
+        if url_hash:
+            cached = cache.lookup(url_hash, versions)
+            if len(cached) == len(versions):
+                return _merge_features(cached)
+
+    video_id = video_id_from_url(url)
+    use_media_cache = media_cache is not None and bool(video_id)
+    video_path = media_cache.get(video_id) if use_media_cache else None
+
+    if video_path is None:
+        if not download:
+            return None
+        if use_media_cache:
+            # cache'teki dosya kalıcı olmalı: RAM yolu kullanılmaz
+            video_path = download_video(url, media_cache.path_for(video_id), in_memory=False)
+            if video_path:
+                media_cache.added(video_id)
+        else:
+            # sabit isim: yarıda kalan indirme (.part) sonraki çalıştırmada devam eder
+            video_file = os.path.join(script_dir, f"v_{video_id or uuid.uuid4().hex}.mp4")
+            video_path = download_video(url, video_file)
+    content_hash = None
+    # hata veren özellikler satıra boş yazılır ama cache'lenmez (sonraki çalıştırmada yeniden denenir)
+    failed = set()
 
+    try:
+        # 2) aynı içerik başka URL ile işlenmiş olabilir
+        if cache is not None and video_path:
+            content_hash = file_sha256(video_path)
+            cache.link_url(url, content_hash)
+            if content_hash != url_hash:
+                cached = cache.lookup(content_hash, versions)
+
+        todo = [f for f in ANALYSIS_FEATURES if f not in cached]
+        # yüz tespiti analizde, duygu skoru burada (videolar arası batch)
+        job_opts = {**analysis_opts, "features": todo, "face_defer": True}
+        if analysis_opts.get("ocr_share_author", False):
+            # aynı kullanıcının videoları OCR bölge hafızasını paylaşır
+            job_opts["ocr_group"] = author_from_url(url)
+
+        analysis_future = None
+        analysis = {}
+        if todo and analysis_pool is not None and video_path:
+            analysis_future = analysis_pool.submit(
+                analyze_video_file, video_path, job_opts
+            )
+
+        computed = {}
+        if "transcript" not in cached:
+            transcript = extract_transcript(
+                video_path,
+                script_dir,
+                skip_silent=analysis_opts.get("skip_silent_audio", True),
+                vad=analysis_opts.get("whisper_vad", False),
+            )
+            if transcript is None:
+                failed.add("transcript")
+            computed["transcript_raw"] = transcript or ""
+
+        if analysis_future is not None:
+            analysis = analysis_future.result()
+        elif todo:
+            analysis = analyze_video_file(video_path, job_opts)
+        stats = Counter(analysis.pop("_stats", None) or {})
+        if "_face" in analysis:
+            face = analysis.pop("_face")
+            emotion = get_emotion_batcher().score(face, stats)
+            if face is not None and emotion is None:
+                failed.add("face")
+            analysis.update(face_result(emotion))
+        merge_run_stats(stats)
+        computed.update(analysis)
+    finally:
+        if video_path and use_media_cache:
+            media_cache.release(video_path)
+        elif video_path and os.path.exists(video_path):
+            os.remove(video_path)
+
+    computed = _split_features(computed)
+    if cache is not None and content_hash:
+        for feature, value in computed.items():
+            if feature not in failed:
+                cache.put(content_hash, feature, versions[feature], value)
+
+    return _merge_features({**cached, **computed})
+
+def build_row(source_type, source_value, url, caption_raw, media):
     return {
         "source_type": source_type,
         "source_value": source_value,
         "video_url": url,
         "caption_raw": caption_raw,
-        "transcript_raw": transcript_raw,
-        "overlay_text_raw": overlay_raw,
-        **face_info,
-        **visual_info,
+        **media,
     }
 
 # ======================================================
-# LINK TOPLA
+# PIPELINE (CAPTION → İNDİRME → ANALİZ)
 # ======================================================
-def collect_links(page, limit):
-    try:
-        links = page.locator("a[href*='/video/']").evaluate_all(
-            "els => els.map(e => e.href)"
-        )
-        return list(dict.fromkeys(links))[:limit]
-    except:
-        return []
-
-def wait_for_tiktok_ready(page, timeout=180):
+class VideoPipeline:
     """
-    TikTok doğrulama / captcha geçilene kadar bekler.
-    Terminal input() YOK.
+    Aşamalı, eşzamanlı video işleme:
+        caption   → ana thread, CaptionPool sekmeleri (Playwright sync API thread-safe değil)
+        indirme   → thread havuzu (download_workers)
+        transcript→ Whisper worker (tek model, sıralı)
+        OCR/yüz/görsel → süreç havuzu (analysis_workers, 0 ise aynı süreçte)
+
+    Aynı anda işlemde olan video sayısı queue_size ile sınırlıdır; sınır
+    dolunca tarayıcı tarafı bekler. Satırlar link sırasıyla döner.
     """
-    print("⏳ TikTok doğrulama kontrol ediliyor...")
-
-    start = time.time()
-    while time.time() - start < timeout:
-        try:
-            url = page.url.lower()
-
-            # hâlâ verify/captcha sayfasındaysa bekle
-            if "verify" in url or "captcha" in url:
-                time.sleep(2)
-                continue
-
-            # Sayfada video linkleri gelmiş mi?
-            links = page.locator("a[href*='/video/']").count()
-            if links > 0:
-                print("✅ Doğrulama geçildi, devam ediliyor.")
-                return True
 
-        except:
-            pass
-
-        time.sleep(1)
+    def __init__(
+        self,
+        script_dir,
+        download_workers=2,
+        analysis_workers=1,
+        queue_size=4,
+        analysis_opts=None,
+        cache=None,
+        media_cache=None,
+    ):
+        self.script_dir = script_dir
+        self.cache = cache
+        self.media_cache = media_cache
+        self.analysis_opts = analysis_opts or {}
+        self.download_workers = max(1, int(download_workers))
+        self.analysis_workers = max(0, int(analysis_workers))
+
+        self.download_pool = ThreadPoolExecutor(
+            max_workers=self.download_workers,
+            thread_name_prefix="download",
+        )
+        self.analysis_pool = None
+        if self.analysis_workers > 0:
+            # spawn: Playwright/torch thread'leri olan süreci fork etmemek için
+            self.analysis_pool = ProcessPoolExecutor(
+                max_workers=self.analysis_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
 
-    print("⚠️ Doğrulama bekleme süresi doldu, devam ediliyor.")
-    return False
+        self.slots = threading.BoundedSemaphore(max(1, int(queue_size)))
+        self.jobs = []
+
+    def submit(self, source_type, source_value, url, caption_raw):
+        # bounded queue: çok fazla video beklemedeyse caption tarafı durur
+        self.slots.acquire()
+        fut = self.download_pool.submit(self._run, url)
+        fut.add_done_callback(lambda f: self.slots.release())
+        self.jobs.append(((source_type, source_value, url, caption_raw), fut))
+
+    def _run(self, url):
+        return process_media(
+            url,
+            self.script_dir,
+            self.analysis_pool,
+            self.analysis_opts,
+            self.cache,
+            self.media_cache,
+        )
 
+    def results(self):
+        rows = []
+        for (source_type, source_value, url, caption_raw), fut in self.jobs:
+            try:
+                media = fut.result()
+            except Exception as e:
+                print(f"❌ Video işlenemedi: {url} ({e})")
+                media = empty_media()
+            rows.append(build_row(source_type, source_value, url, caption_raw, media))
+        self.jobs = []
+        return rows
+
+    def close(self):
+        self.download_pool.shutdown(wait=True)
+        if self.analysis_pool is not None:
+            self.analysis_pool.shutdown(wait=True)
 
 # ======================================================
 # HASHTAG & USER SCRAPE
 # ======================================================
-def scrape_hashtag(tag, limit, script_dir, headless=0):
+def run_pipeline(context, feed, script_dir, caption_opts=None, pipeline_opts=None):
+    """
+    Caption'lar sekme havuzunda (ana thread), indirme/analiz VideoPipeline'da.
+    feed (FeedScheduler) linkleri kaydırdıkça üretir; caption / indirme ilk linkle başlar.
+    caption_opts: pages (sekme sayısı) / block_resources / source (json / dom)
+    json kaynağında akıştan caption'ı bilinen videolara gidilmez.
+    """
+    caption_opts = caption_opts or {}
+    source = caption_opts.get("source", "json")
+    pool = CaptionPool(
+        context,
+        size=caption_opts.get("pages", 4),
+        block_resources=caption_opts.get("block_resources", True),
+        source=source,
+    )
+    known = feed.caption_for if source == "json" else None
+    pipeline = VideoPipeline(script_dir, **(pipeline_opts or {}))
+    try:
+        for i, (v, caption) in enumerate(pool.captions(feed.links(), known=known), 1):
+            print(f"[{i}/{feed.total}] {v}")
+            source_type, source_value = feed.source_for(v)
+            pipeline.submit(source_type, source_value, v, temizle(caption))
+
+        return pipeline.results()
+    finally:
+        pipeline.close()
+        feed.close()
+        feed.report()
+        pool.report()
+        pool.close()
+
+
+def scrape_queries(
+    queries,
+    limit,
+    script_dir,
+    headless=0,
+    url_index=None,
+    caption_opts=None,
+    storage_state=None,
+    feed_tabs=2,
+    **pipeline_opts,
+):
+    """
+    queries: [("hashtag" | "user", değer), ...]; limit sorgu başınadır.
+    Tüm sorgular tek tarayıcı / tek context'te çalışır, sonuç tek DataFrame.
+    """
     rows = []
+    sync_playwright = lazy_deps.module("playwright.sync_api").sync_playwright
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=bool(headless), channel="chrome")
-        page = browser.new_page()
-
-        page.goto(f"https://www.tiktok.com/tag/{tag}", timeout=120000)
-        page.goto(f"https://www.tiktok.com/tag/{tag}", timeout=120000)
-
-        wait_for_tiktok_ready(page)
-
-        page.mouse.wheel(0, 8000)
-        time.sleep(2)
-
-
-        page.mouse.wheel(0, 8000)
-        time.sleep(2)
-
-        links = collect_links(page, limit)
-        for i, v in enumerate(links, 1):
-            print(f"[{i}/{len(links)}] {v}")
-            rows.append(process_video(page, "hashtag", tag, v, script_dir))
-
-        browser.close()
+        context = new_context(browser, storage_state)
+        feed = FeedScheduler(
+            context,
+            queries,
+            limit,
+            known=url_index,
+            tabs=feed_tabs,
+            storage_state=storage_state,
+        )
+        try:
+            rows = run_pipeline(context, feed, script_dir, caption_opts, pipeline_opts)
+        finally:
+            browser.close()
 
     return pd.DataFrame(rows)
 
 
-def scrape_user(username, limit, script_dir, headless=0):
-    rows = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=bool(headless), channel="chrome")
-        page = browser.new_page()
-
-        page.goto(f"https://www.tiktok.com/@{username}", timeout=120000)
-        page.goto(f"https://www.tiktok.com/@{username}", timeout=120000)
-
-        wait_for_tiktok_ready(page)
-
-        page.mouse.wheel(0, 8000)
-        time.sleep(2)
+def scrape_hashtag(tag, limit, script_dir, **opts):
+    return scrape_queries([("hashtag", tag)], limit, script_dir, **opts)
 
 
-        page.mouse.wheel(0, 8000)
-        time.sleep(2)
-
-        links = collect_links(page, limit)
-        for i, v in enumerate(links, 1):
-            print(f"[{i}/{len(links)}] {v}")
-            rows.append(process_video(page, "user", username, v, script_dir))
-
-        browser.close()
-
-    return pd.DataFrame(rows)
+def scrape_user(username, limit, script_dir, **opts):
+    return scrape_queries([("user", username)], limit, script_dir, **opts)
 
 # ======================================================
 # CSV YAZ (APPEND + DUPLICATE KORUMA)
 # ======================================================
-def append_csv(csv_path, df):
+def append_csv(csv_path, df, url_index=None):
     if df is None or len(df) == 0:
         print("ℹ️ Yeni veri yok.")
         return
 
-    if os.path.exists(csv_path):
-        old_df = pd.read_csv(csv_path)
+    # tüm CSV yerine kalıcı URL indeksine bakılır
+    if url_index is None:
+        url_index = UrlIndex(csv_path)
 
-        if "video_url" in old_df.columns:
-            existing = set(old_df["video_url"].astype(str))
-            before = len(df)
-            df = df[~df["video_url"].astype(str).isin(existing)]
+    if "video_url" in df.columns:
+        before = len(df)
+        df = df[~df["video_url"].map(lambda u: u in url_index)]
+        df = df.drop_duplicates(subset="video_url")
+        if before - len(df):
             print(f"🧹 Duplicate silindi: {before - len(df)}")
 
+    if os.path.exists(csv_path):
+        # sadece başlık okunur (kolon sırası için)
+        old_columns = pd.read_csv(csv_path, nrows=0).columns
+
         if len(df) == 0:
             print("ℹ️ Tüm videolar daha önce kayıtlı.")
             return
 
-        for col in old_df.columns:
+        df = df.copy()
+        for col in old_columns:
             if col not in df.columns:
                 df[col] = None
-        df = df[old_df.columns]
+        df = df[old_columns]
 
         df.to_csv(csv_path, mode="a", header=False, index=False, encoding="utf-8-sig")
         print(f"✅ {len(df)} yeni satır eklendi.")
     else:
+        if len(df) == 0:
+            print("ℹ️ Tüm videolar daha önce kayıtlı.")
+            return
+
         df.to_csv(csv_path, index=False, encoding="utf-8-sig")
         print(f"🆕 CSV oluşturuldu ({len(df)} satır).")
 
+    if "video_url" in df.columns:
+        url_index.add(df["video_url"].astype(str))
+
 # ======================================================
 # MAIN
 # ======================================================
@@ -509,9 +821,295 @@ def append_csv(csv_path, df):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
 
-    parser.add_argument("--mode", choices=["hashtag", "user"], required=True)
-    parser.add_argument("--query", required=True)
-    parser.add_argument("--limit", type=int, default=5)
+    parser.add_argument(
+        "--mode",
+        choices=list(QUERY_KINDS),
+        default=None,
+        help="Öneksiz sorguların türü (varsayılan: hashtag)",
+    )
+    parser.add_argument("--query", default=None)
+    parser.add_argument(
+        "--queries",
+        nargs="+",
+        default=[],
+        help="Birden çok sorgu: #etiket, @kullanici, hashtag:x, user:x",
+    )
+    parser.add_argument(
+        "--queries_file",
+        default=None,
+        help="Satır başına bir sorgu içeren dosya (--queries ile aynı yazım)",
+    )
+    parser.add_argument(
+        "--feed_tabs",
+        type=int,
+        default=2,
+        help="Sorguların aynı anda kaydırıldığı akış sekmesi sayısı",
+    )
+    parser.add_argument("--limit", type=int, default=5, help="Sorgu başına yeni video sayısı")
+    parser.add_argument(
+        "--download_workers",
+        type=int,
+        default=2,
+        help="Aynı anda indirilecek video sayısı (thread)",
+    )
+    parser.add_argument(
+        "--analysis_workers",
+        type=int,
+        default=1,
+        help="OCR/yüz/görsel analizi için süreç sayısı (0: aynı süreçte)",
+    )
+    parser.add_argument(
+        "--queue_size",
+        type=int,
+        default=4,
+        help="Aynı anda işlemde bekleyebilecek en fazla video sayısı",
+    )
+    parser.add_argument(
+        "--caption_pages",
+        type=int,
+        default=4,
+        help="Caption'ların aynı anda yüklendiği sekme sayısı",
+    )
+    parser.add_argument(
+        "--caption_source",
+        choices=list(CAPTION_SOURCES),
+        default="json",
+        help="json: akış yanıtları + sayfa içi JSON (gerekirse DOM), dom: sadece render edilmiş DOM",
+    )
+    parser.add_argument(
+        "--block_resources",
+        type=int,
+        choices=[0, 1],
+        default=1,
+        help="1 ise caption sekmelerinde görsel/video/font istekleri engellenir",
+    )
+    parser.add_argument(
+        "--media_cache",
+        type=int,
+        choices=[0, 1],
+        default=0,
+        help="1 ise indirilen videolar silinmez, medya cache'inde tutulur (tekrar analizde indirme yok)",
+    )
+    parser.add_argument(
+        "--media_cache_dir",
+        default=MEDIA_CACHE_DIR,
+        help="Medya cache klasörü",
+    )
+    parser.add_argument(
+        "--media_cache_max_mb",
+        type=float,
+        default=4096,
+        help="Medya cache boyut sınırı (MB), aşılırsa en eski kullanılan videolar silinir (0: sınırsız)",
+    )
+    parser.add_argument(
+        "--download_chunk_kb",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE // 1024,
+        help="İndirmede okunan parça boyutu (KB)",
+    )
+    parser.add_argument(
+        "--download_per_host",
+        type=int,
+        default=4,
+        help="Aynı sunucuya aynı anda açılan en fazla indirme",
+    )
+    parser.add_argument(
+        "--download_retries",
+        type=int,
+        default=3,
+        help="Geçici hatalarda tekrar deneme sayısı (artan beklemeli)",
+    )
+    parser.add_argument(
+        "--memory_max_mb",
+        type=float,
+        default=32,
+        help="Bu boyuta kadar klipler diske değil /dev/shm'e (RAM) indirilir (0: kapalı, medya cache'te kullanılmaz)",
+    )
+    parser.add_argument(
+        "--resolver",
+        action="append",
+        default=None,
+        help="mp4 linki çözücü API şablonu ({url} yer tutucusu ile); birden çok verilebilir",
+    )
+    parser.add_argument(
+        "--visual_mode",
+        choices=list(VISUAL_MODES),
+        default="full",
+        help="Brightness/blur örnekleme: full (her kare), fps, seek",
+    )
+    parser.add_argument(
+        "--visual_fps",
+        type=float,
+        default=2.0,
+        help="fps/seek modunda saniyede örneklenen kare",
+    )
+    parser.add_argument(
+        "--visual_max_width",
+        type=int,
+        default=0,
+        help="Laplacian öncesi küçültme genişliği (0: küçültme yok)",
+    )
+    parser.add_argument(
+        "--ocr_gate",
+        type=int,
+        choices=[0, 1],
+        default=0,
+        help="1 ise yazı adayı olmayan karelerde OCR atlanır, olanlarda sadece yazı bölgesi okunur "
+        "(deneysel: etiketli CSV'ye göre recall'u bench_ocr_gate.py --csv ile ölçülmeli)",
+    )
+    parser.add_argument(
+        "--ocr_samples",
+        type=int,
+        default=0,
+        help=f"Video başına OCR örnek kare sayısı (0: --ocr_gate 1 ve --ocr_dedup 1 ise {OCR_DEDUP_SAMPLES}, "
+        f"değilse {OCR_SAMPLES}; 3: eski 20/50/80%% noktaları)",
+    )
+    parser.add_argument(
+        "--ocr_dedup",
+        type=int,
+        choices=[0, 1],
+        default=1,
+        help="1 ise aynı yazı bölgesi (yakın kutu + birkaç bit farklı bölge hash'i) video içinde tekrar OCR'lanmaz",
+    )
+    parser.add_argument(
+        "--ocr_share_author",
+        type=int,
+        choices=[0, 1],
+        default=0,
+        help="1 ise OCR bölge hafızası aynı kullanıcının videoları arasında da paylaşılır (deneysel)",
+    )
+    parser.add_argument(
+        "--whisper_model",
+        choices=list(WHISPER_MODELS),
+        default=WHISPER_MODEL,
+        help="Whisper model boyutu",
+    )
+    parser.add_argument(
+        "--whisper_vad",
+        type=int,
+        choices=[0, 1],
+        default=0,
+        help="1 ise sadece konuşma parçaları çözülür, müzik/konuşmasız klipler atlanır",
+    )
+    parser.add_argument(
+        "--whisper_batch",
+        type=int,
+        default=0,
+        help="--whisper_vad 1 iken tek decode çağrısında birleştirilen video sayısı (0: --download_workers, 1: batch yok)",
+    )
+    parser.add_argument(
+        "--whisper_batch_wait",
+        type=float,
+        default=0.5,
+        help="Batch dolması için en fazla beklenen süre (sn)",
+    )
+    parser.add_argument(
+        "--skip_silent_audio",
+        type=int,
+        choices=[0, 1],
+        default=1,
+        help="1 ise neredeyse sessiz (RMS) klipler Whisper'a verilmez",
+    )
+    parser.add_argument(
+        "--face_detector",
+        choices=list(FACE_DETECTORS),
+        default=DEFAULT_DETECTOR,
+        help="DeepFace yüz dedektörü (sadece ön filtreden geçen karelerde çalışır)",
+    )
+    parser.add_argument(
+        "--face_prefilter",
+        type=int,
+        choices=[0, 1],
+        default=1,
+        help="1 ise önce ucuz Haar cascade ile yüz adayı aranır; aday yoksa dedektör çalışmaz",
+    )
+    parser.add_argument(
+        "--face_batch",
+        type=int,
+        default=0,
+        help="Duygu modeline birlikte verilen yüz sayısı, videolar arası (0: --download_workers)",
+    )
+    parser.add_argument(
+        "--face_batch_wait",
+        type=float,
+        default=FACE_BATCH_WAIT,
+        help="Yüz batch'i dolmazsa en fazla bu kadar saniye beklenir",
+    )
+    parser.add_argument(
+        "--risk_chunking",
+        type=int,
+        choices=[0, 1],
+        default=0,
+        help="1 ise 512 tokendan uzun metinler kayan pencerelerle skorlanır",
+    )
+    parser.add_argument(
+        "--risk_stride",
+        type=int,
+        default=CHUNK_STRIDE,
+        help="Pencere başlangıçları arası token sayısı",
+    )
+    parser.add_argument(
+        "--risk_aggregate",
+        choices=list(CHUNK_AGGREGATES),
+        default="max",
+        help="Pencere skorlarının birleştirilmesi: max, mean, topk",
+    )
+    parser.add_argument(
+        "--risk_top_k",
+        type=int,
+        default=3,
+        help="topk birleştirmede ortalaması alınan pencere sayısı",
+    )
+    parser.add_argument(
+        "--risk_max_tokens",
+        type=int,
+        default=0,
+        help="Çalıştırma başına toplam token sınırı (0: sınırsız)",
+    )
+    parser.add_argument(
+        "--risk_backend",
+        choices=list(RISK_BACKENDS),
+        default=os.environ.get("RISK_BACKEND", "torch"),
+        help="BERT inference: torch (fp32), int8 (dinamik quantization), onnx",
+    )
+    parser.add_argument(
+        "--risk_threads",
+        type=int,
+        default=int(os.environ.get("RISK_THREADS", "0") or 0),
+        help="BERT inference thread sayısı (0: varsayılan)",
+    )
+    parser.add_argument(
+        "--profile_startup",
+        "--profile-startup",
+        type=int,
+        choices=[0, 1],
+        default=0,
+        help="1 ise import ve model yükleme sürelerini bileşen bazında yazdırır",
+    )
+    parser.add_argument(
+        "--cache",
+        type=int,
+        choices=[0, 1],
+        default=1,
+        help="1 ise daha önce işlenen videoların sonuçları cache'ten okunur",
+    )
+    parser.add_argument(
+        "--cache_path",
+        default=CACHE_NAME,
+        help="Sonuç cache'i (SQLite) dosyası",
+    )
+    parser.add_argument(
+        "--cache_max_mb",
+        type=float,
+        default=1024,
+        help="Cache boyut sınırı (MB), aşılırsa en eski kullanılanlar silinir",
+    )
+    parser.add_argument(
+        "--cache_max_age_days",
+        type=float,
+        default=90,
+        help="Bu kadar günden eski cache kayıtları silinir (0: sınırsız)",
+    )
 
     # UI ile uyumlu opsiyonlar
     parser.add_argument(
@@ -528,6 +1126,18 @@ if __name__ == "__main__":
         default=0,
         help="1 ise tarayıcı headless (görünmez) çalışır",
     )
+    parser.add_argument(
+        "--reuse_session",
+        type=int,
+        choices=[0, 1],
+        default=1,
+        help="1 ise doğrulama sonrası çerezler kaydedilir ve sonraki açılışlarda kullanılır",
+    )
+    parser.add_argument(
+        "--storage_state",
+        default=STORAGE_STATE_FILE,
+        help="Tarayıcı oturumu (storage_state) dosyası",
+    )
     parser.add_argument(
         "--out_csv",
         default="tiktok_analyzed.csv",
@@ -536,31 +1146,125 @@ if __name__ == "__main__":
 
     args = parser.parse_args()
 
+    query_items = ([args.query] if args.query else []) + list(args.queries)
+    if args.queries_file:
+        query_items += read_queries_file(args.queries_file)
+    queries = parse_queries(query_items, default_kind=args.mode or "hashtag")
+    if not queries:
+        parser.error("--query, --queries veya --queries_file ile en az bir sorgu verilmeli")
+
+    if args.profile_startup == 1:
+        atexit.register(lazy_deps.report, _IMPORT_SECONDS)
+
     script_dir = os.path.dirname(os.path.abspath(__file__))
     csv_path = os.path.join(script_dir, CSV_NAME)
 
-    # ---------------- SCRAPE ----------------
-    if args.mode == "hashtag":
-        df = scrape_hashtag(
-            args.query,
-            args.limit,
-            script_dir,
-            headless=args.headless,
+    # kayıtlı videolar işleme girmeden elensin diye indeks tek sefer yüklenir
+    url_index = UrlIndex(csv_path)
+
+    cache = None
+    if args.cache == 1:
+        cache = ResultCache(
+            os.path.join(script_dir, args.cache_path),
+            max_mb=args.cache_max_mb,
+            max_age_days=args.cache_max_age_days,
         )
-    else:
-        df = scrape_user(
-            args.query,
-            args.limit,
-            script_dir,
-            headless=args.headless,
+
+    media_cache = None
+    if args.media_cache == 1:
+        media_cache = MediaCache(
+            os.path.join(script_dir, args.media_cache_dir),
+            max_mb=args.media_cache_max_mb,
         )
 
+    get_downloader(
+        resolvers=args.resolver or DEFAULT_RESOLVERS,
+        chunk_size=max(1, args.download_chunk_kb) * 1024,
+        per_host=args.download_per_host,
+        retries=args.download_retries,
+        memory_max_bytes=int(max(0.0, args.memory_max_mb) * 1024 * 1024),
+    )
+
+    # worker ilk transcript isteğinde başlar; ayarlar burada sabitlenir
+    get_transcriber(
+        script_dir,
+        model_name=args.whisper_model,
+        # aynı anda en fazla download_workers video transcript bekler;
+        # VAD kapalıyken batch kazanç getirmez, ilk klip ikinciyi beklemesin
+        batch_size=(args.whisper_batch or args.download_workers) if args.whisper_vad else 1,
+        batch_wait=args.whisper_batch_wait,
+    )
+
+    # eşzamanlı video sayısı indirme thread'leri kadar: batch bundan büyük dolmaz
+    get_emotion_batcher(
+        batch_size=args.face_batch or args.download_workers,
+        batch_wait=args.face_batch_wait,
+    )
+
+    pipeline_opts = {
+        "cache": cache,
+        "media_cache": media_cache,
+        "download_workers": args.download_workers,
+        "analysis_workers": args.analysis_workers,
+        "queue_size": args.queue_size,
+        "analysis_opts": {
+            "visual_mode": args.visual_mode,
+            "visual_fps": args.visual_fps,
+            "visual_max_width": args.visual_max_width,
+            "ocr_gate": bool(args.ocr_gate),
+            # tam karede (filtresiz) arka plan hareketi hash'i değiştirir, dedup az tutar
+            "ocr_samples": max(
+                1,
+                args.ocr_samples
+                or (OCR_DEDUP_SAMPLES if args.ocr_gate and args.ocr_dedup else OCR_SAMPLES),
+            ),
+            "ocr_dedup": bool(args.ocr_dedup),
+            "ocr_share_author": bool(args.ocr_share_author),
+            "skip_silent_audio": bool(args.skip_silent_audio),
+            "whisper_model": args.whisper_model,
+            "whisper_vad": bool(args.whisper_vad),
+            "face_detector": args.face_detector,
+            "face_prefilter": bool(args.face_prefilter),
+        },
+    }
+
+    caption_opts = {
+        "pages": max(1, args.caption_pages),
+        "block_resources": bool(args.block_resources),
+        "source": args.caption_source,
+    }
+
+    storage_state = None
+    if args.reuse_session == 1:
+        storage_state = os.path.join(script_dir, args.storage_state)
+
+    # ---------------- SCRAPE ----------------
+    df = scrape_queries(
+        queries,
+        args.limit,
+        script_dir,
+        headless=args.headless,
+        url_index=url_index,
+        caption_opts=caption_opts,
+        storage_state=storage_state,
+        feed_tabs=args.feed_tabs,
+        **pipeline_opts,
+    )
+
+    # Whisper worker'ı kapat, model belleği serbest kalsın
+    close_transcriber()
+    report_run_stats()
+    if media_cache is not None:
+        media_cache.report()
+
     if df is None or len(df) == 0:
         print("⚠️ Veri bulunamadı, işlem sonlandırıldı.")
+        if cache is not None:
+            cache.close()
         exit(0)
 
     # Ham CSV her zaman append edilir
-    append_csv(csv_path, df)
+    append_csv(csv_path, df, url_index)
     print("✅ HAM VERİ TOPLAMA TAMAMLANDI")
 
     # ---------------- ANALYZE ----------------
@@ -568,7 +1272,17 @@ if __name__ == "__main__":
         analyzed_path = os.path.join(script_dir, args.out_csv)
 
         print("🔎 Risk analizi (yalnızca bu çalıştırma) başlıyor...")
-        df = add_risk_columns(df, script_dir)
+        set_risk_backend(args.risk_backend, args.risk_threads)
+        df = add_risk_columns(
+            df,
+            script_dir,
+            cache=cache,
+            chunking=bool(args.risk_chunking),
+            chunk_stride=args.risk_stride,
+            aggregate=args.risk_aggregate,
+            top_k=args.risk_top_k,
+            max_total_tokens=args.risk_max_tokens,
+        )
         print("✅ Risk analizi bitti.")
 
         # OVERWRITE: aynı isimde dosya varsa üstüne yazar
@@ -578,3 +1292,6 @@ if __name__ == "__main__":
         )
     else:
         print("ℹ️ Analyze kapalı, analyzed CSV üretilmedi.")
+
+    if cache is not None:
+        cache.close()
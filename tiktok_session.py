@@ -0,0 +1,98 @@
+import os
+import time
+
+# ======================================================
+# TARAYICI OTURUMU & DOĞRULAMA BEKLEME
+# ======================================================
+# Doğrulama / captcha sonrası çerezler storage_state dosyasına yazılır ve sonraki
+# açılışlarda context bu durumla başlatılır; TikTok doğrulamayı her çalıştırmada
+# tekrar istemez.
+# wait_for_tiktok_ready sabit aralıklarla url / locator yoklamaz: sayfa içinde
+# tek bir koşul (video linki geldi mi / doğrulama ekranı mı) wait_for_function
+# ile beklenir; sayfa hazırsa ilk karede döner.
+STORAGE_STATE_FILE = "tiktok_storage_state.json"
+
+READY_SELECTOR = "a[href*='/video/']"
+VERIFY_SELECTOR = ", ".join((
+    "#captcha-verify-container",
+    "#captcha_container",
+    ".captcha_verify_container",
+    ".captcha-verify-container",
+    "[class*='captcha_verify']",
+))
+
+# "ready" | "verify" | false (henüz belli değil); passed=True iken doğrulama
+# ekranı beklemeyi bitirmez, sadece "ready" beklenir
+STATE_JS = """
+([ready, verify, passed]) => {
+    const url = location.href.toLowerCase();
+    const verifying = url.includes("verify") || url.includes("captcha")
+        || document.querySelector(verify) !== null;
+    if (!verifying && document.querySelector(ready)) return "ready";
+    if (verifying && !passed) return "verify";
+    return false;
+}
+"""
+
+
+def new_context(browser, state_path=None):
+    """Kayıtlı storage_state varsa onunla yeni context (bozuksa temiz context)."""
+    if state_path and os.path.exists(state_path):
+        try:
+            context = browser.new_context(storage_state=state_path)
+            print("🍪 Kayıtlı tarayıcı oturumu yüklendi.")
+            return context
+        except Exception as e:
+            print("⚠️ Kayıtlı oturum okunamadı, temiz oturum açılıyor:", e)
+    return browser.new_context()
+
+
+def save_storage_state(context, state_path):
+    if not state_path:
+        return
+    tmp = state_path + ".tmp"
+    try:
+        context.storage_state(path=tmp)
+        os.replace(tmp, state_path)
+    except Exception as e:
+        print("⚠️ Tarayıcı oturumu kaydedilemedi:", e)
+
+
+def wait_for_tiktok_ready(page, timeout=180):
+    """
+    TikTok doğrulama / captcha geçilene ve video linkleri gelene kadar bekler.
+    Terminal input() YOK.
+    """
+    print("⏳ TikTok doğrulama kontrol ediliyor...")
+
+    deadline = time.monotonic() + timeout
+    passed = False
+    while True:
+        remaining = (deadline - time.monotonic()) * 1000
+        if remaining <= 0:
+            break
+        try:
+            state = page.wait_for_function(
+                STATE_JS,
+                arg=[READY_SELECTOR, VERIFY_SELECTOR, passed],
+                timeout=remaining,
+            ).json_value()
+        except Exception as e:
+            if type(e).__name__ == "TimeoutError":
+                break
+            # doğrulama sonrası yönlendirme: yeni sayfanın yüklenmesi beklenir
+            try:
+                page.wait_for_load_state("domcontentloaded", timeout=remaining)
+            except Exception:
+                pass
+            continue
+
+        if state == "ready":
+            print("✅ Doğrulama geçildi, devam ediliyor.")
+            return True
+
+        passed = True
+        print("🔐 Doğrulama ekranı algılandı, tarayıcıda tamamlanması bekleniyor...")
+
+    print("⚠️ Doğrulama bekleme süresi doldu, devam ediliyor.")
+    return False
@@ -0,0 +1,38 @@
+import re
+from urllib.parse import urlsplit
+
+# ======================================================
+# TIKTOK URL YARDIMCILARI
+# ======================================================
+_VIDEO_RE = re.compile(r"/@([^/?#]+)/video/(\d+)")
+_VIDEO_ID_RE = re.compile(r"/video/(\d+)")
+
+
+def video_id_from_url(url) -> str:
+    """https://www.tiktok.com/@kullanici/video/7518005372590853392 → '7518005372590853392'"""
+    m = _VIDEO_ID_RE.search(str(url or ""))
+    return m.group(1) if m else ""
+
+
+def author_from_url(url) -> str:
+    """https://www.tiktok.com/@Kullanici/video/75... → 'kullanici' (yoksa '')"""
+    m = _VIDEO_RE.search(str(url or ""))
+    return m.group(1).lower() if m else ""
+
+
+def normalize_video_url(url) -> str:
+    """
+    Aynı videonun farklı yazımlarını tek anahtara indirger:
+    query/fragment atılır, host küçük harfe çevrilir, sondaki '/' silinir.
+    """
+    s = str(url or "").strip()
+    if not s:
+        return ""
+
+    m = _VIDEO_RE.search(s)
+    if m:
+        return f"https://www.tiktok.com/@{m.group(1)}/video/{m.group(2)}"
+
+    parts = urlsplit(s)
+    path = parts.path.rstrip("/")
+    return f"{parts.scheme or 'https'}://{parts.netloc.lower()}{path}"
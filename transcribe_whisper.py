@@ -1,70 +1,385 @@
 import os
 import sys
-import uuid
+import json
+import time
 import subprocess
 import certifi
 
 # SSL sertifika yolu (Mac'te model indirme sorunlarını azaltır)
 os.environ["SSL_CERT_FILE"] = certifi.where()
 
-import whisper
+# whisper (torch ile birlikte) sadece gerçekten transcript gerekirken import edilir
 
-def main():
-    if len(sys.argv) < 3:
-        # Kullanım: python transcribe_whisper.py <video_path> <out_txt>
-        sys.exit(1)
+DEFAULT_MODEL = "small"
+SAMPLE_RATE = 16000
 
-    video_path = sys.argv[1]
-    out_path = sys.argv[2]
+# Sessizlik kontrolü: 0.5 sn'lik pencerelerin en yükseğinin RMS'i bunun
+# altındaysa (~ -50 dBFS) klipte duyulabilir ses yok sayılır
+SILENCE_RMS = 0.003
+RMS_WINDOW = SAMPLE_RATE // 2
 
-    if not os.path.exists(video_path):
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write("")
-        sys.exit(0)
 
-    wav_path = f"_audio_{uuid.uuid4().hex}.wav"
+def load_audio(video_path: str):
+    """
+    ffmpeg çıktısını pipe'tan okur: mono 16 kHz float32 NumPy dizisi (geçici dosya yok).
+    Ses akışı yoksa boş dizi döner.
+    """
+    import numpy as np
+
+    cmd = [
+        "ffmpeg", "-nostdin",
+        "-i", video_path,
+        "-vn",
+        "-ac", "1",
+        "-ar", str(SAMPLE_RATE),
+        "-f", "s16le",
+        "-acodec", "pcm_s16le",
+        "-",
+    ]
+    proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    # ses akışı olmayan videoda ffmpeg hata ile çıkar, stdout boş kalır
+    return np.frombuffer(proc.stdout, np.int16).astype(np.float32) / 32768.0
+
+
+def is_silent(audio, threshold: float = SILENCE_RMS) -> bool:
+    """En gürültülü 0.5 sn'lik pencere bile eşik altındaysa True."""
+    if audio.size == 0:
+        return True
+    n = audio.size // RMS_WINDOW * RMS_WINDOW
+    if n == 0:
+        return float((audio ** 2).mean() ** 0.5) < threshold
+    windows = audio[:n].reshape(-1, RMS_WINDOW)
+    return float(((windows ** 2).mean(axis=1) ** 0.5).max()) < threshold
+
+
+# ======================================================
+# VAD (ENERJİ TABANLI) + BATCH DECODE
+# ======================================================
+# 30 ms'lik karelerin RMS'i gürültü tabanının VAD_NOISE_RATIO katını (ve
+# VAD_MIN_RMS'i) geçerse konuşma adayı sayılır. Kısa boşluklar doldurulur,
+# çok kısa parçalar atılır. Konuşma parçaları 30 sn'lik Whisper pencerelerine
+# paketlenir ve birden çok videonun pencereleri tek whisper.decode çağrısında
+# çözülür. Whisper'ın kendi no_speech kuralı (transcribe() ile aynı eşikler)
+# müzik/konuşmasız pencereleri eler. transcribe()'daki sıcaklık geri dönüşü de
+# uygulanır: tekrar döngüsüne giren (compression_ratio) ya da düşük olasılıklı
+# (avg_logprob) pencereler bir sonraki sıcaklıkta yeniden çözülür.
+
+VAD_FRAME = int(0.03 * SAMPLE_RATE)
+VAD_MIN_RMS = 0.01
+VAD_NOISE_RATIO = 3.0
+VAD_MAX_GAP = 10        # kare (0.3 sn) — arası bu kadar kısa parçalar birleşir
+VAD_MIN_SPEECH = 8      # kare (0.24 sn) — daha kısa parçalar atılır
+VAD_PAD = int(0.2 * SAMPLE_RATE)
+
+WINDOW_SAMPLES = 30 * SAMPLE_RATE
+DECODE_BATCH = 8
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+COMPRESSION_RATIO_THRESHOLD = 2.4
+TEMPERATURES = (0.0, 0.2, 0.4, 0.6, 0.8, 1.0)
+
+
+def speech_segments(audio):
+    """Konuşma olabilecek [(başlangıç, bitiş), ...] örnek indeksleri."""
+    import numpy as np
+
+    n = audio.size // VAD_FRAME
+    if n == 0:
+        return []
 
+    rms = np.sqrt((audio[:n * VAD_FRAME].reshape(n, VAD_FRAME) ** 2).mean(axis=1))
+    threshold = max(VAD_MIN_RMS, float(np.percentile(rms, 10)) * VAD_NOISE_RATIO)
+    active = np.flatnonzero(rms > threshold)
+    if active.size == 0:
+        return []
+
+    segments = []
+    seg_start = prev = int(active[0])
+    for i in active[1:]:
+        i = int(i)
+        if i - prev > VAD_MAX_GAP:
+            segments.append((seg_start, prev + 1))
+            seg_start = i
+        prev = i
+    segments.append((seg_start, prev + 1))
+
+    return [
+        (max(0, a * VAD_FRAME - VAD_PAD), min(audio.size, b * VAD_FRAME + VAD_PAD))
+        for a, b in segments
+        if b - a >= VAD_MIN_SPEECH
+    ]
+
+
+def pack_windows(audio, segments):
+    """Konuşma parçalarını <= 30 sn'lik pencerelere doldurur (uzun parça bölünür)."""
+    import numpy as np
+
+    gap = np.zeros(int(0.1 * SAMPLE_RATE), dtype=np.float32)
+    windows, current, size = [], [], 0
+
+    for a, b in segments:
+        for start in range(a, b, WINDOW_SAMPLES):
+            piece = audio[start:min(b, start + WINDOW_SAMPLES)]
+            if current and size + gap.size + piece.size > WINDOW_SAMPLES:
+                windows.append(np.concatenate(current))
+                current, size = [], 0
+            if current:
+                current.append(gap)
+                size += gap.size
+            current.append(piece)
+            size += piece.size
+
+    if current:
+        windows.append(np.concatenate(current))
+    return windows
+
+
+def _mel(model, window):
+    import whisper
+
+    audio = whisper.pad_or_trim(window)
+    n_mels = getattr(model.dims, "n_mels", 80)
     try:
-        # MP4 -> WAV (PCM, mono, 16kHz)
-        cmd = [
-            "ffmpeg", "-y",
-            "-i", video_path,
-            "-ac", "1",
-            "-ar", "16000",
-            "-vn",
-            wav_path
-        ]
-        subprocess.run(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            check=True
+        return whisper.log_mel_spectrogram(audio, n_mels=n_mels)
+    except TypeError:
+        # n_mels parametresi olmayan eski whisper sürümleri
+        return whisper.log_mel_spectrogram(audio)
+
+
+def _is_no_speech(r) -> bool:
+    return r.no_speech_prob > NO_SPEECH_THRESHOLD and r.avg_logprob < LOGPROB_THRESHOLD
+
+
+def _needs_fallback(r) -> bool:
+    # transcribe() ile aynı: konuşmasız pencere için yeniden denenmez
+    if _is_no_speech(r):
+        return False
+    return r.compression_ratio > COMPRESSION_RATIO_THRESHOLD or r.avg_logprob < LOGPROB_THRESHOLD
+
+
+def decode_windows(model, windows):
+    """
+    Pencereleri DECODE_BATCH'lik gruplar halinde çözer; konuşmasız pencere için None.
+    Eşikleri geçemeyen pencereler sadece kendi aralarında daha yüksek sıcaklıkta
+    tekrar çözülür; son denemenin sonucu kullanılır.
+    """
+    import torch
+    import whisper
+
+    mels = [_mel(model, w) for w in windows]
+    results = [None] * len(windows)
+    todo = list(range(len(windows)))
+
+    for temperature in TEMPERATURES:
+        options = whisper.DecodingOptions(
+            fp16=False, without_timestamps=True, temperature=temperature
         )
+        retry = []
+        for i in range(0, len(todo), DECODE_BATCH):
+            idx = todo[i:i + DECODE_BATCH]
+            mel = torch.stack([mels[j] for j in idx]).to(model.device)
+            for j, r in zip(idx, whisper.decode(model, mel, options)):
+                results[j] = r
+                if _needs_fallback(r):
+                    retry.append(j)
+        todo = retry
+        if not todo:
+            break
+
+    return [None if _is_no_speech(r) else r.text.strip() for r in results]
 
-        # Whisper model (local)
-        model = whisper.load_model("small")
+
+def _result(text="", skipped=None, seconds=0.0, audio_seconds=0.0, speech_seconds=None, error=None):
+    return {
+        "text": text,
+        "skipped": skipped,
+        "error": error,
+        "seconds": round(seconds, 3),
+        "audio_seconds": round(audio_seconds, 3),
+        "speech_seconds": round(audio_seconds if speech_seconds is None else speech_seconds, 3),
+    }
+
+
+def transcribe_file(model, video_path: str, skip_silent: bool = False):
+    """
+    Tek bir videoyu, önceden yüklenmiş model ile (VAD'siz, tüm ses) yazıya döker.
+    {"text", "skipped", "error", "seconds", "audio_seconds", "speech_seconds"} döner;
+    skipped None / "no_audio" / "silent". Hata olursa metin boş, error hata mesajıdır
+    (konuşmasız klipten ayrılsın diye).
+    """
+    t = time.time()
+    if not video_path or not os.path.exists(video_path):
+        return _result(error="dosya yok")
+
+    try:
+        audio = load_audio(video_path)
+        audio_seconds = audio.size / SAMPLE_RATE
+        if audio.size == 0:
+            return _result(skipped="no_audio", seconds=time.time() - t)
+        if skip_silent and is_silent(audio):
+            return _result(skipped="silent", seconds=time.time() - t, audio_seconds=audio_seconds)
 
         # HAM transcript (dil/çeviri yok)
         result = model.transcribe(
-            wav_path,
+            audio,
             fp16=False
         )
 
         text = (result.get("text") or "").strip()
+        return _result(text, seconds=time.time() - t, audio_seconds=audio_seconds)
+
+    except Exception as e:
+        return _result(seconds=time.time() - t, error=str(e) or type(e).__name__)
+
+
+def transcribe_batch(model, requests):
+    """
+    Birden çok isteği birlikte işler. "vad": true olan isteklerin konuşma
+    pencereleri tek batch'te çözülür; diğerleri transcribe_file ile tek tek.
+    Sonuçlar istek sırasıyla döner; batch decode süresi pencere sayısına göre paylaştırılır.
+    """
+    results = [None] * len(requests)
+    jobs = []   # (istek no, pencere listesi, hazırlık süresi, ses sn, konuşma sn)
+
+    for i, req in enumerate(requests):
+        video_path = req.get("video_path")
+        if not req.get("vad"):
+            results[i] = transcribe_file(model, video_path, skip_silent=bool(req.get("skip_silent")))
+            continue
+
+        t = time.time()
+        if not video_path or not os.path.exists(video_path):
+            results[i] = _result(error="dosya yok")
+            continue
+        try:
+            audio = load_audio(video_path)
+        except Exception as e:
+            results[i] = _result(seconds=time.time() - t, error=str(e) or type(e).__name__)
+            continue
+
+        audio_seconds = audio.size / SAMPLE_RATE
+        if audio.size == 0:
+            results[i] = _result(skipped="no_audio", seconds=time.time() - t)
+            continue
+        if req.get("skip_silent") and is_silent(audio):
+            results[i] = _result(skipped="silent", seconds=time.time() - t, audio_seconds=audio_seconds)
+            continue
+
+        segments = speech_segments(audio)
+        speech_seconds = sum(b - a for a, b in segments) / SAMPLE_RATE
+        if not segments:
+            results[i] = _result(
+                skipped="no_speech", seconds=time.time() - t,
+                audio_seconds=audio_seconds, speech_seconds=0.0,
+            )
+            continue
+
+        jobs.append((i, pack_windows(audio, segments), time.time() - t, audio_seconds, speech_seconds))
+
+    if jobs:
+        windows = [w for _, ws, _, _, _ in jobs for w in ws]
+        t = time.time()
+        error = None
+        try:
+            texts = decode_windows(model, windows)
+        except Exception as e:
+            texts = [""] * len(windows)
+            error = str(e) or type(e).__name__
+        per_window = (time.time() - t) / len(windows)
+
+        pos = 0
+        for i, ws, prep_seconds, audio_seconds, speech_seconds in jobs:
+            parts = texts[pos:pos + len(ws)]
+            pos += len(ws)
+            kept = [p for p in parts if p]
+            results[i] = _result(
+                " ".join(kept),
+                skipped="music" if error is None and all(p is None for p in parts) else None,
+                seconds=prep_seconds + per_window * len(ws),
+                audio_seconds=audio_seconds,
+                speech_seconds=speech_seconds,
+                error=error,
+            )
+
+    return results
+
+
+def serve(model_name: str = DEFAULT_MODEL):
+    """
+    Kalıcı worker modu.
+    Model bir kez yüklenir; stdin'den satır satır istek okunur, stdout'a satır satır yanıt yazılır:
+        {"video_path": ..., "skip_silent": ..., "vad": ...}
+            → {"text", "seconds", "skipped", "error", "audio_seconds", "speech_seconds"}
+        {"batch": [istek, ...]}  → {"results": [yanıt, ...]}  (VAD pencereleri tek decode'da)
+    İstekte "skip_silent": true varsa sessiz klipler Whisper'a hiç verilmez.
+    İlk satır her zaman {"ready": true, "import_seconds": ..., "load_seconds": ...} olur.
+    """
+    # whisper'ın olası print'leri protokol satırlarına karışmasın
+    out = sys.stdout
+    sys.stdout = sys.stderr
+
+    t0 = time.time()
+    import whisper
+    import_seconds = time.time() - t0
+
+    t0 = time.time()
+    model = whisper.load_model(model_name)
+    out.write(json.dumps({
+        "ready": True,
+        "import_seconds": round(import_seconds, 3),
+        "load_seconds": round(time.time() - t0, 3),
+    }) + "\n")
+    out.flush()
 
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            req = json.loads(line)
+        except ValueError:
+            continue
+
+        if isinstance(req.get("batch"), list):
+            resp = {"results": transcribe_batch(model, req["batch"])}
+        else:
+            resp = transcribe_batch(model, [req])[0]
+        out.write(json.dumps(resp) + "\n")
+        out.flush()
+
+
+def main():
+    # Kullanım:
+    #   python transcribe_whisper.py <video_path> <out_txt>
+    #   python transcribe_whisper.py --serve [model_adı]
+    if len(sys.argv) >= 2 and sys.argv[1] == "--serve":
+        serve(sys.argv[2] if len(sys.argv) >= 3 else DEFAULT_MODEL)
+        return
+
+    if len(sys.argv) < 3:
+        sys.exit(1)
+
+    video_path = sys.argv[1]
+    out_path = sys.argv[2]
+
+    if not os.path.exists(video_path):
         with open(out_path, "w", encoding="utf-8") as f:
-            f.write(text)
+            f.write("")
+        sys.exit(0)
+
+    try:
+        import whisper
 
+        # Whisper model (local)
+        model = whisper.load_model(DEFAULT_MODEL)
+        text = transcribe_file(model, video_path)["text"]
     except Exception:
         # Hata olursa boş yaz
-        with open(out_path, "w", encoding="utf-8") as f:
-            f.write("")
-    finally:
-        if os.path.exists(wav_path):
-            try:
-                os.remove(wav_path)
-            except:
-                pass
+        text = ""
+
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(text)
 
 if __name__ == "__main__":
     main()
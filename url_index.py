@@ -0,0 +1,81 @@
+import os
+import pandas as pd
+
+from tiktok_urls import normalize_video_url
+
+# ======================================================
+# KALICI URL İNDEKSİ (HAM CSV İÇİN)
+# ======================================================
+
+
+class UrlIndex:
+    """
+    Ham CSV'de kayıtlı video_url'lerin kalıcı indeksi.
+    <csv>.urls dosyasında satır başına bir normalize URL tutulur:
+        - ilk kullanımda CSV'nin sadece video_url kolonu okunarak kurulur
+        - append_csv her yazımdan sonra yeni URL'leri dosyaya ekler
+        - CSV dışarıdan değiştirilmişse (CSV indeksten yeni) yeniden kurulur
+    """
+
+    def __init__(self, csv_path: str):
+        self.csv_path = csv_path
+        self.path = csv_path + ".urls"
+        self.urls = set()
+        self._load()
+
+    def _load(self):
+        index_ok = os.path.exists(self.path) and (
+            not os.path.exists(self.csv_path)
+            or os.path.getmtime(self.path) >= os.path.getmtime(self.csv_path)
+        )
+
+        if not index_ok:
+            self.rebuild()
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.urls = {line.strip() for line in f if line.strip()}
+
+    def rebuild(self):
+        self.urls = set()
+
+        if os.path.exists(self.csv_path):
+            try:
+                df = pd.read_csv(
+                    self.csv_path,
+                    usecols=lambda c: c == "video_url",
+                    dtype=str,
+                    encoding="utf-8-sig",
+                )
+                if "video_url" in df.columns:
+                    self.urls = {
+                        normalize_video_url(u)
+                        for u in df["video_url"].dropna()
+                        if normalize_video_url(u)
+                    }
+            except Exception as e:
+                print(f"⚠️ URL indeksi CSV'den kurulamadı: {e}")
+
+        with open(self.path, "w", encoding="utf-8") as f:
+            for u in sorted(self.urls):
+                f.write(u + "\n")
+
+    def __contains__(self, url) -> bool:
+        return normalize_video_url(url) in self.urls
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def add(self, urls):
+        new = []
+        for u in urls:
+            key = normalize_video_url(u)
+            if key and key not in self.urls:
+                self.urls.add(key)
+                new.append(key)
+
+        if new:
+            with open(self.path, "a", encoding="utf-8") as f:
+                for u in new:
+                    f.write(u + "\n")
+        return len(new)
@@ -0,0 +1,173 @@
+import os
+
+import lazy_deps
+
+# ======================================================
+# ORTAK KARE KAYNAĞI (TEK GEÇİŞTE DECODE)
+# ======================================================
+# Videonun yüzde olarak örneklenen noktaları
+FACE_POINTS = (0.10, 0.30, 0.50, 0.70, 0.90)
+OCR_POINTS = (0.20, 0.50, 0.80)
+OCR_SAMPLES = len(OCR_POINTS)
+
+# Brightness / blur örnekleme modları:
+#   full : her kare (eski davranış, CSV'lerdeki değerler bununla üretildi)
+#   fps  : saniyede visual_fps kare; aradaki kareler grab() ile geçilir
+#   seek : sadece örnek karelere atlanır (CAP_PROP_POS_FRAMES); decoder en
+#          yakın keyframe'den başlar, aradaki kareler hiç istenmez
+VISUAL_MODES = ("full", "fps", "seek")
+
+
+def frame_indices(frame_count: int, points):
+    return [int(frame_count * p) for p in points]
+
+
+def ocr_points(samples: int = OCR_SAMPLES):
+    """
+    OCR için örnek yüzdeleri. Varsayılan sayıda eski noktalar (20/50/80%)
+    korunur; aksi halde videoya eşit aralıklı yayılır.
+    """
+    samples = max(1, int(samples))
+    if samples == OCR_SAMPLES:
+        return OCR_POINTS
+    return tuple(round((i + 1) / (samples + 1), 3) for i in range(samples))
+
+
+class VideoFrames:
+    """
+    Bir videonun tek decode oturumunda toplanan verisi:
+        - frames: örneklenen kareler {frame_index: BGR frame}
+        - brightness / blur için akan (running) toplamlar
+    """
+
+    def __init__(self, frame_count: int):
+        self.frame_count = frame_count
+        self.frames = {}
+
+        self.visual_count = 0
+        self.brightness_sum = 0.0
+        self.blur_sum = 0.0
+
+    def sample(self, points):
+        """İstenen yüzdelere denk gelen kareleri sırayla döner (okunamayanlar atlanır)."""
+        if self.frame_count <= 0:
+            return []
+
+        out = []
+        for idx in frame_indices(self.frame_count, points):
+            frame = self.frames.get(idx)
+            if frame is not None:
+                out.append(frame)
+        return out
+
+    def add_visual(self, frame, max_width: int = 0):
+        cv2 = lazy_deps.module("cv2")
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if max_width and gray.shape[1] > max_width:
+            # Laplacian'dan önce küçült (blur değeri ölçeğe bağlıdır!)
+            h = int(round(gray.shape[0] * max_width / gray.shape[1]))
+            gray = cv2.resize(gray, (max_width, max(1, h)), interpolation=cv2.INTER_AREA)
+        self.brightness_sum += float(gray.mean())
+        self.blur_sum += float(cv2.Laplacian(gray, cv2.CV_64F).var())
+        self.visual_count += 1
+
+    def visual_stats(self):
+        if self.visual_count == 0:
+            return {
+                "visual_brightness": None,
+                "visual_blur": None,
+            }
+
+        return {
+            "visual_brightness": round(self.brightness_sum / self.visual_count, 2),
+            "visual_blur": round(self.blur_sum / self.visual_count, 2),
+        }
+
+
+def _visual_step(cap, visual_mode: str, visual_fps: float) -> int:
+    if visual_mode == "full" or not visual_fps or visual_fps <= 0:
+        return 1
+    cv2 = lazy_deps.module("cv2")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0
+    if fps <= 0:
+        return 1
+    return max(1, int(round(fps / visual_fps)))
+
+
+def decode_video(
+    video_path: str,
+    sample_points=(FACE_POINTS, OCR_POINTS),
+    visual: bool = True,
+    visual_mode: str = "full",
+    visual_fps: float = 2.0,
+    visual_max_width: int = 0,
+):
+    """
+    Videoyu TEK oturumda okur.
+    sample_points içindeki her yüzde grubunun karelerini saklar,
+    visual=True ise brightness/blur istatistiğini visual_mode'a göre biriktirir.
+    İhtiyaç olmayan kareler sadece grab() ile geçilir (renk dönüşümü / kopya yok);
+    visual=False ise son örnek kareden sonra okuma durur.
+    """
+    if not video_path or not os.path.exists(video_path):
+        return VideoFrames(0)
+
+    if visual_mode not in VISUAL_MODES:
+        raise ValueError(f"Bilinmeyen visual_mode: {visual_mode}")
+
+    cv2 = lazy_deps.module("cv2")
+    cap = cv2.VideoCapture(video_path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    result = VideoFrames(frame_count)
+    step = _visual_step(cap, visual_mode, visual_fps) if visual else 1
+
+    wanted = set()
+    if frame_count > 0:
+        for points in sample_points:
+            wanted.update(frame_indices(frame_count, points))
+
+    if visual_mode == "seek" and frame_count > 0:
+        targets = set(wanted)
+        if visual:
+            targets.update(range(0, frame_count, step))
+
+        for idx in sorted(targets):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, idx)
+            ret, frame = cap.read()
+            if not ret:
+                continue
+            if idx in wanted:
+                result.frames[idx] = frame
+            if visual and idx % step == 0:
+                result.add_visual(frame, visual_max_width)
+
+        cap.release()
+        return result
+
+    last_wanted = max(wanted) if wanted else -1
+
+    idx = 0
+    while True:
+        if not visual and idx > last_wanted:
+            break
+
+        need_visual = visual and idx % step == 0
+        if idx not in wanted and not need_visual:
+            if not cap.grab():
+                break
+            idx += 1
+            continue
+
+        ret, frame = cap.read()
+        if not ret:
+            break
+
+        if idx in wanted:
+            result.frames[idx] = frame
+        if need_visual:
+            result.add_visual(frame, visual_max_width)
+
+        idx += 1
+
+    cap.release()
+    return result